@@ -0,0 +1,72 @@
+"""
+Measure the throughput of the render worker pool against its number of workers.
+
+Renders every demo document with every theme, several times over, and prints
+the documents rendered per second for each pool size, along with the time the
+pool took to start and to render its first document.
+
+    python scripts/benchmark_worker_pool.py --workers 1 2 4 --rounds 3
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.input_output.render_server import RenderService  # noqa: E402
+from src.input_output.worker_pool import RenderPool  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+        help="The pool sizes to measure.",
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=2, help="How many times every document is rendered."
+    )
+    parser.add_argument(
+        "--scale", type=float, default=0.5, help="The scale of the rendered pages."
+    )
+    parser.add_argument(
+        "--max-jobs-per-worker",
+        type=int,
+        default=200,
+        help="The jobs after which a worker is replaced.",
+    )
+    args = parser.parse_args()
+
+    service = RenderService(ROOT / "themes")
+    documents = [path.read_text(encoding="utf-8") for path in sorted((ROOT / "demo").glob("*.md"))]
+    jobs = [
+        (theme, markdown, args.scale)
+        for theme in service.theme_names()
+        for markdown in documents
+    ] * args.rounds
+
+    print(f"{len(jobs)} documents, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'start (s)':>10} {'first (s)':>10} {'total (s)':>10} {'docs/s':>8}")
+    for workers in args.workers:
+        started = time.perf_counter()
+        with RenderPool(service, workers, args.max_jobs_per_worker) as pool:
+            ready = time.perf_counter()
+            pool.render(*jobs[0])
+            first = time.perf_counter()
+            for _ in pool.render_many(jobs):
+                pass
+            finished = time.perf_counter()
+        print(
+            f"{workers:>8} {ready - started:>10.2f} {first - ready:>10.3f} "
+            f"{finished - first:>10.2f} {len(jobs) / (finished - first):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
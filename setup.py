@@ -14,10 +14,6 @@ setup(
         "numpy>=1.25.2",
         "Pygments>=2.15.1",
         "markdown>=3.4.4",
-        "pandas>=2.0.3",
-        "matplotlib>=3.7.2",
-        "python-dateutil>=2.8.2",
-        "pytz>=2023.3",
     ],
     entry_points={
         "console_scripts": [
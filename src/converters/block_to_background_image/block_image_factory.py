@@ -1,26 +1,60 @@
+import json
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 import math
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional, Tuple
 
 from PIL import Image, ImageDraw, ImageFilter
 from src.data.background_image_type import BackgroundImageType
 from src.utils.config import Config
+from src.utils.fork_safety import fork_safe_lock
 from src.utils.other import hex_to_rgba
+from src.utils.render_cache import file_fingerprint
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class BlockImageFactory:
-    _config: Config = Config()
+    """
+    Creates the page backgrounds of one theme.
+
+    Each factory keeps its own cache of backgrounds, guarded by a lock, so several
+    themes can be rendered from concurrent threads of the same process.
+    """
 
-    PATHS_TO_IMAGES: dict = {
-        BackgroundImageType.TITLE: _config["PATHS"]["TITLE_PAGE"],
-        BackgroundImageType.NORMAL: _config["PATHS"]["DEFAULT_PAGE"],
-        BackgroundImageType.FINAL: _config["PATHS"]["FINAL_PAGE"],
-        BackgroundImageType.QUESTION: _config["PATHS"]["QUESTION_PAGE"],
+    # Keys of the background files in the PATHS section of the configuration
+    PATH_KEYS: Dict[BackgroundImageType, str] = {
+        BackgroundImageType.TITLE: "TITLE_PAGE",
+        BackgroundImageType.NORMAL: "DEFAULT_PAGE",
+        BackgroundImageType.FINAL: "FINAL_PAGE",
+        BackgroundImageType.QUESTION: "QUESTION_PAGE",
     }
 
-    @classmethod
-    def _create_gradient_image(cls, width: int, height: int) -> Image.Image:
+    # Maximum number of backgrounds kept in memory, the least recently used are dropped
+    BACKGROUND_CACHE_SIZE: int = 16
+
+    def __init__(self, config: Optional[Mapping[str, Any]] = None):
+        """
+        Args:
+            config (Optional[Mapping[str, Any]]): The configuration of the theme.
+                The global ``Config`` is read on every call when not given.
+        """
+        self._config = config if config is not None else Config()
+        self._background_cache: "OrderedDict[Tuple, Image.Image]" = OrderedDict()
+        self._background_lock = fork_safe_lock(self, "_background_lock")
+
+    @property
+    def paths_to_images(self) -> Dict[BackgroundImageType, Optional[str]]:
+        paths = self._config.get("PATHS") or {}
+        return {
+            block_type: paths.get(key) for block_type, key in self.PATH_KEYS.items()
+        }
+
+    def _create_gradient_image(self, width: int, height: int) -> Image.Image:
         """Create a modern gradient background image with optional effects."""
-        theme_config = cls._config.get("THEME", {})
+        theme_config = self._config.get("THEME", {})
         gradient_config = theme_config.get("GRADIENT", {})
         
         start_color = gradient_config.get("START_COLOR", "#1a1a2e")
@@ -31,82 +65,93 @@ class BlockImageFactory:
         start_rgba = hex_to_rgba(start_color)
         end_rgba = hex_to_rgba(end_color)
         
-        # Create base image
-        image = Image.new("RGB", (width, height))
-        draw = ImageDraw.Draw(image)
-        
-        if direction == "vertical":
-            # Create vertical gradient
-            for y in range(height):
-                ratio = y / height
-                r = int(start_rgba[0] + (end_rgba[0] - start_rgba[0]) * ratio)
-                g = int(start_rgba[1] + (end_rgba[1] - start_rgba[1]) * ratio)
-                b = int(start_rgba[2] + (end_rgba[2] - start_rgba[2]) * ratio)
-                draw.line([(0, y), (width, y)], fill=(r, g, b))
-        elif direction == "diagonal":
-            # Create diagonal gradient
-            for y in range(height):
-                for x in range(width):
-                    ratio = (x + y) / (width + height)
-                    r = int(start_rgba[0] + (end_rgba[0] - start_rgba[0]) * ratio)
-                    g = int(start_rgba[1] + (end_rgba[1] - start_rgba[1]) * ratio)
-                    b = int(start_rgba[2] + (end_rgba[2] - start_rgba[2]) * ratio)
-                    draw.point((x, y), fill=(r, g, b))
-        elif direction == "radial":
-            # Create radial gradient from center
-            center_x, center_y = width // 2, height // 2
-            max_dist = math.sqrt(center_x**2 + center_y**2)
-            for y in range(height):
-                for x in range(width):
-                    dist = math.sqrt((x - center_x)**2 + (y - center_y)**2)
-                    ratio = min(dist / max_dist, 1.0)
-                    r = int(start_rgba[0] + (end_rgba[0] - start_rgba[0]) * ratio)
-                    g = int(start_rgba[1] + (end_rgba[1] - start_rgba[1]) * ratio)
-                    b = int(start_rgba[2] + (end_rgba[2] - start_rgba[2]) * ratio)
-                    draw.point((x, y), fill=(r, g, b))
-        else:
-            # Default to horizontal gradient
-            for x in range(width):
-                ratio = x / width
-                r = int(start_rgba[0] + (end_rgba[0] - start_rgba[0]) * ratio)
-                g = int(start_rgba[1] + (end_rgba[1] - start_rgba[1]) * ratio)
-                b = int(start_rgba[2] + (end_rgba[2] - start_rgba[2]) * ratio)
-                draw.line([(x, 0), (x, height)], fill=(r, g, b))
+        image = Image.fromarray(
+            self._gradient_pixels(start_rgba, end_rgba, direction, width, height)
+        )
         
         # Add subtle noise/texture for modern look
-        effects_config = cls._config.get("EFFECTS", {})
+        effects_config = self._config.get("EFFECTS", {})
         if effects_config.get("TEXTURE", False):
-            image = cls._add_subtle_texture(image)
+            image = self._add_subtle_texture(image)
         
         return image
 
+    @staticmethod
+    def _gradient_ratios(direction: str, width: int, height: int) -> "np.ndarray":
+        """
+        Position of every pixel between the start (0) and end (1) color.
+
+        Vertical and horizontal gradients return a single column or row, which
+        broadcasts over the page.
+        """
+        import numpy as np
+
+        ys = np.arange(height, dtype=np.float64)[:, None]
+        xs = np.arange(width, dtype=np.float64)[None, :]
+
+        if direction == "vertical":
+            return ys / height
+        if direction == "diagonal":
+            return (xs + ys) / (width + height)
+        if direction == "radial":
+            center_x, center_y = width // 2, height // 2
+            max_dist = math.sqrt(center_x**2 + center_y**2)
+            dist = np.sqrt((xs - center_x) ** 2 + (ys - center_y) ** 2)
+            return np.minimum(dist / max_dist, 1.0)
+        # Default to horizontal gradient
+        return xs / width
+
     @classmethod
-    def _add_subtle_texture(cls, image: Image.Image) -> Image.Image:
+    def _gradient_pixels(
+        cls, start_rgba, end_rgba, direction: str, width: int, height: int
+    ) -> "np.ndarray":
+        """
+        Compute the RGB pixels of a gradient background.
+
+        Channels are interpolated in floating point and truncated to integers,
+        the same arithmetic as drawing the gradient pixel by pixel.
+        """
+        import numpy as np
+
+        ratio = cls._gradient_ratios(direction, width, height)
+        pixels = np.empty((height, width, 3), dtype=np.uint8)
+        for channel in range(3):
+            start = start_rgba[channel]
+            pixels[:, :, channel] = start + (end_rgba[channel] - start) * ratio
+        return pixels
+
+    def _add_subtle_texture(self, image: Image.Image) -> Image.Image:
         """Add subtle noise texture for modern aesthetic."""
-        import random
-        pixels = image.load()
-        width, height = image.size
-        
-        for y in range(height):
-            for x in range(width):
-                r, g, b = pixels[x, y]
-                noise = random.randint(-3, 3)
-                pixels[x, y] = (
-                    max(0, min(255, r + noise)),
-                    max(0, min(255, g + noise)),
-                    max(0, min(255, b + noise))
-                )
-        
-        return image
+        import numpy as np
 
-    @classmethod
-    def _add_decorative_elements(cls, image: Image.Image) -> Image.Image:
+        seed = self._config.get("EFFECTS", {}).get("TEXTURE_SEED", 0)
+        noise = self._noise_tile(image.width, image.height, seed)
+
+        pixels = np.asarray(image.convert("RGB"), dtype=np.int16) + noise[:, :, None]
+        return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def _noise_tile(width: int, height: int, seed: int) -> "np.ndarray":
+        """
+        Noise between -3 and 3 added to every channel of a pixel.
+
+        The noise is generated from the seed, so pages and runs get the same texture.
+        """
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        noise = rng.integers(-3, 4, size=(height, width), dtype=np.int16)
+        noise.flags.writeable = False
+        return noise
+
+    def _add_decorative_elements(self, image: Image.Image) -> Image.Image:
         """Add subtle decorative elements to the background."""
         draw = ImageDraw.Draw(image)
         width, height = image.size
         
         # Add subtle corner accents
-        accent_config = cls._config.get("THEME", {}).get("ACCENT_GRADIENT", {})
+        accent_config = self._config.get("THEME", {}).get("ACCENT_GRADIENT", {})
         if accent_config.get("ENABLED", False):
             accent_color = hex_to_rgba(accent_config.get("START_COLOR", "#00d4ff"))
             # Draw subtle corner lines
@@ -130,28 +175,73 @@ class BlockImageFactory:
         
         return image
 
-    @classmethod
     def create_background_image(
-        cls, block_type_str: str, width: int, height: int
+        self, block_type_str: str, width: int, height: int
+    ) -> Image.Image:
+        """
+        Get the background of a page.
+
+        Backgrounds are built once per type, size and theme and kept in memory,
+        every call returns a copy the caller is free to draw on.
+        """
+        block_type = self._translate_block_type(block_type_str)
+        key = (block_type, width, height, self._theme_fingerprint(block_type))
+
+        with self._background_lock:
+            template = self._background_cache.get(key)
+            if template is not None:
+                self._background_cache.move_to_end(key)
+                return template.copy()
+
+        template = self._build_background_image(block_type, width, height)
+
+        with self._background_lock:
+            self._background_cache[key] = template
+            while len(self._background_cache) > self.BACKGROUND_CACHE_SIZE:
+                self._background_cache.popitem(last=False)
+        return template.copy()
+
+    def invalidate_background_cache(self) -> None:
+        """Drop every cached background, e.g. after the theme or a background file changed."""
+        with self._background_lock:
+            self._background_cache.clear()
+
+    def _theme_fingerprint(self, block_type: BackgroundImageType) -> str:
+        """Identify every setting and file the background of a page type depends on."""
+        bg_image_path = self.paths_to_images.get(block_type)
+        return json.dumps(
+            [
+                self._config.get("THEME", {}),
+                self._config.get("EFFECTS", {}).get("TEXTURE", False),
+                self._config.get("EFFECTS", {}).get("TEXTURE_SEED", 0),
+                self._config.get("COLORS", {}).get("BACKGROUND", "black"),
+                bg_image_path,
+                file_fingerprint(bg_image_path) if bg_image_path else None,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+
+    def _build_background_image(
+        self, block_type: BackgroundImageType, width: int, height: int
     ) -> Image.Image:
-        block_type = cls._translate_block_type(block_type_str)
-        bg_image_path = cls.PATHS_TO_IMAGES.get(block_type)
+        bg_image_path = self.paths_to_images.get(block_type)
 
         # Check if gradient is enabled
-        theme_config = cls._config.get("THEME", {})
+        theme_config = self._config.get("THEME", {})
         gradient_config = theme_config.get("GRADIENT", {})
         gradient_enabled = gradient_config.get("ENABLED", False)
 
         try:
             if gradient_enabled:
-                image = cls._create_gradient_image(width, height)
+                image = self._create_gradient_image(width, height)
                 # Add decorative elements for title pages
                 if block_type == BackgroundImageType.TITLE:
-                    image = cls._add_decorative_elements(image)
+                    image = self._add_decorative_elements(image)
             elif bg_image_path is not None and Path(bg_image_path).is_file():
                 image = Image.open(bg_image_path).resize((width, height))
             else:
-                bg_color = cls._config.get("COLORS", {}).get("BACKGROUND", "black")
+                bg_color = self._config.get("COLORS", {}).get("BACKGROUND", "black")
                 image = Image.new("RGB", (width, height), color=bg_color)
         except IOError as e:
             raise RuntimeError(f"Failed to load or create the image: {e}")
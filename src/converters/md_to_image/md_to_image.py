@@ -1,11 +1,20 @@
+import asyncio
 import itertools
 import logging
-from typing import List, Optional
+import threading
+from concurrent.futures import Executor
+from io import BytesIO
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence, Union
 from PIL import Image
 
 from src.converters.md_to_text_block.md_to_text_block import MarkdownToTextBlock
+from src.data.page_layout import PageLayout
+from src.data.text_block import TextBlock
+from src.input_output.file_watcher import FileWatcher
 from src.input_output.markdown_reader import MarkdownReader
 from src.image_generation.image_generator import ImageGenerator
+from src.image_generation.incremental_renderer import IncrementalRenderer, PageUpdate
+from src.image_generation.render_context import RenderContext
 
 logger = logging.getLogger(__name__)
 
@@ -15,26 +24,214 @@ class MarkdownToImageConverter:
     Converts given markdown to images.
     """
 
-    def __init__(self, input_file: str) -> None:
+    def __init__(
+        self,
+        input_file: str,
+        jobs: int = 1,
+        image_generator: Optional[ImageGenerator] = None,
+        context: Optional[RenderContext] = None,
+    ) -> None:
+        """
+        Args:
+            input_file (str): The markdown file to convert.
+            jobs (int): Number of processes used to rasterize the pages.
+            image_generator (Optional[ImageGenerator]): A generator to reuse, so a
+                batch of documents shares its strategies and font caches. A new
+                one is created in the executor when not given.
+            context (Optional[RenderContext]): The theme of the new generator,
+                the one of the global ``Config`` when not given. Ignored when a
+                generator is given.
+        """
         self.input_file = input_file
+        self.jobs = jobs
+        self.context = context
+        self._image_generator = image_generator
+
+    @property
+    def image_generator(self) -> ImageGenerator:
+        if self._image_generator is None:
+            self._image_generator = ImageGenerator(context=self.context)
+        return self._image_generator
 
-    def convert(self) -> Optional[List[Image.Image]]:
+    def convert(self, scale: float = 1.0) -> Optional[List[Image.Image]]:
         """
         Convert markdown to images based on the specified page type.
         """
         try:
-            markdown_reader = MarkdownReader()
-            image_generator = ImageGenerator()
-            md_to_text = MarkdownToTextBlock()
+            return list(self.iter_pages(scale))
+
+        except Exception as e:
+            logger.error(f"Error generating images: {e}", exc_info=True)
+            return None
 
-            content = markdown_reader.read(self.input_file)
-            if content is None:
-                raise IOError(f"Could not parse the provided file: {self.input_file}")
-            text_blocks = md_to_text.run(content)
-            flatten_text_blocks = list(itertools.chain.from_iterable(text_blocks))
+    def convert_to_scales(
+        self, scales: Sequence[float]
+    ) -> Optional[Dict[float, List[Image.Image]]]:
+        """
+        Convert markdown to images at several scales.
 
-            return image_generator.generate_images(flatten_text_blocks)
+        The document is parsed, wrapped and paginated once, each page is then
+        recorded once and rasterized at every requested scale.
+        """
+        try:
+            images_by_scale = {scale: [] for scale in scales}
+            for images in self.iter_pages_at_scales(scales):
+                for scale, image in zip(scales, images):
+                    images_by_scale[scale].append(image)
+            return images_by_scale
 
         except Exception as e:
             logger.error(f"Error generating images: {e}", exc_info=True)
             return None
+
+    def iter_pages(self, scale: float = 1.0) -> Iterator[Image.Image]:
+        """
+        Yield the images one by one, each as soon as its page is finalized.
+
+        Unlike ``convert``, errors are raised to the caller.
+        """
+        for images in self.iter_pages_at_scales([scale]):
+            yield images[0]
+
+    def iter_pages_at_scales(self, scales: Sequence[float]) -> Iterator[List[Image.Image]]:
+        """
+        Yield, page by page, the images of the page at every scale.
+
+        Unlike ``convert_to_scales``, errors are raised to the caller.
+        """
+        text_blocks = self._read_text_blocks()
+        pages = self.image_generator.iter_layout(text_blocks)
+
+        yield from self.image_generator.iter_rendered_pages(pages, scales, self.jobs)
+
+    def watch(
+        self, scales: Sequence[float] = (1.0,), poll_interval: float = 0.5
+    ) -> Iterator[PageUpdate]:
+        """
+        Yield a page update for the whole document, then one every time the input file changes.
+
+        Only the pages whose content changed are rendered again. Errors are logged
+        and the file keeps being watched.
+        """
+        renderer = IncrementalRenderer(self.image_generator, scales)
+        for _ in FileWatcher(self.input_file, poll_interval).changes():
+            try:
+                update = renderer.update(self._read_text_blocks())
+            except Exception as e:
+                logger.error(f"Error generating images: {e}", exc_info=True)
+                continue
+            yield update
+
+    def layout(self) -> Optional[List[PageLayout]]:
+        """
+        Paginate the markdown without rendering any image.
+        """
+        try:
+            text_blocks = self._read_text_blocks()
+
+            return self.image_generator.layout(text_blocks)
+
+        except Exception as e:
+            logger.error(f"Error laying out pages: {e}", exc_info=True)
+            return None
+
+    def _read_text_blocks(self) -> List[TextBlock]:
+        markdown_reader = MarkdownReader()
+
+        content = markdown_reader.read(self.input_file)
+        if content is None:
+            raise IOError(f"Could not parse the provided file: {self.input_file}")
+
+        return self.parse_markdown(content)
+
+    @staticmethod
+    def parse_markdown(content: str) -> List[TextBlock]:
+        """Split markdown text into the blocks the image generator lays out."""
+        text_blocks = MarkdownToTextBlock().run(content)
+
+        return list(itertools.chain.from_iterable(text_blocks))
+
+
+async def convert_async(
+    markdown: str,
+    scale: float = 1.0,
+    *,
+    image_generator: Optional[ImageGenerator] = None,
+    context: Optional[RenderContext] = None,
+    executor: Optional[Executor] = None,
+    image_format: Optional[str] = None,
+) -> AsyncIterator[Union[Image.Image, bytes]]:
+    """
+    Convert markdown to images without blocking the event loop.
+
+    Parsing, layout, rasterization and encoding run in the executor, one page at
+    a time, and each page is yielded as soon as it is ready. Cancelling the task
+    iterating the pages, or closing the iterator early, stops the conversion
+    before the next page: the page being rendered runs to completion, since
+    rasterization cannot be interrupted, the iterator waits for it to close
+    the conversion, and nothing is rendered after it.
+
+    Args:
+        markdown (str): The markdown to convert.
+        scale (float): The scale of the images.
+        image_generator (Optional[ImageGenerator]): A generator to reuse, a new
+            one is created in the executor when not given.
+        context (Optional[RenderContext]): The theme of the new generator, the
+            one of the global ``Config`` when not given. Ignored when a generator
+            is given.
+        executor (Optional[Executor]): A thread pool to render in, the default
+            executor of the loop when not given. The pages are produced by a
+            generator, which cannot be sent to another process.
+        image_format (Optional[str]): When given, such as "PNG", pages are
+            yielded encoded in this format instead of as images.
+
+    Yields:
+        Union[Image.Image, bytes]: The page images, or their encoded files, in order.
+    """
+    loop = asyncio.get_running_loop()
+
+    def iter_pages() -> Iterator[Union[Image.Image, bytes]]:
+        # Loading the fonts and backgrounds of a new generator would block the loop
+        generator = image_generator
+        if generator is None:
+            generator = ImageGenerator(context=context)
+        blocks = MarkdownToImageConverter.parse_markdown(markdown)
+        for image in generator.iter_images(blocks, scale):
+            if image_format is None:
+                yield image
+            else:
+                buffer = BytesIO()
+                image.save(buffer, format=image_format)
+                yield buffer.getvalue()
+
+    pages = iter_pages()
+    # Held while the generator runs, it may only be closed between pages
+    lock = threading.Lock()
+
+    def next_page() -> Optional[Union[Image.Image, bytes]]:
+        with lock:
+            return next(pages, None)
+
+    def close_pages() -> None:
+        with lock:
+            try:
+                pages.close()
+            except Exception as e:
+                logger.error(f"Error closing the conversion: {e}", exc_info=True)
+
+    try:
+        while True:
+            page = await loop.run_in_executor(executor, next_page)
+            if page is None:
+                return
+            yield page
+    finally:
+        if lock.acquire(blocking=False):
+            try:
+                pages.close()
+            finally:
+                lock.release()
+        else:
+            # Cancelled while a page is rendering, close once it is done. Shielded
+            # so that cancelling again cannot leave the generator open.
+            await asyncio.shield(loop.run_in_executor(executor, close_pages))
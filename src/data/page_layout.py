@@ -0,0 +1,87 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.data.text_block import TextBlock
+
+
+@dataclass
+class BlockPlacement:
+    """
+    Position of a single text block on a page.
+
+    Attributes
+    ----------
+    index : int
+        Position of the block in the flattened document.
+    block : TextBlock
+        The block being placed.
+    top : int
+        The height at which the block starts being drawn.
+    bottom : int
+        The height returned by the drawing strategy once the block is drawn.
+    """
+
+    index: int
+    block: TextBlock
+    top: int
+    bottom: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "type": self.block.type,
+            "top": self.top,
+            "bottom": self.bottom,
+        }
+
+
+@dataclass
+class PageLayout:
+    """
+    The result of paginating a document, one instance per output image.
+
+    Attributes
+    ----------
+    number : int
+        The page number, starting at 1.
+    background : str
+        The block type used to pick the page background.
+    page_number_index : Optional[int]
+        Number of placements drawn before the page number badge, so blocks drawn
+        earlier end up below it. None when the page has no badge.
+    placements : List[BlockPlacement]
+        The blocks drawn on the page, in drawing order.
+    """
+
+    number: int
+    background: str
+    page_number_index: Optional[int] = None
+    placements: List[BlockPlacement] = field(default_factory=list)
+
+    @property
+    def show_page_number(self) -> bool:
+        return self.page_number_index is not None
+
+    def fingerprint(self) -> Tuple:
+        """
+        Everything that affects the rendered image of the page.
+
+        Block indices are left out, so a page whose blocks only moved within the
+        document keeps its fingerprint.
+        """
+        return (
+            self.number,
+            self.background,
+            self.page_number_index,
+            tuple(
+                (p.block.type, p.block.data, p.top, p.bottom) for p in self.placements
+            ),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "page": self.number,
+            "background": self.background,
+            "show_page_number": self.show_page_number,
+            "blocks": [placement.to_dict() for placement in self.placements],
+        }
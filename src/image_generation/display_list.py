@@ -0,0 +1,259 @@
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+from PIL import Image, ImageDraw, ImageFont
+
+from src.converters.block_to_background_image.block_image_factory import (
+    BlockImageFactory,
+)
+from src.image_generation.font_registry import FontRegistry
+from src.image_generation.text_measurer import TextMeasurer
+
+
+@dataclass
+class TextRun:
+    """A single ``ImageDraw.text`` call."""
+
+    xy: Tuple[float, float]
+    text: str
+    font: ImageFont.FreeTypeFont
+    fill: Any = None
+
+
+@dataclass
+class Shape:
+    """
+    A vector primitive.
+
+    ``kind`` is the name of the ``ImageDraw`` method used to draw it: ``rectangle``,
+    ``rounded_rectangle``, ``ellipse``, ``line`` or ``polygon``. ``points`` holds
+    the flattened coordinates.
+    """
+
+    kind: str
+    points: Tuple[float, ...]
+    fill: Any = None
+    outline: Any = None
+    width: int = 1
+    radius: float = 0
+
+
+@dataclass
+class ImagePaste:
+    """An already rasterized tile, such as a table or a highlighted code block."""
+
+    image: Image.Image
+    xy: Tuple[int, int]
+    use_alpha: bool = True
+
+
+Primitive = Union[TextRun, Shape, ImagePaste]
+
+
+def _flatten(xy) -> Tuple[float, ...]:
+    """Flatten ``[(x0, y0), (x1, y1)]`` or ``[x0, y0, x1, y1]`` into a flat tuple."""
+    flat = []
+    for item in xy:
+        if isinstance(item, (tuple, list)):
+            flat.extend(item)
+        else:
+            flat.append(item)
+    return tuple(flat)
+
+
+@dataclass
+class DisplayList:
+    """
+    Records the drawing primitives of a page instead of rasterizing them.
+
+    Exposes the subset of the ``ImageDraw.ImageDraw`` interface the drawing
+    strategies use, plus ``paste`` for pre-rendered tiles. The recorded page can
+    then be replayed by a ``Rasterizer`` at any scale.
+
+    Attributes
+    ----------
+    size : Tuple[int, int]
+        The size of the page the primitives were laid out on.
+    background : Optional[str]
+        The block type used to pick the page background, None to draw on an
+        existing image.
+    primitives : List[Primitive]
+        The recorded primitives, in drawing order.
+    """
+
+    size: Tuple[int, int]
+    background: Optional[str] = None
+    primitives: List[Primitive] = field(default_factory=list)
+
+    def textbbox(self, xy, text, font=None, *args, **kwargs) -> Tuple[int, int, int, int]:
+        left, top, right, bottom = TextMeasurer().bbox(font, text)
+        return left + xy[0], top + xy[1], right + xy[0], bottom + xy[1]
+
+    def text(self, xy, text: str, fill=None, font=None, *args, **kwargs) -> None:
+        self.primitives.append(TextRun(tuple(xy), text, font, fill))
+
+    def rectangle(self, xy, fill=None, outline=None, width: int = 1) -> None:
+        self.primitives.append(Shape("rectangle", _flatten(xy), fill, outline, width))
+
+    def rounded_rectangle(
+        self, xy, radius: float = 0, fill=None, outline=None, width: int = 1
+    ) -> None:
+        self.primitives.append(
+            Shape("rounded_rectangle", _flatten(xy), fill, outline, width, radius)
+        )
+
+    def ellipse(self, xy, fill=None, outline=None, width: int = 1) -> None:
+        self.primitives.append(Shape("ellipse", _flatten(xy), fill, outline, width))
+
+    def line(self, xy, fill=None, width: int = 0) -> None:
+        self.primitives.append(Shape("line", _flatten(xy), fill, None, width))
+
+    def polygon(self, xy, fill=None, outline=None, width: int = 1) -> None:
+        self.primitives.append(Shape("polygon", _flatten(xy), fill, outline, width))
+
+    def paste(self, image: Image.Image, xy: Tuple[int, int], use_alpha: bool = True) -> None:
+        self.primitives.append(ImagePaste(image, tuple(xy), use_alpha))
+
+
+class Rasterizer:
+    """
+    Replays display lists onto Pillow images.
+
+    At scale 1 the output is identical to drawing directly with ``ImageDraw``.
+    Other scales multiply every coordinate, reload the fonts at the scaled size
+    and resample pasted tiles, so one layout can produce retina and thumbnail
+    images without parsing, wrapping or paginating the document again.
+
+    Text is drawn with ``ImageDraw.text`` by the "pillow" backend. The "atlas"
+    backend draws the same pixels from a ``GlyphAtlas``, which is faster for
+    text heavy pages.
+    """
+
+    TEXT_BACKENDS = ("pillow", "atlas")
+
+    def __init__(
+        self,
+        text_backend: str = "pillow",
+        backgrounds: Optional[BlockImageFactory] = None,
+    ):
+        """
+        Args:
+            text_backend (str): One of ``TEXT_BACKENDS``.
+            backgrounds (Optional[BlockImageFactory]): The factory of the page
+                backgrounds, one following the global ``Config`` when not given.
+
+        Raises:
+            ValueError: If the text backend is unknown.
+        """
+        if text_backend not in self.TEXT_BACKENDS:
+            raise ValueError(f"Unknown text backend: {text_backend}")
+        self.backgrounds = backgrounds if backgrounds is not None else BlockImageFactory()
+        self.glyph_atlas = None
+        if text_backend == "atlas":
+            # The atlas needs NumPy, which the default backend never loads
+            from src.image_generation.glyph_atlas import GlyphAtlas
+
+            self.glyph_atlas = GlyphAtlas()
+
+    def rasterize(self, display_list: DisplayList, scale: float = 1.0) -> Image.Image:
+        """Create the page background at the scaled size and replay the display list on it."""
+        width, height = display_list.size
+        img = self.backgrounds.create_background_image(
+            display_list.background or "",
+            round(width * scale),
+            round(height * scale),
+        )
+        self.replay(display_list, img, scale)
+        return img
+
+    def replay(
+        self, display_list: DisplayList, img: Image.Image, scale: float = 1.0
+    ) -> Image.Image:
+        """Draw the recorded primitives on the given image."""
+        d = ImageDraw.Draw(img)
+        # Consecutive text runs are handed to the glyph atlas together
+        pending_runs = []
+        for primitive in display_list.primitives:
+            if isinstance(primitive, TextRun):
+                run = self._scale_run(primitive, scale)
+                if self.glyph_atlas is not None and self.glyph_atlas.supports(img, *run):
+                    pending_runs.append(run)
+                    continue
+
+            if pending_runs:
+                self.glyph_atlas.draw_runs(img, pending_runs)
+                pending_runs = []
+
+            if isinstance(primitive, TextRun):
+                xy, text, fill, font = run
+                d.text(xy, text, fill=fill, font=font)
+            elif isinstance(primitive, Shape):
+                self._replay_shape(d, primitive, scale)
+            else:
+                self._replay_paste(img, primitive, scale)
+
+        if pending_runs:
+            self.glyph_atlas.draw_runs(img, pending_runs)
+        return img
+
+    def _scale_run(self, run: TextRun, scale: float):
+        return (
+            self._scale_points(run.xy, scale),
+            run.text,
+            run.fill,
+            self._scale_font(run.font, scale),
+        )
+
+    def _replay_shape(self, d: ImageDraw.ImageDraw, shape: Shape, scale: float) -> None:
+        points = self._scale_points(shape.points, scale)
+        width = self._scale_width(shape.width, scale)
+        if shape.kind == "line":
+            d.line(points, fill=shape.fill, width=width)
+        elif shape.kind == "rounded_rectangle":
+            d.rounded_rectangle(
+                points,
+                radius=shape.radius if scale == 1 else shape.radius * scale,
+                fill=shape.fill,
+                outline=shape.outline,
+                width=width,
+            )
+        else:
+            getattr(d, shape.kind)(
+                points, fill=shape.fill, outline=shape.outline, width=width
+            )
+
+    def _replay_paste(self, img: Image.Image, paste: ImagePaste, scale: float) -> None:
+        tile = paste.image
+        if scale != 1:
+            tile = tile.resize(
+                (max(1, round(tile.width * scale)), max(1, round(tile.height * scale))),
+                Image.LANCZOS,
+            )
+        xy = tuple(round(value * scale) for value in paste.xy)
+        img.paste(tile, xy, tile if paste.use_alpha else None)
+
+    def _scale_font(
+        self, font: ImageFont.FreeTypeFont, scale: float
+    ) -> ImageFont.FreeTypeFont:
+        if scale == 1 or font is None:
+            return font
+
+        # A scaled face keeps the layout engine the page was recorded with
+        return FontRegistry().get(
+            font.path,
+            max(1, round(font.size * scale)),
+            font.index,
+            layout_engine=font.layout_engine,
+        )
+
+    @staticmethod
+    def _scale_points(points: Sequence[float], scale: float) -> Tuple[float, ...]:
+        if scale == 1:
+            return tuple(points)
+        return tuple(value * scale for value in points)
+
+    @staticmethod
+    def _scale_width(width: int, scale: float) -> int:
+        if scale == 1 or width == 0:
+            return width
+        return max(1, round(width * scale))
@@ -1,59 +1,148 @@
 import re
-import textwrap
 from abc import ABC, abstractmethod
+from dataclasses import asdict
 
-import numpy as np
 from PIL import ImageFont, ImageDraw, Image, ImageFilter
-import pandas as pd
-import matplotlib.pyplot as plt
-import io
 
-from matplotlib.backends.backend_agg import FigureCanvasAgg
-from matplotlib.table import Table
 from io import BytesIO
-from pygments import highlight
-from pygments.lexers import get_lexer_by_name
-from pygments.formatters import ImageFormatter
-from typing import Tuple, List
+from typing import Tuple, List, Optional
+
+from src.image_generation.display_list import DisplayList, Rasterizer
+from src.image_generation.gfm_table import (
+    GfmTable,
+    fit_column_widths,
+    parse_gfm_table,
+    split_cell_lines,
+)
+from src.image_generation.line_breaker import LineBreaker
+from src.image_generation.render_context import RenderContext
+from src.image_generation.text_measurer import TextMeasurer
+from src.utils.render_cache import RenderCache, file_fingerprint
+
+
+class MeasureDraw:
+    """
+    Stand-in for ``ImageDraw.ImageDraw`` used in measure mode.
+
+    Drawing calls are ignored, only the text measuring calls the strategies rely on
+    are answered, so a block can be laid out without touching any pixels.
+    """
 
-from pygments.styles import get_style_by_name
+    def textbbox(self, xy, text, font=None, *args, **kwargs) -> Tuple[int, int, int, int]:
+        left, top, right, bottom = TextMeasurer().bbox(font, text)
+        return left + xy[0], top + xy[1], right + xy[0], bottom + xy[1]
 
-from src.utils.config import Config
-from src.utils.other import hex_to_rgba
+    def _ignore(self, *args, **kwargs) -> None:
+        pass
+
+    text = _ignore
+    line = _ignore
+    rectangle = _ignore
+    rounded_rectangle = _ignore
+    ellipse = _ignore
+    polygon = _ignore
+    paste = _ignore
 
 
 class DrawStrategy(ABC):
     """
     Abstract base class for different drawing strategies.
+
+    Strategies implement ``render`` against an ``ImageDraw``-like object. ``record``
+    runs it on a ``DisplayList`` that keeps the primitives for a ``Rasterizer``,
+    ``draw`` records and replays them on a real image, while ``measure`` runs it on
+    a ``MeasureDraw`` to compute where the block ends without rasterizing anything.
+
+    Strategies read their margins, colors and fonts from a ``RenderContext``,
+    created from ``Config`` when none is given.
     """
 
-    @abstractmethod
+    def __init__(self, context: Optional[RenderContext] = None):
+        self.context = context if context is not None else RenderContext.from_config()
+        self.settings = self.context.settings
+
     def draw(
         self, img: Image, text: str, font: ImageFont.FreeTypeFont, current_height: int
     ) -> Tuple[Image.Image, int]:
         """
-        Abstract method to be implemented by concrete strategies to draw on the image.
+        Draw the text on the image.
 
         :param img: The image to draw on.
         :param text: The text to be drawn.
         :param font: The font of the text.
         :param current_height: The current height on the image to draw the text.
-        :return: A tuple containing the image with the text drawn and the height of the drawn text in pixels.
+        :return: A tuple containing the image with the text drawn and the height at which the block ends.
+        """
+        display_list = DisplayList(img.size)
+        height = self.record(display_list, text, font, current_height)
+        Rasterizer().replay(display_list, img)
+        return img, height
+
+    def record(
+        self,
+        display_list: DisplayList,
+        text: str,
+        font: ImageFont.FreeTypeFont,
+        current_height: int,
+    ) -> int:
+        """
+        Record the primitives needed to draw the text into a display list.
+
+        :param display_list: The display list of the page.
+        :param text: The text to be drawn.
+        :param font: The font of the text.
+        :param current_height: The current height on the page to draw the text.
+        :return: The height at which the block ends.
+        """
+        return self.render(
+            display_list, display_list.size[0], text, font, current_height
+        )
+
+    def measure(
+        self, width: int, text: str, font: ImageFont.FreeTypeFont, current_height: int
+    ) -> int:
+        """
+        Compute the height at which the block would end, without drawing it.
+
+        :param width: The width of the page.
+        :param text: The text to be measured.
+        :param font: The font of the text.
+        :param current_height: The height at which the block would start.
+        :return: The same height ``draw`` would return for this block.
+        """
+        return self.render(MeasureDraw(), width, text, font, current_height)
+
+    @abstractmethod
+    def render(
+        self, d, width: int, text: str, font: ImageFont.FreeTypeFont, current_height: int
+    ) -> int:
+        """
+        Abstract method to be implemented by concrete strategies to lay out and draw the text.
+
+        :param d: The ``DisplayList`` (or ``MeasureDraw``) to draw with.
+        :param width: The width of the page.
+        :param text: The text to be drawn.
+        :param font: The font of the text.
+        :param current_height: The current height on the image to draw the text.
+        :return: The height at which the block ends.
         """
         pass
 
 
-class DrawDefault:
+class DrawDefault(DrawStrategy):
     def __init__(
         self,
         text_color: str,
+        context: Optional[RenderContext] = None,
     ):
+        super().__init__(context)
+        colors = self.settings.colors
         self.text_color = text_color
-        self.highlight_color = Config()["COLORS"]["HIGHLIGHT"]
-        self.italic_color = Config()["COLORS"].get("ITALIC_COLOR", self.text_color)
-        self.link_color = Config()["COLORS"].get("LINK_COLOR", "#5dade2")
-        self.inline_code_bg = Config()["COLORS"].get("INLINE_CODE_BG", "#282a36")
-        self.inline_code_fg = Config()["COLORS"].get("INLINE_CODE_FG", "#50fa7b")
+        self.highlight_color = colors.highlight
+        self.italic_color = colors.italic
+        self.link_color = colors.link
+        self.inline_code_bg = colors.inline_code_bg
+        self.inline_code_fg = colors.inline_code_fg
 
     def parse_formatted_words(self, text: str) -> List[Tuple[str, str]]:
         """
@@ -176,17 +265,30 @@ class DrawDefault:
             return self.inline_code_fg
         return self.text_color
 
-    def draw(
+    def get_font_for_format(
+        self, font: ImageFont.FreeTypeFont, format_type: str
+    ) -> ImageFont.FreeTypeFont:
+        """Get the bold or italic face of the configured font family, if any."""
+        if format_type not in ("bold", "italic"):
+            return font
+        try:
+            return self.context.font_variant(
+                font.size, bold=format_type == "bold", italic=format_type == "italic"
+            )
+        except IOError:
+            return font
+
+    def render(
         self,
-        img: Image.Image,
+        d,
+        width: int,
         text: str,
         font: ImageFont.FreeTypeFont,
         current_height: int,
-    ) -> Tuple[Image.Image, int]:
-        d = ImageDraw.Draw(img)
-        img_width = img.size[0]
-        left_margin = Config()["PAGE_LAYOUT"].get("LEFT_MARGIN", Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"])
-        right_margin = Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"]
+    ) -> int:
+        img_width = width
+        left_margin = self.settings.page.left_margin
+        right_margin = self.settings.page.right_margin
 
         # Parse the text to get words with formatting
         words = self.parse_formatted_words(text)
@@ -200,14 +302,16 @@ class DrawDefault:
         
         # Word-by-word rendering with line wrapping
         x_position = left_margin
-        space_width = font.getbbox(" ")[2]
+        measurer = TextMeasurer()
+        space_width = measurer.space_width(font)
         
         for word, format_type in words:
             word_stripped = word.rstrip()
             has_trailing_space = word != word_stripped
+            word_font = self.get_font_for_format(font, format_type)
             
             # Get word width
-            bbox = font.getbbox(word_stripped)
+            bbox = measurer.bbox(word_font, word_stripped)
             word_width = bbox[2] - bbox[0]
             
             # Check if we need to wrap to next line
@@ -230,7 +334,7 @@ class DrawDefault:
                 d.rounded_rectangle(bg_rect, radius=4, fill=self.inline_code_bg)
             
             # Draw the word
-            d.text((x_position, current_height), word_stripped, fill=color, font=font)
+            d.text((x_position, current_height), word_stripped, fill=color, font=word_font)
             
             # Update position
             x_position += word_width
@@ -240,26 +344,27 @@ class DrawDefault:
         # Move to next line after finishing
         current_height += int(font.font.height * 1.5)
 
-        return img, current_height
+        return current_height
 
 
-class DrawHeader:
+class DrawHeader(DrawStrategy):
     """Drawing strategy for headers with accent styling."""
     
-    def __init__(self, text_color: str):
+    def __init__(self, text_color: str, context: Optional[RenderContext] = None):
+        super().__init__(context)
         self.text_color = text_color
-        self.header_color = Config()["COLORS"].get("HEADER_COLOR", "#00d4ff")
-        self.accent_color = Config()["COLORS"]["HIGHLIGHT"]
+        self.header_color = self.settings.colors.header
+        self.accent_color = self.settings.colors.highlight
 
-    def draw(
+    def render(
         self,
-        img: Image.Image,
+        d,
+        width: int,
         text: str,
         font: ImageFont.FreeTypeFont,
         current_height: int,
-    ) -> Tuple[Image.Image, int]:
-        d = ImageDraw.Draw(img)
-        left_margin = Config()["PAGE_LAYOUT"].get("LEFT_MARGIN", Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"])
+    ) -> int:
+        left_margin = self.settings.page.left_margin
         
         # Draw accent line before header
         accent_width = 4
@@ -277,47 +382,32 @@ class DrawHeader:
         
         current_height += int(font.font.height * 1.8)
         
-        return img, current_height
+        return current_height
 
 
-class DrawTitle:
+class DrawTitle(DrawStrategy):
     """Drawing strategy for titles with impressive styling."""
     
-    def __init__(self, text_color: str):
+    def __init__(self, text_color: str, context: Optional[RenderContext] = None):
+        super().__init__(context)
         self.text_color = text_color
-        self.title_color = Config()["COLORS"].get("TITLE_COLOR", "#ffffff")
-        self.accent_color = Config()["COLORS"]["HIGHLIGHT"]
+        self.title_color = self.settings.colors.title
+        self.accent_color = self.settings.colors.highlight
 
-    def draw(
+    def render(
         self,
-        img: Image.Image,
+        d,
+        width: int,
         text: str,
         font: ImageFont.FreeTypeFont,
         current_height: int,
-    ) -> Tuple[Image.Image, int]:
-        d = ImageDraw.Draw(img)
-        img_width = img.size[0]
-        left_margin = Config()["PAGE_LAYOUT"].get("LEFT_MARGIN", Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"])
-        right_margin = Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"]
+    ) -> int:
+        img_width = width
+        left_margin = self.settings.page.left_margin
+        right_margin = self.settings.page.right_margin
         max_width = img_width - left_margin - right_margin
         
-        # Word wrap the title if needed
-        words = text.split()
-        lines = []
-        current_line = []
-        
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            bbox = font.getbbox(test_line)
-            if bbox[2] - bbox[0] <= max_width:
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                current_line = [word]
-        
-        if current_line:
-            lines.append(' '.join(current_line))
+        lines = self.wrap(text, font, max_width)
         
         # Draw each line of the title
         for line in lines:
@@ -326,8 +416,7 @@ class DrawTitle:
         
         # Get the width of the first line for underline
         if lines:
-            bbox = font.getbbox(lines[0])
-            text_width = bbox[2] - bbox[0]
+            text_width = TextMeasurer().width(font, lines[0])
             
             # Draw underline accent
             line_y = current_height + 5
@@ -339,206 +428,249 @@ class DrawTitle:
         
         current_height += int(font.font.height * 0.8)
         
-        return img, current_height
-
-
-class DrawTable:
-    """
-    Class that represents a strategy to draw a table on an image using matplotlib.
-    """
-
-    def __init__(self, text_color: str):
-        """
-        Constructor for the DrawTable class.
-
-        :param text_color: The color of the text to be drawn.
-        """
-        self.scale_factor = Config()["TABLE"]["SCALE_FACTOR"]
-        self.background_color = Config()["TABLE"]["BACKGROUND"]
-        self.text_color = Config()["TABLE"]["FOREGROUND"]
-        self.highlight_color = Config()["TABLE"]["HIGHLIGHT"]
-        self.header_fg_color = Config()["TABLE"]["HEADER_FG_COLOR"]
-        self.header_bg_color = Config()["TABLE"]["HEADER_BG_COLOR"]
+        return current_height
 
-    def draw(
-        self, img: Image, text: str, font, current_height: int
-    ) -> Tuple[Image.Image, int]:
+    def wrap(self, text: str, font: ImageFont.FreeTypeFont, max_width: int) -> List[str]:
         """
-        Method to draw the table on the image and return the image and the height of the table.
+        Greedily break the title into lines no wider than ``max_width``.
 
-        :param img: The image to draw on.
-        :param text: The table text to be drawn.
-        :param font: The font of the text.
-        :param current_height: The current height on the image to draw the table.
-        :return: A tuple containing the image with the table drawn on it and the height of the table in pixels.
+        Measuring every candidate line is quadratic in the line length, so the width
+        of a candidate is first estimated from the cached advances of its words.
+        Only candidates within one em of the limit are measured exactly, which gives
+        the same lines as measuring all of them.
         """
-        df = self.text_to_dataframe(text)
-        img_width = img.size[0]
-        table_img = self.dataframe_to_matplotlib(df, img_width * 0.8)
-        self.add_matplotlib_to_image(img, table_img, current_height)
-
-        # Calculate the height of the table
-        table_height = table_img.size[1]
-
-        return img, table_height * self.scale_factor + 20
-
-    def text_to_dataframe(self, text: str) -> pd.DataFrame:
-        """
-        Method to convert the text to a pandas DataFrame.
-
-        :param text: The table text to be converted.
-        :return: The text converted to a pandas DataFrame.
-        """
-        cleaned_table_str = re.sub(
-            r"(?<=\|)( *[\S ]*? *)(?=\|)", lambda match: match.group(0).strip(), text
-        )
-        df = (
-            pd.read_table(
-                io.StringIO(cleaned_table_str), sep="|", header=0, skipinitialspace=True
-            )
-            .dropna(axis=1, how="all")
-            .iloc[1:]
-        )
-        df.columns = df.columns.str.strip()
-        return df
+        measurer = TextMeasurer()
+        space_length = measurer.length(font, " ")
+        lines = []
+        current_line = []
+        line_length = 0.0
 
-    def dataframe_to_matplotlib(self, df: pd.DataFrame, img_width: int) -> Image:
-        """
-        Method to convert the pandas DataFrame to a matplotlib table and then to an image.
+        for word in text.split():
+            word_length = measurer.length(font, word)
+            if current_line:
+                estimate = line_length + space_length + word_length
+            else:
+                estimate = word_length
 
-        :param df: The pandas DataFrame to be converted.
-        :param img_width: The width of the image to fit the table.
-        :return: The table as an image.
-        """
-        img_width *= 0.9
-        fig_width = img_width / 80  # Convert pixel to inches, assuming 80 dpi
-        fig_height = Config()["TABLE"]["HEIGHT"]
-
-        # Set transparent background with the facecolor parameter
-        fig, ax = plt.subplots(figsize=(fig_width, fig_height), facecolor="none")
-        ax.axis("off")
-        table = Table(ax, bbox=[0, 0, 1, 1])
-
-        nrows, ncols = df.shape
-        width, height = 1.0 / ncols, 1.0 / nrows
-
-        wrapping_width = 14  # TODO: Move to CONFIG Adjust this value as needed
-
-        for (i, j), val in np.ndenumerate(df):
-            # Split the cell text on '<br/>' and join with newline characters
-            split_vals = str(val).split('<br>')
-            wrapped_vals = [textwrap.fill(part, width=wrapping_width) for part
-                            in split_vals]
-            val = '\n\n'.join(wrapped_vals)
-
-            cell = table.add_cell(
-                i,
-                j,
-                width=width,
-                height=height,
-                text=val,
-                loc="left",
-                facecolor=self.background_color,
-            )
+            if estimate <= max_width - font.size:
+                fits = True
+            elif estimate > max_width + font.size:
+                fits = False
+            else:
+                test_line = ' '.join(current_line + [word])
+                fits = measurer.width(font, test_line) <= max_width
 
-            # if re.match(r"\*.*\*$", val):
-            if val.startswith("*") or val.endswith("*"):
-                cell.get_text().set_color(self.highlight_color)  # Set color to red
-                unwrapped_val = val.replace("*", "")
-                cell.get_text().set_text(
-                    textwrap.fill(unwrapped_val, width=wrapping_width)
-                )
+            if fits:
+                current_line.append(word)
+                line_length = estimate
             else:
-                cell.get_text().set_color(self.text_color)
-
-        for i, label in enumerate(df.columns):
-            label = textwrap.fill(str(label), width=wrapping_width)
-            cell = table.add_cell(
-                -1,
-                i,
-                width=width,
-                height=0.2,
-                text=label,
-                loc="center",
-                facecolor=self.header_bg_color,
-            )
-            cell.get_text().set_color(self.header_fg_color)
+                if current_line:
+                    lines.append(' '.join(current_line))
+                current_line = [word]
+                line_length = word_length
 
-        table.auto_set_font_size(False)
-        table.set_fontsize(16)
-        table.scale(1, 1.5)
+        if current_line:
+            lines.append(' '.join(current_line))
 
-        ax.add_table(table)
-        plt.tight_layout()
+        return lines
 
-        canvas = FigureCanvasAgg(fig)
-        canvas.draw()
 
-        # Get the buffer in RGBA format
-        buf = canvas.buffer_rgba()
-        array = np.asarray(buf)
-        table_img = Image.fromarray(array)
+class DrawTable(DrawStrategy):
+    """
+    Class that represents a strategy to draw a GitHub Flavored Markdown table.
+
+    Cells are measured and wrapped with the page font, and the header, the rows
+    and the borders are drawn from the TABLE section of the configuration.
+    """
 
-        plt.close(fig)
-        return table_img
+    cell_padding = 14
 
-    def add_matplotlib_to_image(
-        self, img: Image, table_img: Image, current_height: int
-    ) -> Image:
+    def __init__(self, text_color: str, context: Optional[RenderContext] = None):
         """
-        Method to add the table image to the main image.
+        Constructor for the DrawTable class.
 
-        :param img: The main image.
-        :param table_img: The table image.
-        :param current_height: The current height on the main image to add the table.
-        :return: The main image with the table added.
+        :param text_color: The color of the text to be drawn.
+        :param context: The render context, created from the configuration when None.
         """
+        super().__init__(context)
+        table = self.settings.table
+        self.scale_factor = table.scale_factor
+        self.background_color = table.background
+        self.alt_row_color = table.alt_row_bg
+        self.text_color = table.foreground
+        self.highlight_color = table.highlight
+        self.header_fg_color = table.header_fg
+        self.header_bg_color = table.header_bg
+        self.border_color = table.border
+
+    def render(self, d, width: int, text: str, font, current_height: int) -> int:
+        """
+        Method to draw the table and return the height below it.
 
-        r, g, b, a = table_img.split()
-        rgb_img = Image.merge("RGB", (r, g, b))
-
-        # Resize the image and its alpha channel separately
-        new_width = int(table_img.width * self.scale_factor)
-        new_height = int(table_img.height * self.scale_factor)
-        resized_img = rgb_img.resize((new_width, new_height), Image.LANCZOS)
-        resized_alpha = a.resize((new_width, new_height), Image.LANCZOS)
-
-        # Merge them back together
-        resized_table_img = Image.merge(
-            "RGBA",
-            (
-                resized_img.split()[0],
-                resized_img.split()[1],
-                resized_img.split()[2],
-                resized_alpha,
-            ),
+        :param d: The display list to draw with.
+        :param width: The width of the page.
+        :param text: The table text to be drawn.
+        :param font: The font of the page, scaled by the table ``SCALE_FACTOR``.
+        :param current_height: The current height on the image to draw the table.
+        :return: The height on the image below the table.
+        """
+        table = parse_gfm_table(text)
+        cell_font = self.get_cell_font(font)
+        header_font = self.get_cell_font(font, bold=True)
+        line_height = int(cell_font.font.height * 1.3)
+
+        left_margin = self.settings.page.left_margin
+        right_margin = self.settings.page.right_margin
+        column_widths = self.get_column_widths(
+            table, cell_font, header_font, width - left_margin - right_margin
         )
 
-        # Calculate horizontal offset for centering
-        horizontal_offset = (img.width - resized_table_img.width) // 2
+        rows = [(table.header, header_font)] + [(row, cell_font) for row in table.rows]
+        top = current_height
+        row_tops = []
+        for row_idx, (cells, row_font) in enumerate(rows):
+            # Wrap every cell first, the tallest one sets the height of the row
+            cell_lines = [
+                self.wrap_cell(cell, row_font, column_width - 2 * self.cell_padding)
+                for cell, column_width in zip(cells, column_widths)
+            ]
+            row_height = max(len(lines) for lines in cell_lines) * line_height
+            row_height += 2 * self.cell_padding
+
+            if row_idx == 0:
+                fill = self.header_bg_color
+            else:
+                fill = self.background_color if row_idx % 2 else self.alt_row_color
+            d.rectangle(
+                [(left_margin, top), (left_margin + sum(column_widths), top + row_height)],
+                fill=fill,
+            )
 
-        # Paste the resized table_img onto the main image
-        img.paste(
-            resized_table_img,
-            (horizontal_offset, current_height),
-            mask=resized_table_img.split()[3],
+            x = left_margin
+            for column_idx, (cell, lines) in enumerate(zip(cells, cell_lines)):
+                alignment = table.alignments[column_idx]
+                if row_idx == 0:
+                    color = self.header_fg_color
+                    alignment = alignment or "center"
+                elif cell.startswith("*") or cell.endswith("*"):
+                    color = self.highlight_color
+                else:
+                    color = self.text_color
+
+                # Center the lines of shorter cells vertically
+                y = top + (row_height - len(lines) * line_height) // 2
+                y += (line_height - row_font.font.height) // 2
+                for line in lines:
+                    self.draw_cell_line(
+                        d, line, row_font, color, alignment, x, column_widths[column_idx], y
+                    )
+                    y += line_height
+                x += column_widths[column_idx]
+
+            row_tops.append(top)
+            top += row_height
+
+        self.draw_grid(d, column_widths, row_tops, left_margin, top)
+
+        return int(top + 20)
+
+    def get_cell_font(self, font: ImageFont.FreeTypeFont, bold: bool = False) -> ImageFont.FreeTypeFont:
+        """Scale the page font by the table ``SCALE_FACTOR``, using the bold face for the header."""
+        size = max(1, int(font.size * self.scale_factor))
+        if bold:
+            try:
+                return self.context.font_variant(size, bold=True)
+            except IOError:
+                pass
+        if size == font.size:
+            return font
+        return self.context.fonts.get(font.path, size, font.index, self.context.layout_engine)
+
+    def get_column_widths(
+        self,
+        table: GfmTable,
+        cell_font: ImageFont.FreeTypeFont,
+        header_font: ImageFont.FreeTypeFont,
+        available_width: int,
+    ) -> List[int]:
+        """Measure the widest line of every column and fit the columns in the available width."""
+        measurer = TextMeasurer()
+        natural_widths = [0.0] * table.column_count
+        rows = [(table.header, header_font)] + [(row, cell_font) for row in table.rows]
+        for cells, row_font in rows:
+            for idx, cell in enumerate(cells):
+                for line in split_cell_lines(self.strip_highlight(cell)):
+                    natural_widths[idx] = max(natural_widths[idx], measurer.length(row_font, line))
+
+        return fit_column_widths(
+            [width + 2 * self.cell_padding for width in natural_widths], available_width
         )
 
-        return img
-
-
-class DrawCode:
+    def wrap_cell(self, cell: str, font: ImageFont.FreeTypeFont, max_width: int) -> List[str]:
+        """Break a cell into lines at its ``<br>`` tags and wherever it is wider than the column."""
+        lines = []
+        for part in split_cell_lines(self.strip_highlight(cell)):
+            wrapped = LineBreaker().break_lines(part, font, max_width)
+            lines.extend([line.text for line in wrapped] or [""])
+        return lines
+
+    @staticmethod
+    def strip_highlight(cell: str) -> str:
+        """Cells starting or ending with ``*`` are highlighted, the stars are not drawn."""
+        if cell.startswith("*") or cell.endswith("*"):
+            return cell.replace("*", "")
+        return cell
+
+    def draw_cell_line(
+        self, d, line: str, font, color: str, alignment: Optional[str], x: int, column_width: int, y: int
+    ) -> None:
+        line_width = TextMeasurer().length(font, line)
+        if alignment == "center":
+            text_x = x + (column_width - line_width) / 2
+        elif alignment == "right":
+            text_x = x + column_width - self.cell_padding - line_width
+        else:
+            text_x = x + self.cell_padding
+        d.text((int(text_x), y), line, fill=color, font=font)
+
+    def draw_grid(
+        self, d, column_widths: List[int], row_tops: List[int], left: int, bottom: int
+    ) -> None:
+        """Draw the outer border and the lines between columns and rows."""
+        top = row_tops[0]
+        right = left + sum(column_widths)
+        x = left
+        for column_width in column_widths[:-1]:
+            x += column_width
+            d.line([(x, top), (x, bottom)], fill=self.border_color, width=1)
+
+        for y in row_tops[1:]:
+            d.line([(left, y), (right, y)], fill=self.border_color, width=1)
+        d.rectangle([(left, top), (right, bottom)], outline=self.border_color, width=1)
+
+
+class DrawCode(DrawStrategy):
     """
     Drawing strategy for a block of code.
+
+    Pygments is imported on first use, documents without code never load it.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        render_cache: Optional[RenderCache] = None,
+        context: Optional[RenderContext] = None,
+    ):
         """
         Constructor for the DrawCode class.
 
-        :param lexer_name: The name of the lexer to use for syntax highlighting, e.g., "python".
+        :param render_cache: Cache of the highlighted code blocks, None to always render.
+        :param context: The render context, created from the configuration when None.
         """
-        self.scale_factor = Config()["CODE_BLOCK"]["SCALE_FACTOR"]
+        super().__init__(context)
+        self.render_cache = render_cache
+        self.scale_factor = self.settings.code_block.scale_factor
+        self._metrics_formatter = None
 
     def _extract_lexer_name(self, text: str) -> Tuple[str, str]:
         """
@@ -563,6 +695,8 @@ class DrawCode:
 
     def _get_lexer(self, lexer_name: str):
         """Get the lexer based on the lexer name."""
+        from pygments.lexers import get_lexer_by_name
+
         try:
             return get_lexer_by_name(lexer_name)
         except:
@@ -570,6 +704,25 @@ class DrawCode:
                 "text"
             )  # Default to basic lexer for unknown language
 
+    def _get_metrics_formatter(self):
+        """Get a formatter used only to read line metrics, its fonts are loaded once."""
+        if self._metrics_formatter is None:
+            from pygments.formatters import ImageFormatter
+            from pygments.styles import get_style_by_name
+
+            self._metrics_formatter = ImageFormatter(
+                style=get_style_by_name("vim"), line_numbers=False
+            )
+        return self._metrics_formatter
+
+    def font_paths(self) -> List[str]:
+        """Get the files of the system fonts Pygments highlights with, they are not part of the config."""
+        try:
+            fonts = self._get_metrics_formatter().fonts.fonts.values()
+        except Exception:
+            return []
+        return sorted({font.path for font in fonts})
+
     def _create_rounded_rect(
         self, width: int, height: int, corner_radius: int = 10, padding: int = 10
     ) -> Image.Image:
@@ -591,7 +744,7 @@ class DrawCode:
 
         draw.rounded_rectangle(
             (0, 0, rounded_rect.width, rounded_rect.height),
-            fill=hex_to_rgba(Config()["CODE_BLOCK"]["BACKGROUND"]),
+            fill=self.settings.code_block.background,
             radius=corner_radius,
         )
 
@@ -633,26 +786,54 @@ class DrawCode:
             img.putalpha(alpha)
         return img
 
-    def _paste_onto_image(self, img, rounded_rect, current_height):
+    def _paste_onto_image(self, d, img_width, rounded_rect, current_height):
         scaled_rounded_rect_width = int(rounded_rect.width * self.scale_factor)
-        x_position = (img.width - scaled_rounded_rect_width) // 2
+        x_position = (img_width - scaled_rounded_rect_width) // 2
 
         scaled_rounded_rect_height = int(rounded_rect.height * self.scale_factor)
 
         scaled_rounded_rect = rounded_rect.resize(
             (scaled_rounded_rect_width, scaled_rounded_rect_height)
         )
-        img.paste(
-            scaled_rounded_rect,
-            (x_position, current_height),
-            scaled_rounded_rect,
-        )
+        d.paste(scaled_rounded_rect, (x_position, current_height))
 
-        return img, current_height + scaled_rounded_rect.size[1]
+        return current_height + scaled_rounded_rect.size[1]
+
+    def render(self, d, width: int, code: str, _, current_height: int) -> int:
+        current_height += 10
+        rounded_rect = self.get_code_image(code)
+        height = self._paste_onto_image(d, width, rounded_rect, current_height)
+
+        return height + 50 # make configurable
+
+    def get_code_image(self, code: str) -> Image.Image:
+        """Highlight the code inside its window frame, or load it from the render cache."""
+        key = None
+        if self.render_cache is not None:
+            import pygments
+
+            key = RenderCache.key(
+                "code",
+                code,
+                asdict(self.settings.code_block),
+                pygments.__version__,
+                [file_fingerprint(path) for path in self.font_paths()],
+            )
+            rounded_rect = self.render_cache.get("code", key)
+            if rounded_rect is not None:
+                return rounded_rect
+
+        rounded_rect = self._highlight(code)
+
+        if key is not None:
+            self.render_cache.put("code", key, rounded_rect)
+        return rounded_rect
+
+    def _highlight(self, code: str) -> Image.Image:
+        from pygments import highlight
+        from pygments.formatters import ImageFormatter
+        from pygments.styles import get_style_by_name
 
-    def draw(
-        self, img: Image.Image, code: str, _, current_height: int
-    ) -> Tuple[Image.Image, int]:
         lexer_name, cleaned_code = self._extract_lexer_name(code)
         lexer = self._get_lexer(lexer_name)
 
@@ -661,60 +842,80 @@ class DrawCode:
             lexer,
             ImageFormatter(style=get_style_by_name("vim"), line_numbers=False),
         )
-        current_height += 10
         code_img = Image.open(BytesIO(highlighted_code))
         code_img = self._ensure_alpha_channel(code_img)
 
+        code_block = self.settings.code_block
         rounded_rect = self._create_rounded_rect(
             code_img.width,
-            code_img.height + Config()["CODE_BLOCK"]["TOP_PADDING"],
-            Config()["CODE_BLOCK"]["RADIUS"],
-            Config()["CODE_BLOCK"]["RADIUS"],
+            code_img.height + code_block.top_padding,
+            code_block.radius,
+            code_block.radius,
         )
         rounded_rect.paste(
             code_img,
-            (10, 10 + Config()["CODE_BLOCK"]["TOP_PADDING"]),
+            (10, 10 + code_block.top_padding),
             code_img,
         )  # 10 is the padding
 
-        img, height = self._paste_onto_image(img, rounded_rect, current_height)
+        return rounded_rect
 
-        return img, height + 50 # make configurable
+    def measure(self, width: int, code: str, _, current_height: int) -> int:
+        """
+        Compute the height ``draw`` returns for the code block without rendering it.
 
+        The highlighted image is as tall as the number of lines the lexer produces
+        times the formatter line height, so tokenizing the code is enough.
+        """
+        lexer_name, cleaned_code = self._extract_lexer_name(code)
+        lexer = self._get_lexer(lexer_name)
+        formatter = self._get_metrics_formatter()
 
-class DrawBulletList:
+        line_count = sum(value.count("\n") for _, value in lexer.get_tokens(cleaned_code))
+        code_height = (
+            line_count * (formatter.fonth + formatter.line_pad) + 2 * formatter.image_pad
+        )
+        radius = self.settings.code_block.radius
+        rounded_rect_height = code_height + self.settings.code_block.top_padding + 2 * radius
+
+        return current_height + 10 + int(rounded_rect_height * self.scale_factor) + 50
+
+
+class DrawBulletList(DrawStrategy):
     """
     Drawing strategy for bullet lists with stylish bullet points.
     """
 
-    def __init__(self, text_color: str):
+    def __init__(self, text_color: str, context: Optional[RenderContext] = None):
+        super().__init__(context)
         self.text_color = text_color
-        self.highlight_color = Config()["COLORS"]["HIGHLIGHT"]
-        self.bullet_color = Config()["COLORS"].get("BULLET_COLOR", self.highlight_color)
+        self.highlight_color = self.settings.colors.highlight
+        self.bullet_color = self.settings.colors.bullet
 
-    def draw(
+    def render(
         self,
-        img: Image.Image,
+        d,
+        width: int,
         text: str,
         font: ImageFont.FreeTypeFont,
         current_height: int,
-    ) -> Tuple[Image.Image, int]:
-        d = ImageDraw.Draw(img)
-        left_margin = Config()["PAGE_LAYOUT"].get("LEFT_MARGIN", Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"])
-        right_margin = Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"]
+    ) -> int:
+        left_margin = self.settings.page.left_margin
+        right_margin = self.settings.page.right_margin
         bullet_indent = 30
-        img_width = img.size[0]
+        img_width = width
         
         items = text.split("\n")
-        char_per_line = (img_width - left_margin - bullet_indent - right_margin - 50) // font.getbbox("a")[2]
+        bullet_radius = 6
+        bullet_x = left_margin + bullet_indent
+        text_x = bullet_x + bullet_radius * 3 + 5
+        max_width = img_width - right_margin - text_x
         
         for item in items:
             if not item.strip():
                 continue
                 
             # Draw bullet point (filled circle with glow effect)
-            bullet_radius = 6
-            bullet_x = left_margin + bullet_indent
             bullet_y = current_height + font.font.height // 2
             
             # Draw outer glow
@@ -738,13 +939,10 @@ class DrawBulletList:
             )
             
             # Wrap text for long items
-            wrapped_lines = textwrap.wrap(item, width=int(char_per_line), break_long_words=False)
-            text_x = bullet_x + bullet_radius * 3 + 5
-            
-            for idx, line in enumerate(wrapped_lines):
+            for line in LineBreaker().break_lines(item, font, max_width):
                 d.text(
                     (text_x, current_height),
-                    line,
+                    line.text,
                     fill=self.text_color,
                     font=font,
                 )
@@ -752,34 +950,38 @@ class DrawBulletList:
             
             current_height += 8  # Extra spacing between items
         
-        return img, int(current_height + 15)
+        return int(current_height + 15)
 
 
-class DrawNumberedList:
+class DrawNumberedList(DrawStrategy):
     """
     Drawing strategy for numbered/ordered lists with modern styling.
     """
 
-    def __init__(self, text_color: str):
+    def __init__(self, text_color: str, context: Optional[RenderContext] = None):
+        super().__init__(context)
         self.text_color = text_color
-        self.highlight_color = Config()["COLORS"]["HIGHLIGHT"]
-        self.number_color = Config()["COLORS"].get("NUMBER_COLOR", self.highlight_color)
+        self.highlight_color = self.settings.colors.highlight
+        self.number_color = self.settings.colors.number
 
-    def draw(
+    def render(
         self,
-        img: Image.Image,
+        d,
+        width: int,
         text: str,
         font: ImageFont.FreeTypeFont,
         current_height: int,
-    ) -> Tuple[Image.Image, int]:
-        d = ImageDraw.Draw(img)
-        left_margin = Config()["PAGE_LAYOUT"].get("LEFT_MARGIN", Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"])
-        right_margin = Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"]
+    ) -> int:
+        left_margin = self.settings.page.left_margin
+        right_margin = self.settings.page.right_margin
         number_indent = 30
-        img_width = img.size[0]
+        img_width = width
         
         items = text.split("\n")
-        char_per_line = (img_width - left_margin - number_indent - right_margin - 80) // font.getbbox("a")[2]
+        circle_radius = 14
+        circle_x = left_margin + number_indent
+        text_x = circle_x + circle_radius * 2 + 15
+        max_width = img_width - right_margin - text_x
         
         for idx, item in enumerate(items, 1):
             if not item.strip():
@@ -787,8 +989,6 @@ class DrawNumberedList:
             
             # Draw number in a circle with gradient-like effect
             number_str = str(idx)
-            circle_radius = 14
-            circle_x = left_margin + number_indent
             circle_y = current_height + font.font.height // 2
             
             # Draw outer ring
@@ -813,7 +1013,7 @@ class DrawNumberedList:
             
             # Draw number centered in circle
             try:
-                number_font = ImageFont.truetype(Config()["PATHS"]["FONT"], size=font.size - 4)
+                number_font = self.context.font(font.size - 4)
             except Exception:
                 number_font = font
             
@@ -823,7 +1023,7 @@ class DrawNumberedList:
             text_height = bbox[3] - bbox[1]
             
             # Use background color for number text to ensure contrast
-            number_text_color = Config()["COLORS"].get("BACKGROUND", "#0f0f23")
+            number_text_color = self.settings.colors.background
             d.text(
                 (circle_x - text_width // 2, circle_y - text_height // 2 - 2),
                 number_str,
@@ -832,13 +1032,10 @@ class DrawNumberedList:
             )
             
             # Wrap text for long items
-            wrapped_lines = textwrap.wrap(item, width=int(char_per_line), break_long_words=False)
-            text_x = circle_x + circle_radius * 2 + 15
-            
-            for line in wrapped_lines:
+            for line in LineBreaker().break_lines(item, font, max_width):
                 d.text(
                     (text_x, current_height),
-                    line,
+                    line.text,
                     fill=self.text_color,
                     font=font,
                 )
@@ -846,46 +1043,47 @@ class DrawNumberedList:
             
             current_height += 10  # Extra spacing between items
         
-        return img, int(current_height + 15)
+        return int(current_height + 15)
 
 
-class DrawBlockquote:
+class DrawBlockquote(DrawStrategy):
     """
     Drawing strategy for blockquotes with a stylish left border and background.
     """
 
-    def __init__(self, text_color: str):
+    def __init__(self, text_color: str, context: Optional[RenderContext] = None):
+        super().__init__(context)
         self.text_color = text_color
-        self.quote_color = Config()["COLORS"].get("QUOTE_COLOR", "#888888")
-        self.border_color = Config()["COLORS"].get("QUOTE_BORDER", Config()["COLORS"]["HIGHLIGHT"])
+        self.quote_color = self.settings.colors.quote
+        self.border_color = self.settings.colors.quote_border
 
-    def draw(
+    def render(
         self,
-        img: Image.Image,
+        d,
+        width: int,
         text: str,
         font: ImageFont.FreeTypeFont,
         current_height: int,
-    ) -> Tuple[Image.Image, int]:
-        d = ImageDraw.Draw(img)
-        left_margin = Config()["PAGE_LAYOUT"].get("LEFT_MARGIN", Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"])
-        right_margin = Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"]
+    ) -> int:
+        left_margin = self.settings.page.left_margin
+        right_margin = self.settings.page.right_margin
         border_width = 4
         quote_indent = 30
-        img_width = img.size[0]
+        img_width = width
         
         start_height = current_height
-        lines = text.split("\n")
-        char_per_line = (img_width - left_margin - quote_indent - right_margin - 100) // font.getbbox("a")[2]
+        bg_padding = 15
+        text_x = left_margin + quote_indent + 20
+        max_width = img_width - right_margin - bg_padding - text_x
         
-        # Calculate total height first for background
-        temp_height = current_height
+        # Wrap once, the lines give the height of the background and are then drawn
+        breaker = LineBreaker()
         all_wrapped_lines = []
-        for line in lines:
+        for line in text.split("\n"):
             if not line.strip():
                 all_wrapped_lines.append(None)  # Empty line marker
             else:
-                wrapped = textwrap.wrap(line, width=int(char_per_line), break_long_words=False)
-                all_wrapped_lines.extend(wrapped)
+                all_wrapped_lines.extend(breaker.break_lines(line, font, max_width))
         
         # Draw semi-transparent background
         total_line_height = sum(
@@ -893,7 +1091,6 @@ class DrawBlockquote:
             for line in all_wrapped_lines
         )
         
-        bg_padding = 15
         bg_rect = [
             left_margin + quote_indent - bg_padding,
             start_height - bg_padding,
@@ -901,26 +1098,21 @@ class DrawBlockquote:
             start_height + total_line_height + bg_padding
         ]
         # Draw subtle background using a darker shade of the background color
-        quote_bg = Config()["COLORS"].get("INLINE_CODE_BG", "#1a1a2e")
-        d.rounded_rectangle(bg_rect, radius=8, fill=quote_bg)
+        d.rounded_rectangle(bg_rect, radius=8, fill=self.settings.colors.quote_bg)
         
         # Draw quote text
-        for line in lines:
-            if not line.strip():
+        for line in all_wrapped_lines:
+            if line is None:
                 current_height += int(font.font.height * 0.5)
                 continue
             
-            wrapped_lines = textwrap.wrap(line, width=int(char_per_line), break_long_words=False)
-            text_x = left_margin + quote_indent + 20
-            
-            for wrapped_line in wrapped_lines:
-                d.text(
-                    (text_x, current_height),
-                    wrapped_line,
-                    fill=self.quote_color,
-                    font=font,
-                )
-                current_height += int(font.font.height * 1.4)
+            d.text(
+                (text_x, current_height),
+                line.text,
+                fill=self.quote_color,
+                font=font,
+            )
+            current_height += int(font.font.height * 1.4)
         
         # Draw left border
         border_x = left_margin + quote_indent
@@ -932,29 +1124,30 @@ class DrawBlockquote:
             fill=self.border_color
         )
         
-        return img, int(current_height + 25)
+        return int(current_height + 25)
 
 
-class DrawHorizontalRule:
+class DrawHorizontalRule(DrawStrategy):
     """
     Drawing strategy for horizontal rules/dividers with modern styling.
     """
 
-    def __init__(self, text_color: str):
-        self.line_color = Config()["COLORS"].get("DIVIDER_COLOR", "#555555")
-        self.accent_color = Config()["COLORS"]["HIGHLIGHT"]
+    def __init__(self, text_color: str, context: Optional[RenderContext] = None):
+        super().__init__(context)
+        self.line_color = self.settings.colors.divider
+        self.accent_color = self.settings.colors.highlight
 
-    def draw(
+    def render(
         self,
-        img: Image.Image,
+        d,
+        width: int,
         text: str,
         font: ImageFont.FreeTypeFont,
         current_height: int,
-    ) -> Tuple[Image.Image, int]:
-        d = ImageDraw.Draw(img)
-        left_margin = Config()["PAGE_LAYOUT"].get("LEFT_MARGIN", Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"])
-        right_margin = Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"]
-        img_width = img.size[0]
+    ) -> int:
+        left_margin = self.settings.page.left_margin
+        right_margin = self.settings.page.right_margin
+        img_width = width
         
         # Add some vertical spacing
         current_height += 25
@@ -1000,35 +1193,39 @@ class DrawHorizontalRule:
         
         current_height += 35
         
-        return img, int(current_height)
+        return int(current_height)
 
 
-class DrawTaskList:
+class DrawTaskList(DrawStrategy):
     """
     Drawing strategy for task lists (checkboxes) with modern styling.
     """
 
-    def __init__(self, text_color: str):
+    def __init__(self, text_color: str, context: Optional[RenderContext] = None):
+        super().__init__(context)
         self.text_color = text_color
-        self.highlight_color = Config()["COLORS"]["HIGHLIGHT"]
-        self.checked_color = Config()["COLORS"].get("BULLET_COLOR", self.highlight_color)
-        self.unchecked_color = Config()["COLORS"].get("DIVIDER_COLOR", "#555555")
+        self.highlight_color = self.settings.colors.highlight
+        self.checked_color = self.settings.colors.bullet
+        self.unchecked_color = self.settings.colors.divider
 
-    def draw(
+    def render(
         self,
-        img: Image.Image,
+        d,
+        width: int,
         text: str,
         font: ImageFont.FreeTypeFont,
         current_height: int,
-    ) -> Tuple[Image.Image, int]:
-        d = ImageDraw.Draw(img)
-        left_margin = Config()["PAGE_LAYOUT"].get("LEFT_MARGIN", Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"])
-        right_margin = Config()["PAGE_LAYOUT"]["RIGHT_MARGIN"]
+    ) -> int:
+        left_margin = self.settings.page.left_margin
+        right_margin = self.settings.page.right_margin
         checkbox_indent = 30
-        img_width = img.size[0]
+        img_width = width
         
         items = text.split("\n")
-        char_per_line = (img_width - left_margin - checkbox_indent - right_margin - 70) // font.getbbox("a")[2]
+        box_size = 18
+        box_x = left_margin + checkbox_indent
+        text_x = box_x + box_size + 15
+        max_width = img_width - right_margin - text_x
         
         for item in items:
             if not item.strip() or ":" not in item:
@@ -1039,8 +1236,6 @@ class DrawTaskList:
             is_checked = state == "checked"
             
             # Draw checkbox
-            box_size = 18
-            box_x = left_margin + checkbox_indent
             box_y = current_height + (font.font.height - box_size) // 2
             
             # Draw checkbox outline
@@ -1065,7 +1260,7 @@ class DrawTaskList:
                     fill=self.checked_color
                 )
                 # Draw check symbol using background color for contrast
-                check_color = Config()["COLORS"].get("BACKGROUND", "#0f0f23")
+                check_color = self.settings.colors.background
                 check_points = [
                     (box_x + 5, box_y + box_size // 2),
                     (box_x + box_size // 2 - 1, box_y + box_size - 6),
@@ -1073,17 +1268,14 @@ class DrawTaskList:
                 ]
                 d.line(check_points, fill=check_color, width=2)
             
-            # Wrap text for long items
-            wrapped_lines = textwrap.wrap(item_text, width=int(char_per_line), break_long_words=False)
-            text_x = box_x + box_size + 15
-            
             # Use strikethrough color for checked items
             text_color = self.unchecked_color if is_checked else self.text_color
             
-            for line in wrapped_lines:
+            # Wrap text for long items
+            for line in LineBreaker().break_lines(item_text, font, max_width):
                 d.text(
                     (text_x, current_height),
-                    line,
+                    line.text,
                     fill=text_color,
                     font=font,
                 )
@@ -1091,4 +1283,4 @@ class DrawTaskList:
             
             current_height += 8  # Extra spacing between items
         
-        return img, int(current_height + 15)
+        return int(current_height + 15)
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from typing import Iterable, Mapping, Optional, Tuple
+
+from PIL import ImageFont
+
+from src.utils.fork_safety import fork_safe_lock
+from src.utils.config import Config, singleton
+
+# Path, size, index and layout engine of a face
+FontKey = Tuple[str, int, int, Optional[ImageFont.Layout]]
+
+# Keys of the optional font family files in the PATHS section of the configuration
+VARIANT_PATH_KEYS = {
+    (False, False): "FONT",
+    (True, False): "FONT_BOLD",
+    (False, True): "FONT_ITALIC",
+    (True, True): "FONT_BOLD_ITALIC",
+}
+
+
+@singleton
+class FontRegistry:
+    """
+    Process wide cache of loaded font faces.
+
+    Loading a face with ``ImageFont.truetype`` parses the font file, which is one of
+    the most expensive steps of rendering a page when done for every block. Faces
+    are kept by path, size and index, the least recently used ones are dropped once
+    ``max_size`` faces are loaded.
+    """
+
+    def __init__(self, max_size: int = 128):
+        """
+        Args:
+            max_size (int): Maximum number of faces kept in memory.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._fonts: "OrderedDict[FontKey, ImageFont.FreeTypeFont]" = OrderedDict()
+        self._lock = fork_safe_lock(self)
+
+    def get(
+        self,
+        path: str,
+        size: int,
+        index: int = 0,
+        layout_engine: Optional[ImageFont.Layout] = None,
+    ) -> ImageFont.FreeTypeFont:
+        """
+        Get a face, loading it on first use.
+
+        Args:
+            path (str): The font file.
+            size (int): The size in pixels.
+            index (int): The face to load from a font collection.
+            layout_engine (Optional[ImageFont.Layout]): The text layout of the
+                face, Pillow's default, raqm when it is available, when not given.
+
+        Returns:
+            ImageFont.FreeTypeFont: The shared face.
+
+        Raises:
+            IOError: If the font file cannot be read.
+        """
+        key = (str(path), int(size), index, layout_engine)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                self.hits += 1
+                return font
+            self.misses += 1
+
+        font = ImageFont.truetype(
+            key[0], size=key[1], index=index, layout_engine=layout_engine
+        )
+
+        with self._lock:
+            self._fonts[key] = font
+            self._fonts.move_to_end(key)
+            while len(self._fonts) > self.max_size:
+                self._fonts.popitem(last=False)
+        return font
+
+    def get_variant(
+        self,
+        size: int,
+        bold: bool = False,
+        italic: bool = False,
+        paths: Optional[Mapping[str, str]] = None,
+        layout_engine: Optional[ImageFont.Layout] = None,
+    ) -> ImageFont.FreeTypeFont:
+        """
+        Get a face of the configured font family.
+
+        The files are read from ``FONT_BOLD``, ``FONT_ITALIC`` and ``FONT_BOLD_ITALIC``
+        in the PATHS section of the configuration, or in ``paths`` when given. A
+        missing bold italic file falls back to the bold or italic one, anything
+        else falls back to ``FONT``.
+        """
+        if paths is None:
+            paths = Config()["PATHS"]
+        for variant in [(bold, italic), (bold, False), (False, italic), (False, False)]:
+            path = paths.get(VARIANT_PATH_KEYS[variant])
+            if path:
+                return self.get(path, size, layout_engine=layout_engine)
+        raise IOError("No font file is configured")
+
+    def preload(self, path: str, sizes: Iterable[int]) -> None:
+        """Load the faces of a font at the given sizes ahead of rendering."""
+        for size in sizes:
+            self.get(path, size)
+
+    def clear(self) -> None:
+        """Drop every face and reset the counters."""
+        with self._lock:
+            self._fonts.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._fonts)
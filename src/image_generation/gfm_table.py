@@ -0,0 +1,130 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+_DELIMITER_CELL = re.compile(r"^:?-+:?$")
+_UNESCAPED_PIPE = re.compile(r"(?<!\\)\|")
+_LINE_BREAK = re.compile(r"<br\s*/?>", re.IGNORECASE)
+
+
+@dataclass
+class GfmTable:
+    """
+    A GitHub Flavored Markdown table.
+
+    Attributes
+    ----------
+    header : List[str]
+        The header cells.
+    alignments : List[Optional[str]]
+        "left", "center" or "right" for every column, None where the delimiter
+        row does not specify it.
+    rows : List[List[str]]
+        The body cells, every row has as many cells as the header.
+    """
+
+    header: List[str]
+    alignments: List[Optional[str]]
+    rows: List[List[str]] = field(default_factory=list)
+
+    @property
+    def column_count(self) -> int:
+        return len(self.header)
+
+
+def split_row(line: str) -> List[str]:
+    """Split a table line into its cells, ``\\|`` is a literal pipe."""
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in _UNESCAPED_PIPE.split(line)]
+
+
+def split_cell_lines(cell: str) -> List[str]:
+    """Split a cell on its ``<br>`` tags."""
+    return [part.strip() for part in _LINE_BREAK.split(cell)]
+
+
+def _alignment(delimiter: str) -> Optional[str]:
+    if delimiter.startswith(":") and delimiter.endswith(":"):
+        return "center"
+    if delimiter.endswith(":"):
+        return "right"
+    if delimiter.startswith(":"):
+        return "left"
+    return None
+
+
+def parse_gfm_table(text: str) -> GfmTable:
+    """
+    Parse the lines of a pipe table.
+
+    The second line is the delimiter row, such as ``|:---|:---:|---:|``, which sets
+    the alignment of the columns. Tables without one are accepted, all their
+    columns are then unaligned. Body rows are padded or cut to the header width.
+
+    Raises:
+        ValueError: If the text has no table line.
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        raise ValueError("The table is empty")
+
+    header = split_row(lines[0])
+    body = lines[1:]
+    alignments: List[Optional[str]] = [None] * len(header)
+
+    if body:
+        delimiters = split_row(body[0])
+        if all(_DELIMITER_CELL.match(cell.replace(" ", "")) for cell in delimiters):
+            body = body[1:]
+            for idx, delimiter in enumerate(delimiters[: len(header)]):
+                alignments[idx] = _alignment(delimiter.replace(" ", ""))
+
+    rows = []
+    for line in body:
+        cells = split_row(line)[: len(header)]
+        rows.append(cells + [""] * (len(header) - len(cells)))
+
+    return GfmTable(header, alignments, rows)
+
+
+def fit_column_widths(natural_widths: Sequence[float], available_width: float) -> List[int]:
+    """
+    Share the available width between the columns of a table.
+
+    Columns get their natural width, the width of their widest line, stretched to
+    fill the available width. When the table does not fit, columns narrower than an
+    equal share keep their natural width and the others split the rest equally, so
+    only the widest columns are wrapped.
+    """
+    total = sum(natural_widths)
+    if total <= 0:
+        return [int(available_width // max(len(natural_widths), 1))] * len(natural_widths)
+
+    if total <= available_width:
+        widths = [available_width * width / total for width in natural_widths]
+    else:
+        widths = list(natural_widths)
+        wide = list(range(len(widths)))
+        remaining = available_width
+        while wide:
+            share = remaining / len(wide)
+            narrow = [idx for idx in wide if natural_widths[idx] <= share]
+            if not narrow:
+                for idx in wide:
+                    widths[idx] = share
+                break
+            for idx in narrow:
+                remaining -= natural_widths[idx]
+                wide.remove(idx)
+
+    # Round while keeping the sum, so the table spans exactly the available width
+    rounded = []
+    position = 0.0
+    for width in widths:
+        rounded.append(int(round(position + width)) - int(round(position)))
+        position += width
+    return rounded
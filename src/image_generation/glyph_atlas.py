@@ -0,0 +1,215 @@
+import math
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageColor, ImageFont
+
+from src.image_generation.text_measurer import TextMeasurer, font_key
+from src.utils.fork_safety import fork_safe_lock
+
+Glyph = Tuple[np.ndarray, Tuple[int, int]]
+# Offset of the top left corner of a glyph mask from the text origin, and the mask
+PlacedGlyph = Tuple[int, int, np.ndarray]
+# The arguments of a text call: xy, text, fill and font
+Run = Tuple[Tuple[float, float], str, Any, ImageFont.FreeTypeFont]
+
+
+def _div255(value: np.ndarray) -> np.ndarray:
+    """Divide by 255 with the same rounding as Pillow's blending."""
+    value = value + 128
+    return ((value >> 8) + value) >> 8
+
+
+class GlyphAtlas:
+    """
+    Text backend that rasterizes every glyph once and composites runs with NumPy.
+
+    ``ImageDraw.text`` renders each glyph of a run with FreeType on every call,
+    although documents draw the same few glyphs thousands of times. The atlas keeps
+    the coverage mask of each glyph per face, places the glyphs of a run with the
+    same pen positions and rounding as Pillow's basic layout, including kerning,
+    and blends the fill color with Pillow's own formula. The output is identical
+    to ``ImageDraw.text``.
+
+    Runs the atlas cannot reproduce exactly, such as multiline text, fractional
+    coordinates or text shaped by raqm, are left to ``ImageDraw.text``. The
+    ``RenderContext`` of the atlas backend loads basic layout faces for that
+    reason, even where Pillow defaults to raqm.
+
+    Both caches are guarded by a lock, so an atlas can be shared by threads.
+    Masks are computed outside of it, a race can only make two threads compute
+    the same mask.
+    """
+
+    def __init__(self, max_runs: int = 20_000, max_glyphs: int = 20_000):
+        """
+        Args:
+            max_runs (int): Maximum number of run coverages kept in memory, the
+                least recently used ones are dropped first.
+            max_glyphs (int): Maximum number of glyph masks kept in memory.
+        """
+        self.max_runs = max_runs
+        self.max_glyphs = max_glyphs
+        self._glyphs: "OrderedDict[Tuple, Glyph]" = OrderedDict()
+        self._run_masks: "OrderedDict[Tuple, Optional[Tuple[int, int, np.ndarray]]]" = (
+            OrderedDict()
+        )
+        self._lock = fork_safe_lock(self)
+        self._measurer = TextMeasurer()
+
+    def supports(self, img: Image.Image, xy, text: str, fill, font) -> bool:
+        return (
+            img.mode in ("RGB", "RGBA")
+            and isinstance(font, ImageFont.FreeTypeFont)
+            and font.layout_engine == ImageFont.Layout.BASIC
+            and isinstance(fill, (str, tuple))
+            and "\n" not in text
+            and all(float(value).is_integer() for value in xy)
+        )
+
+    def draw_text(self, img: Image.Image, xy, text: str, fill, font) -> bool:
+        """
+        Draw a run of text like ``ImageDraw.Draw(img).text(xy, text, fill, font)``.
+
+        Returns:
+            bool: False if the run is not supported and nothing was drawn.
+        """
+        if not self.supports(img, xy, text, fill, font):
+            return False
+        self.draw_runs(img, [(xy, text, fill, font)])
+        return True
+
+    def draw_runs(self, img: Image.Image, runs: Sequence[Run]) -> None:
+        """
+        Draw consecutive supported runs, in order.
+
+        The page is read and written back once for all of them, which is where
+        most of the time goes for short runs such as single words.
+        """
+        placed_runs = []
+        for xy, text, fill, font in runs:
+            run_mask = self._run_mask(font, text)
+            if run_mask is not None:
+                offset_x, offset_y, coverage = run_mask
+                placed_runs.append(
+                    (
+                        int(xy[0]) + offset_x,
+                        int(xy[1]) + offset_y,
+                        coverage,
+                        np.array(self._ink(fill, img.mode), dtype=np.int32),
+                    )
+                )
+        if not placed_runs:
+            return
+
+        left = max(0, min(x for x, _, _, _ in placed_runs))
+        top = max(0, min(y for _, y, _, _ in placed_runs))
+        right = min(img.width, max(x + c.shape[1] for x, _, c, _ in placed_runs))
+        bottom = min(img.height, max(y + c.shape[0] for _, y, c, _ in placed_runs))
+        if left >= right or top >= bottom:
+            return
+
+        region = np.array(img.crop((left, top, right, bottom)), dtype=np.int32)
+        for x, y, coverage, ink in placed_runs:
+            # Clip the run to the visible part of the page
+            x0, y0 = max(x, left), max(y, top)
+            x1 = min(x + coverage.shape[1], right)
+            y1 = min(y + coverage.shape[0], bottom)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            alpha = coverage[y0 - y : y1 - y, x0 - x : x1 - x, None]
+            target = region[y0 - top : y1 - top, x0 - left : x1 - left]
+            target[...] = _div255(target * (255 - alpha) + ink * alpha)
+
+        img.paste(Image.fromarray(region.astype(np.uint8)), (left, top))
+
+    def _run_mask(
+        self, font: ImageFont.FreeTypeFont, text: str
+    ) -> Optional[Tuple[int, int, np.ndarray]]:
+        """
+        Get the coverage of a run and the offset of its top left corner from the text origin.
+
+        Documents repeat the same words over and over, so whole runs are cached too.
+        Returns None for runs without any ink, such as spaces.
+        """
+        key = (font_key(font), text)
+        with self._lock:
+            if key in self._run_masks:
+                self._run_masks.move_to_end(key)
+                return self._run_masks[key]
+
+        placed = self._place(font, text)
+        if placed:
+            left = min(x for x, _, _ in placed)
+            top = min(y for _, y, _ in placed)
+            right = max(x + mask.shape[1] for x, _, mask in placed)
+            bottom = max(y + mask.shape[0] for _, y, mask in placed)
+
+            coverage = np.zeros((bottom - top, right - left), dtype=np.int32)
+            for x, y, mask in placed:
+                target = coverage[
+                    y - top : y - top + mask.shape[0], x - left : x - left + mask.shape[1]
+                ]
+                # Overlapping glyphs are composited over each other, as FreeType
+                # bitmaps are combined by Pillow
+                target[...] = mask + _div255(target * (255 - mask))
+            run_mask = (left, top, coverage)
+        else:
+            run_mask = None
+
+        with self._lock:
+            self._run_masks[key] = run_mask
+            while len(self._run_masks) > self.max_runs:
+                self._run_masks.popitem(last=False)
+        return run_mask
+
+    @staticmethod
+    def _ink(fill, mode: str) -> Tuple[int, ...]:
+        if isinstance(fill, str):
+            return ImageColor.getcolor(fill, mode)
+        if mode == "RGB":
+            return tuple(fill[:3])
+        return tuple(fill) if len(fill) == 4 else (*fill[:3], 255)
+
+    def _place(self, font: ImageFont.FreeTypeFont, text: str) -> List[PlacedGlyph]:
+        """Position the glyphs of a run, keeping the 26.6 pen of Pillow's basic layout."""
+        key = font_key(font)
+        placed = []
+        pen = 0.0
+        for idx, char in enumerate(text):
+            mask, (offset_x, offset_y) = self._glyph(key, font, char)
+            if mask.size:
+                placed.append(
+                    (math.floor(pen + 0.5) + offset_x, offset_y, mask)
+                )
+            if idx + 1 < len(text):
+                pen += self._advance(font, char, text[idx + 1])
+        return placed
+
+    def _advance(self, font: ImageFont.FreeTypeFont, char: str, next_char: str) -> float:
+        """Pen advance from ``char`` to ``next_char``, kerning included."""
+        pair = self._measurer.length(font, char + next_char)
+        return pair - self._measurer.length(font, next_char)
+
+    def _glyph(self, key: Tuple, font: ImageFont.FreeTypeFont, char: str) -> Glyph:
+        with self._lock:
+            glyph = self._glyphs.get((key, char))
+            if glyph is not None:
+                self._glyphs.move_to_end((key, char))
+                return glyph
+
+        mask, offset = font.getmask2(char, "L")
+        array = np.frombuffer(bytes(mask), dtype=np.uint8).reshape(
+            mask.size[1], mask.size[0]
+        ).astype(np.int32)
+        glyph = (array, offset)
+        with self._lock:
+            self._glyphs[(key, char)] = glyph
+            while len(self._glyphs) > self.max_glyphs:
+                self._glyphs.popitem(last=False)
+        return glyph
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._glyphs)
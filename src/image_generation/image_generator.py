@@ -1,13 +1,17 @@
 import logging
 import traceback
-from typing import List, Dict, Optional
-from PIL import Image, ImageFont, ImageDraw
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Optional, Sequence
+from PIL import Image, ImageFont
 
-from src.converters.block_to_background_image.block_image_factory import (
-    BlockImageFactory,
-)
+from src.data.page_layout import BlockPlacement, PageLayout
 from src.data.text_block import TextBlock, BlockType
+from src.image_generation.display_list import DisplayList, Rasterizer
+from src.image_generation.render_context import RenderContext
 from src.image_generation.draw_strategy import (
+    DrawStrategy,
     DrawDefault,
     DrawHeader,
     DrawTitle,
@@ -19,19 +23,51 @@ from src.image_generation.draw_strategy import (
     DrawHorizontalRule,
     DrawTaskList,
 )
-from src.utils.config import Config
+from src.utils.render_cache import RenderCache
 
 logger = logging.getLogger(__name__)
 
+# Generator owned by each worker process of ``ImageGenerator.iter_rendered_pages``.
+_worker_generator: Optional["ImageGenerator"] = None
+
+
+def _init_worker(context: RenderContext, render_cache: Optional[RenderCache]) -> None:
+    global _worker_generator
+    _worker_generator = ImageGenerator(render_cache, context)
+    _worker_generator.preload_fonts()
+
+
+def _render_page_in_worker(
+    page: PageLayout, scales: Sequence[float]
+) -> List[Image.Image]:
+    return _worker_generator.render_page_at_scales(page, scales)
+
 
 class ImageGenerator:
-    def __init__(self):
-        self.width = Config()["PAGE_LAYOUT"]["IMAGE_WIDTH"]
-        self.height = Config()["PAGE_LAYOUT"]["IMAGE_HEIGHT"]
-        self.text_color = Config()["COLORS"]["TEXT"]
-        self.font_path = Config()["PATHS"]["FONT"]
+    def __init__(
+        self,
+        render_cache: Optional[RenderCache] = None,
+        context: Optional[RenderContext] = None,
+    ):
+        """
+        Args:
+            render_cache (Optional[RenderCache]): On-disk cache of finished pages
+                and code blocks. Nothing is cached when not given.
+            context (Optional[RenderContext]): The theme to render with, shared
+                with the strategies. Created from ``Config`` when not given.
+        """
+        self.context = context if context is not None else RenderContext.from_config()
+        self.settings = self.context.settings
+        self.width = self.settings.page.width
+        self.height = self.settings.page.height
+        self.text_color = self.settings.colors.text
+        self.font_path = self.settings.font_path
+        self.render_cache = render_cache
 
         self.block_styles = self.initialize_block_styles()
+        self.strategies = self.initialize_strategies()
+        self.rasterizer = Rasterizer(self.settings.text_backend, self.context.backgrounds)
+        self._page_fingerprints: Dict[bool, str] = {}
 
     def initialize_block_styles(self) -> Dict[BlockType, Dict]:
         height = self.height
@@ -50,8 +86,8 @@ class ImageGenerator:
                 "line_height": height // 30,
             },
             BlockType.TABLE: {
-                "font_size": height // 30,
-                "line_height": height // 28,
+                "font_size": height // 42,
+                "line_height": height // 32,
             },
             BlockType.CODE: {
                 "font_size": height // 32,
@@ -79,11 +115,24 @@ class ImageGenerator:
             },
         }
 
-    def draw_page_number(self, image: Image, page_num: int) -> None:
+    def initialize_strategies(self) -> Dict[BlockType, DrawStrategy]:
+        context = self.context
+        return {
+            BlockType.PARAGRAPH: DrawDefault(self.text_color, context),
+            BlockType.TABLE: DrawTable(self.text_color, context),
+            BlockType.CODE: DrawCode(self.render_cache, context),
+            BlockType.TITLE: DrawTitle(self.text_color, context),
+            BlockType.HEADER: DrawHeader(self.text_color, context),
+            BlockType.BULLET_LIST: DrawBulletList(self.text_color, context),
+            BlockType.NUMBERED_LIST: DrawNumberedList(self.text_color, context),
+            BlockType.BLOCKQUOTE: DrawBlockquote(self.text_color, context),
+            BlockType.HORIZONTAL_RULE: DrawHorizontalRule(self.text_color, context),
+            BlockType.TASK_LIST: DrawTaskList(self.text_color, context),
+        }
+
+    def draw_page_number(self, draw: DisplayList, page_num: int) -> None:
         """Draw page number with modern styling in a badge."""
-        draw = ImageDraw.Draw(image)
-        page_num_str = f'{page_num + Config()["PAGE_LAYOUT"]["START_INDEX"]}'
-        font_color = Config()["COLORS"]["PAGE_NUMBER_FONT"]
+        page_num_str = f"{page_num + self.settings.page.start_index}"
         font = self.get_font_for_block(BlockType.HEADER)
         
         if font:
@@ -99,7 +148,7 @@ class ImageGenerator:
             position_y = badge_radius + 40
             
             # Draw circular badge background
-            accent_color = Config()["COLORS"]["HIGHLIGHT"]
+            accent_color = self.settings.colors.highlight
             draw.ellipse(
                 [
                     (position_x - badge_radius, position_y - badge_radius),
@@ -109,64 +158,186 @@ class ImageGenerator:
             )
             
             # Draw page number centered in badge using background color for contrast
-            page_num_text_color = Config()["COLORS"].get("BACKGROUND", "#000000")
+            page_num_text_color = self.settings.colors.page_number_background
             text_x = position_x - text_width // 2
             text_y = position_y - text_height // 2 - 4
             draw.text((text_x, text_y), page_num_str, fill=page_num_text_color, font=font)
 
-    def generate_images(self, blocks: List[TextBlock]):
-        images = []
-        current_height = Config()["PAGE_LAYOUT"]["TOP_MARGIN"]
-        current_page = 1  # start with page 1
-
-        img = None
-        for idx, block in enumerate(blocks):
-            if img is None:
-                img = BlockImageFactory.create_background_image(
-                    block.type,
-                    Config()["PAGE_LAYOUT"]["IMAGE_WIDTH"],
-                    Config()["PAGE_LAYOUT"]["IMAGE_HEIGHT"],
-                )
+    def generate_images(
+        self, blocks: Iterable[TextBlock], scale: float = 1.0, jobs: int = 1
+    ) -> List[Image.Image]:
+        return list(self.iter_images(blocks, scale, jobs))
 
-            if block.type != "title":
-                self.draw_page_number(img, current_page)
+    def iter_images(
+        self, blocks: Iterable[TextBlock], scale: float = 1.0, jobs: int = 1
+    ) -> Iterator[Image.Image]:
+        """Yield each page image as soon as its page is laid out and rasterized."""
+        for images in self.iter_rendered_pages(self.iter_layout(blocks), [scale], jobs):
+            yield images[0]
+
+    def record(self, blocks: Iterable[TextBlock]) -> List[DisplayList]:
+        """Lay out the blocks and record one display list per page."""
+        return [self.record_page(page) for page in self.iter_layout(blocks)]
+
+    def layout(self, blocks: Iterable[TextBlock]) -> List[PageLayout]:
+        return list(self.iter_layout(blocks))
+
+    def iter_layout(
+        self,
+        blocks: Iterable[TextBlock],
+        start_index: int = 0,
+        first_page_number: int = 1,
+    ) -> Iterator[PageLayout]:
+        """
+        Split the blocks into pages using measured block heights only.
+
+        No pixels are drawn here, each block is measured by its strategy and the
+        resulting pages can be rendered independently with ``render_page``. Pages
+        are yielded as soon as the next block no longer fits on them.
+
+        A page only depends on the blocks from its first one onwards, so the layout
+        can be resumed from any page of a previous run by passing the index of its
+        first block and its number.
+        """
+        top_margin = self.settings.page.top_margin
+        max_height = self.height - self.settings.page.bottom_margin
 
-            # Create a copy of the current image to draw on
-            img_copy = img.copy()
+        current_height = top_margin
+        page = None
+        for idx, block in enumerate(islice(blocks, start_index, None), start_index):
+            if page is None:
+                page = PageLayout(number=first_page_number, background=block.type)
 
-            # Draw on the copy to check the new height
-            block_height = self.draw_text_on_image(img_copy, block, current_height)
+            if block.type != "title":
+                page.page_number_index = len(page.placements)
+
+            block_height = self.measure_block(block, current_height)
 
             # Check if the height difference is too large
             height_difference = block_height - current_height
-            if height_difference > Config()["PAGE_LAYOUT"]["IMAGE_HEIGHT"] * 0.8:
+            if height_difference > self.height * 0.8:
                 raise Exception("Block height difference exceeds allowable limit")
 
-            if block_height > Config()["PAGE_LAYOUT"]["IMAGE_HEIGHT"] - Config()["PAGE_LAYOUT"]["BOTTOM_MARGIN"]:
-                # If the block height exceeds the limit, reset current height and increment page
-                current_height = Config()["PAGE_LAYOUT"]["TOP_MARGIN"]
-                current_page += 1
-                images.append(img)
-                img = BlockImageFactory.create_background_image(
-                    block.type,
-                    Config()["PAGE_LAYOUT"]["IMAGE_WIDTH"],
-                    Config()["PAGE_LAYOUT"]["IMAGE_HEIGHT"],
-                )
+            if block_height > max_height:
+                # If the block height exceeds the limit, move the block to a new page
+                yield page
+                page = PageLayout(number=page.number + 1, background=block.type)
                 if block.type != "title":
-                    self.draw_page_number(img, current_page)
-                # Draw the block on the new image
-                block_height = self.draw_text_on_image(img, block, current_height)
-                current_height = int(block_height)
-            else:
-                # If the block height does not exceed the limit, redraw on the original image
-                current_height = int(block_height)
-                img = img_copy
-
-        if img is not None:
-            images.append(img)
+                    page.page_number_index = 0
+                current_height = top_margin
+                block_height = self.measure_block(block, current_height)
+
+            page.placements.append(
+                BlockPlacement(idx, block, current_height, int(block_height))
+            )
+            current_height = int(block_height)
+
+        if page is not None:
+            yield page
+
+    def record_page(self, page: PageLayout) -> DisplayList:
+        """Record the primitives of a single page produced by ``layout``."""
+        display_list = DisplayList((self.width, self.height), background=page.background)
+
+        for idx, placement in enumerate(page.placements):
+            if idx == page.page_number_index:
+                self.draw_page_number(display_list, page.number)
+            self.record_block(display_list, placement.block, placement.top)
+
+        if page.page_number_index == len(page.placements):
+            self.draw_page_number(display_list, page.number)
+
+        return display_list
 
+    def render_page(self, page: PageLayout, scale: float = 1.0) -> Image.Image:
+        """Rasterize a single page produced by ``layout``."""
+        return self.rasterizer.rasterize(self.record_page(page), scale)
+
+    def render_page_at_scales(
+        self, page: PageLayout, scales: Sequence[float]
+    ) -> List[Image.Image]:
+        """
+        Record a page once and rasterize it at every scale.
+
+        With a render cache, pages already rendered by a previous run with the same
+        content, configuration and fonts are loaded from it instead.
+        """
+        if self.render_cache is None:
+            display_list = self.record_page(page)
+            return [self.rasterizer.rasterize(display_list, scale) for scale in scales]
+
+        page_fingerprint = self._get_page_fingerprint(page)
+        display_list = None
+        images = []
+        for scale in scales:
+            key = RenderCache.key(page_fingerprint, page.fingerprint(), scale)
+            image = self.render_cache.get("pages", key)
+            if image is None:
+                if display_list is None:
+                    display_list = self.record_page(page)
+                image = self.rasterizer.rasterize(display_list, scale)
+                self.render_cache.put("pages", key, image)
+            images.append(image)
         return images
 
+    def _get_page_fingerprint(self, page: PageLayout) -> str:
+        """
+        Fingerprint of the configuration and files a page's image depends on.
+
+        The Pygments fonts are only hashed for pages with code blocks, so pages
+        without code never import Pygments.
+        """
+        has_code = any(
+            BlockType[placement.block.type.upper()] == BlockType.CODE
+            for placement in page.placements
+        )
+        if has_code not in self._page_fingerprints:
+            paths = self.strategies[BlockType.CODE].font_paths() if has_code else ()
+            self._page_fingerprints[has_code] = RenderCache.config_fingerprint(
+                paths, self.context.config
+            )
+        return self._page_fingerprints[has_code]
+
+    def render_pages(
+        self, pages: Iterable[PageLayout], scales: Sequence[float], jobs: int = 1
+    ) -> Dict[float, List[Image.Image]]:
+        """Rasterize the pages at every scale, returning the images of each scale in page order."""
+        images_by_scale = {scale: [] for scale in scales}
+        for images in self.iter_rendered_pages(pages, scales, jobs):
+            for scale, image in zip(scales, images):
+                images_by_scale[scale].append(image)
+        return images_by_scale
+
+    def iter_rendered_pages(
+        self, pages: Iterable[PageLayout], scales: Sequence[float], jobs: int = 1
+    ) -> Iterator[List[Image.Image]]:
+        """
+        Yield, in page order, the images of each page at every scale.
+
+        Pagination is already known, so pages are independent of each other. With
+        ``jobs`` above 1 they are spread over a pool of worker processes, each
+        receiving the render context once. At most two pages per worker
+        are in flight, so memory stays flat however long the document is.
+        """
+        if jobs <= 1:
+            for page in pages:
+                yield self.render_page_at_scales(page, scales)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(self.context, self.render_cache),
+        ) as executor:
+            pending = deque()
+            for page in pages:
+                pending.append(executor.submit(_render_page_in_worker, page, scales))
+                if len(pending) >= 2 * jobs:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
     def get_font_for_block(
         self, block_type: BlockType
     ) -> Optional[ImageFont.ImageFont]:
@@ -174,7 +345,7 @@ class ImageGenerator:
             style = self.block_styles.get(
                 block_type, self.block_styles[BlockType.PARAGRAPH]
             )
-            return ImageFont.truetype(self.font_path, size=style["font_size"])
+            return self.context.font(style["font_size"])
         except IOError as e:
             logger.error(f"Error: The font file {self.font_path} wasn't found. {e}")
         except KeyError as e:
@@ -182,6 +353,64 @@ class ImageGenerator:
 
         return None
 
+    def preload_fonts(self) -> None:
+        """Load the faces of every block style ahead of rendering."""
+        for block_type in self.block_styles:
+            self.get_font_for_block(block_type)
+
+    def get_strategy_for_block(self, block: TextBlock) -> DrawStrategy:
+        return self.strategies.get(
+            BlockType[block.type.upper()], self.strategies[BlockType.PARAGRAPH]
+        )
+
+    @staticmethod
+    def get_additional_height(block: TextBlock) -> int:
+        return 30 if BlockType[block.type.upper()] == BlockType.HEADER else 0
+
+    def measure_block(self, block: TextBlock, current_height: int) -> int:
+        """Return the height at which the block ends, without drawing it."""
+        font = self.get_font_for_block(BlockType[block.type.upper()])
+        if not font:
+            return 0
+
+        strategy = self.get_strategy_for_block(block)
+        try:
+            return strategy.measure(
+                self.width,
+                block.data,
+                font,
+                current_height + self.get_additional_height(block),
+            )
+        except Exception as e:
+            error_message = (
+                f"Error measuring text block: {e}\n{traceback.format_exc()}"
+            )
+            logger.error(error_message)
+            return 0
+
+    def record_block(
+        self, display_list: DisplayList, block: TextBlock, current_height: int
+    ) -> int:
+        """Record the block into the page display list and return where it ends."""
+        font = self.get_font_for_block(BlockType[block.type.upper()])
+        if not font:
+            return 0
+
+        strategy = self.get_strategy_for_block(block)
+        try:
+            return strategy.record(
+                display_list,
+                block.data,
+                font,
+                current_height + self.get_additional_height(block),
+            )
+        except Exception as e:
+            error_message = (
+                f"Error recording text block: {e}\n{traceback.format_exc()}"
+            )
+            logger.error(error_message)
+            return 0
+
     def draw_text_on_image(
         self, img: Image, block: TextBlock, current_height: int
     ) -> int:
@@ -189,27 +418,13 @@ class ImageGenerator:
         if not font:
             return 0
 
-        strategies = {
-            BlockType.PARAGRAPH: DrawDefault(self.text_color),
-            BlockType.TABLE: DrawTable(self.text_color),
-            BlockType.CODE: DrawCode(),
-            BlockType.TITLE: DrawTitle(self.text_color),
-            BlockType.HEADER: DrawHeader(self.text_color),
-            BlockType.BULLET_LIST: DrawBulletList(self.text_color),
-            BlockType.NUMBERED_LIST: DrawNumberedList(self.text_color),
-            BlockType.BLOCKQUOTE: DrawBlockquote(self.text_color),
-            BlockType.HORIZONTAL_RULE: DrawHorizontalRule(self.text_color),
-            BlockType.TASK_LIST: DrawTaskList(self.text_color),
-        }
-        strategy = strategies.get(
-            BlockType[block.type.upper()], strategies[BlockType.PARAGRAPH]
-        )
-        additional_height = (
-            30 if BlockType[block.type.upper()] == BlockType.HEADER else 0
-        )
+        strategy = self.get_strategy_for_block(block)
         try:
             _, block_height = strategy.draw(
-                img, block.data, font, current_height + additional_height
+                img,
+                block.data,
+                font,
+                current_height + self.get_additional_height(block),
             )
             return block_height
         except Exception as e:
@@ -0,0 +1,130 @@
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Sequence
+
+from PIL import Image
+
+from src.data.page_layout import PageLayout
+from src.data.text_block import TextBlock
+from src.image_generation.image_generator import ImageGenerator
+
+
+@dataclass
+class PageUpdate:
+    """
+    The outcome of ``IncrementalRenderer.update``.
+
+    Attributes
+    ----------
+    changed : Dict[int, List[Image.Image]]
+        The images, one per scale, of every page whose content changed, keyed by
+        page index.
+    removed : List[int]
+        Indices of pages that no longer exist.
+    page_count : int
+        The number of pages of the document.
+    """
+
+    changed: Dict[int, List[Image.Image]] = field(default_factory=dict)
+    removed: List[int] = field(default_factory=list)
+    page_count: int = 0
+
+
+def _first_difference(old: List[TextBlock], new: List[TextBlock]) -> int:
+    for idx, (old_block, new_block) in enumerate(zip(old, new)):
+        if old_block != new_block:
+            return idx
+    return min(len(old), len(new))
+
+
+def _next_block_index(page: PageLayout) -> int:
+    return page.placements[-1].index + 1
+
+
+class IncrementalRenderer:
+    """
+    Re-renders only the pages affected by an edit of the document.
+
+    The pages of the previous run act as layout checkpoints. Pagination resumes
+    from the last page that starts before the first changed block, stops as soon
+    as it lines up with the previous layout again, and only pages whose
+    fingerprint differs from the previous run are rasterized.
+    """
+
+    def __init__(self, image_generator: ImageGenerator, scales: Sequence[float] = (1.0,)):
+        self.image_generator = image_generator
+        self.scales = list(scales)
+        self._blocks: List[TextBlock] = []
+        self._pages: List[PageLayout] = []
+
+    def update(self, blocks: Iterable[TextBlock]) -> PageUpdate:
+        blocks = list(blocks)
+        pages = self._relayout(blocks)
+
+        update = PageUpdate(page_count=len(pages))
+        for idx, page in enumerate(pages):
+            if idx >= len(self._pages) or self._pages[idx].fingerprint() != page.fingerprint():
+                update.changed[idx] = self.image_generator.render_page_at_scales(
+                    page, self.scales
+                )
+        update.removed = list(range(len(pages), len(self._pages)))
+
+        self._blocks = blocks
+        self._pages = pages
+        return update
+
+    def _relayout(self, blocks: List[TextBlock]) -> List[PageLayout]:
+        first_changed = _first_difference(self._blocks, blocks)
+        if first_changed == len(blocks) == len(self._blocks):
+            return self._pages
+
+        # The first changed block may now fit on the page before its own, so
+        # resume from the last page starting strictly before it.
+        resume = 0
+        for idx, page in enumerate(self._pages):
+            if page.placements[0].index >= first_changed:
+                break
+            resume = idx
+
+        pages = self._pages[:resume]
+        start_index = self._pages[resume].placements[0].index if self._pages else 0
+        for page in self.image_generator.iter_layout(blocks, start_index, resume + 1):
+            pages.append(page)
+            tail = self._converged_tail(blocks, page)
+            if tail is not None:
+                pages.extend(tail)
+                break
+
+        return pages
+
+    def _converged_tail(self, blocks: List[TextBlock], page: PageLayout):
+        """
+        Return the remaining pages of the previous run if the new layout lines up with it.
+
+        Once a page matches the previous page with the same number and the blocks
+        left after both are the same, every following page is the same too, only
+        with shifted block indices.
+        """
+        old_idx = page.number - 1
+        if old_idx >= len(self._pages):
+            return None
+
+        old_page = self._pages[old_idx]
+        if old_page.fingerprint() != page.fingerprint():
+            return None
+
+        new_end = _next_block_index(page)
+        old_end = _next_block_index(old_page)
+        if blocks[new_end:] != self._blocks[old_end:]:
+            return None
+
+        shift = new_end - old_end
+        return [
+            replace(
+                old,
+                placements=[
+                    replace(p, index=p.index + shift, block=blocks[p.index + shift])
+                    for p in old.placements
+                ],
+            )
+            for old in self._pages[old_idx + 1 :]
+        ]
@@ -0,0 +1,172 @@
+import re
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, List, Tuple
+
+from PIL import ImageFont
+
+from src.image_generation.text_measurer import TextMeasurer, font_key
+from src.utils.fork_safety import fork_safe_lock
+from src.utils.config import singleton
+
+# Scripts written without spaces between words, a line may break around any of
+# their characters. Opening punctuation stays attached to the character after it
+# and closing punctuation to the character before it.
+_CJK = (
+    "\u2e80-\u2fdf\u3005-\u3007\u3021-\u3029\u3040-\u30ff\u3100-\u312f"
+    "\u3190-\u31ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+)
+_OPENING = "\u3008\u300a\u300c\u300e\u3010\uff08"
+_CLOSING = "\u3001\u3002\u3009\u300b\u300d\u300f\u3011\uff09\uff0c\uff0e\uff01\uff1f\uff1a\uff1b"
+_SEGMENT_PATTERN = re.compile(
+    rf"[{_OPENING}]*[{_CJK}][{_CLOSING}]*"
+    rf"|[^\s{_CJK}]+?(?=[{_OPENING}]*[{_CJK}]|\s|$)[{_CLOSING}]*"
+)
+_OTHER_WHITESPACE = re.compile(r"[^\S ]")
+
+
+@dataclass(frozen=True)
+class LineBox:
+    """
+    A line of wrapped text.
+
+    Attributes
+    ----------
+    text : str
+        The text of the line, without the whitespace it was broken at.
+    start : int
+        Offset of the first character of the line in the wrapped text.
+    end : int
+        Offset just past the last character of the line.
+    width : float
+        The advance of the line, as returned by ``font.getlength``.
+    """
+
+    text: str
+    start: int
+    end: int
+    width: float
+
+
+@singleton
+class LineBreaker:
+    """
+    Process wide line breaking engine working on pixel widths.
+
+    A paragraph is split into segments, words or single CJK characters, whose
+    advances come from the ``TextMeasurer``. Their prefix sums give the width of
+    any run of segments, so the break point of every line is found with a binary
+    search and confirmed by measuring the line itself, which accounts for kerning
+    across segments.
+
+    Lines are cached per face, text and width, so the measure and draw passes of
+    a block wrap it only once. The cache is guarded by a lock, so the breaker can
+    be shared by threads.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        """
+        Args:
+            max_size (int): Maximum number of wrapped paragraphs kept in memory.
+                The class is a singleton, only the first instantiation sets it.
+        """
+        self.max_size = max_size
+        self._cache: "OrderedDict[Tuple[Hashable, ...], List[LineBox]]" = OrderedDict()
+        self._lock = fork_safe_lock(self)
+        self._measurer = TextMeasurer()
+
+    def break_lines(
+        self, text: str, font: ImageFont.FreeTypeFont, max_width: float
+    ) -> List[LineBox]:
+        """
+        Greedily break the text into lines no wider than ``max_width``.
+
+        Whitespace, including newlines, is only a break opportunity. A word wider
+        than ``max_width`` is kept whole on a line of its own.
+
+        Args:
+            text (str): The paragraph to wrap.
+            font (ImageFont.FreeTypeFont): The face the text is drawn with.
+            max_width (float): The available width in pixels.
+
+        Returns:
+            List[LineBox]: The lines, empty for blank text. The list is shared, do
+            not modify it.
+        """
+        key = (font_key(font), text, max_width)
+        with self._lock:
+            lines = self._cache.get(key)
+            if lines is not None:
+                self._cache.move_to_end(key)
+                return lines
+
+        # Broken outside the lock, a race can only make two threads wrap the same text
+        lines = self._break(text, font, max_width)
+        with self._lock:
+            self._cache[key] = lines
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return lines
+
+    def _break(
+        self, text: str, font: ImageFont.FreeTypeFont, max_width: float
+    ) -> List[LineBox]:
+        # Tabs and newlines are drawn as spaces, offsets into the text are kept
+        text = _OTHER_WHITESPACE.sub(" ", text)
+        segments = [match.span() for match in _SEGMENT_PATTERN.finditer(text)]
+        if not segments:
+            return []
+
+        # prefix[k] is the estimated width of segments 0..k-1 with the text between
+        # them, gaps[k] the width of the text between segments k-1 and k
+        prefix = [0.0]
+        gaps = [0.0]
+        previous_end = segments[0][0]
+        for idx, (start, end) in enumerate(segments):
+            gap = self._measurer.length(font, text[previous_end:start]) if idx else 0.0
+            if idx:
+                gaps.append(gap)
+            prefix.append(prefix[-1] + gap + self._measurer.length(font, text[start:end]))
+            previous_end = end
+
+        lines = []
+        first = 0
+        while first < len(segments):
+            offset = prefix[first] + gaps[first]
+            last = max(first + 1, bisect_right(prefix, max_width + offset, lo=first + 1) - 1)
+
+            # The estimate leaves out kerning between segments, so confirm it
+            while last > first + 1 and self._width(text, font, segments, first, last) > max_width:
+                last -= 1
+            while (
+                last < len(segments)
+                and self._width(text, font, segments, first, last + 1) <= max_width
+            ):
+                last += 1
+
+            start, end = segments[first][0], segments[last - 1][1]
+            lines.append(
+                LineBox(text[start:end], start, end, self._measurer.length(font, text[start:end]))
+            )
+            first = last
+
+        return lines
+
+    def _width(
+        self,
+        text: str,
+        font: ImageFont.FreeTypeFont,
+        segments: List[Tuple[int, int]],
+        first: int,
+        last: int,
+    ) -> float:
+        return self._measurer.length(font, text[segments[first][0] : segments[last - 1][1]])
+
+    def clear(self) -> None:
+        """Drop every cached paragraph."""
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
@@ -0,0 +1,99 @@
+import copy
+import json
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Union
+
+from PIL import ImageFont
+
+from src.converters.block_to_background_image.block_image_factory import (
+    BlockImageFactory,
+)
+from src.image_generation.font_registry import FontRegistry
+from src.utils.config import Config
+from src.utils.settings import RenderSettings
+
+
+class RenderContext:
+    """
+    Everything a document is rendered with for one theme.
+
+    The context owns a private copy of the configuration, the ``RenderSettings``
+    snapshot taken from it and the cache of page backgrounds of the theme. Faces
+    come from a ``FontRegistry``, the process wide one unless another is given,
+    since a face only depends on its file and size.
+
+    Nothing in a context changes once it is created and its caches are guarded
+    by locks, so a context can be shared by threads, and contexts of different
+    themes can be used side by side in one process. The global ``Config`` is
+    only read by ``from_config``.
+    """
+
+    def __init__(
+        self, config: Mapping[str, Any], fonts: Optional[FontRegistry] = None
+    ):
+        """
+        Args:
+            config (Mapping[str, Any]): The configuration, as loaded from a
+                configuration or theme file. It is copied.
+            fonts (Optional[FontRegistry]): The cache of loaded faces.
+
+        Raises:
+            KeyError: If a required setting is missing.
+            ValueError: If a color cannot be parsed.
+        """
+        self._config = MappingProxyType(copy.deepcopy(dict(config)))
+        self.settings = RenderSettings.from_dict(self._config)
+        self.fonts = fonts if fonts is not None else FontRegistry()
+        # The glyph atlas reproduces Pillow's basic layout only, raqm faces would
+        # all be left to Pillow
+        self.layout_engine = (
+            ImageFont.Layout.BASIC if self.settings.text_backend == "atlas" else None
+        )
+        self.backgrounds = BlockImageFactory(self._config)
+
+    @classmethod
+    def from_config(cls) -> "RenderContext":
+        """Create a context from the current state of the global ``Config``."""
+        config = Config()
+        return cls({key: config[key] for key in config})
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "RenderContext":
+        """
+        Create a context from a configuration or theme file, leaving ``Config`` untouched.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If the file is not valid JSON or a color cannot be parsed.
+            KeyError: If a required setting is missing.
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            return cls(json.load(file))
+
+    @property
+    def config(self) -> Mapping[str, Any]:
+        """The configuration of the context, read only."""
+        return self._config
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._config.get(key, default)
+
+    def font(self, size: int, index: int = 0) -> ImageFont.FreeTypeFont:
+        """Get the regular face of the theme at the given size."""
+        return self.fonts.get(self.settings.font_path, size, index, self.layout_engine)
+
+    def font_variant(
+        self, size: int, bold: bool = False, italic: bool = False
+    ) -> ImageFont.FreeTypeFont:
+        """Get the bold or italic face of the font family of the theme."""
+        return self.fonts.get_variant(
+            size, bold, italic, self._config["PATHS"], self.layout_engine
+        )
+
+    def __getstate__(self):
+        # Workers receive the configuration and rebuild the caches
+        return {"config": dict(self._config)}
+
+    def __setstate__(self, state) -> None:
+        self.__init__(state["config"])
@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from PIL import ImageFont
+
+from src.utils.fork_safety import fork_safe_lock
+from src.utils.config import singleton
+
+
+def font_key(
+    font: ImageFont.FreeTypeFont,
+) -> Tuple[str, int, int, Optional[ImageFont.Layout]]:
+    """
+    Identify a face by what it was loaded from, so separately loaded copies share entries.
+
+    The layout engine is part of it, basic and raqm layout place the same text differently.
+    """
+    return font.path, font.size, font.index, font.layout_engine
+
+
+@singleton
+class TextMeasurer:
+    """
+    Process wide cache of text measurements.
+
+    Paragraphs are wrapped word by word, and the same words are measured over and
+    over across blocks, pages and the measure and draw passes of a block. Results
+    are kept per face and string, the least recently used ones are dropped once
+    ``max_size`` entries are stored.
+
+    The cache and its counters are guarded by a lock, so the measurer can be
+    shared by threads. Measuring happens outside of it, a race can only make two
+    threads compute the same measurement.
+    """
+
+    def __init__(self, max_size: int = 100_000):
+        """
+        Args:
+            max_size (int): Maximum number of measurements kept in memory. The
+                class is a singleton, only the first instantiation sets it.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[Tuple[Hashable, ...], object]" = OrderedDict()
+        self._lock = fork_safe_lock(self)
+
+    def _lookup(self, key: Tuple[Hashable, ...]):
+        with self._lock:
+            value = self._cache.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _store(self, key: Tuple[Hashable, ...], value) -> None:
+        with self._lock:
+            self._cache[key] = value
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def bbox(self, font: ImageFont.FreeTypeFont, text: str) -> Tuple[int, int, int, int]:
+        """Get ``font.getbbox(text)``."""
+        key = ("bbox", font_key(font), text)
+        bbox = self._lookup(key)
+        if bbox is None:
+            bbox = font.getbbox(text)
+            self._store(key, bbox)
+        return bbox
+
+    def width(self, font: ImageFont.FreeTypeFont, text: str) -> int:
+        """Get the width of the ink box of the text."""
+        left, _, right, _ = self.bbox(font, text)
+        return right - left
+
+    def length(self, font: ImageFont.FreeTypeFont, text: str) -> float:
+        """Get ``font.getlength(text)``, the advance of the pen after drawing the text."""
+        key = ("length", font_key(font), text)
+        length = self._lookup(key)
+        if length is None:
+            length = font.getlength(text)
+            self._store(key, length)
+        return length
+
+    def space_width(self, font: ImageFont.FreeTypeFont) -> int:
+        """Get the width the strategies advance by between two words."""
+        return self.bbox(font, " ")[2]
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of the lookups answered from the cache, 0 before the first lookup."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        """Drop every measurement and reset the counters."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
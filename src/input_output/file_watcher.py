@@ -0,0 +1,45 @@
+import os
+import time
+from typing import Iterator, Optional, Tuple
+
+
+class FileWatcher:
+    """
+    A class to detect changes of a file by polling its modification time and size.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.5):
+        """
+        Initializes the FileWatcher.
+
+        Args:
+            path (str): The file to watch.
+            poll_interval (float): Seconds to wait between two checks.
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            # Editors may briefly remove the file while saving it
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changes(self) -> Iterator[None]:
+        """
+        Yields once right away, then every time the file changes.
+
+        Returns:
+            Iterator[None]: An endless iterator, stop consuming it to stop watching.
+        """
+        last_signature = self._signature()
+        yield
+
+        while True:
+            time.sleep(self.poll_interval)
+            signature = self._signature()
+            if signature is not None and signature != last_signature:
+                last_signature = signature
+                yield
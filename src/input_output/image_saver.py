@@ -1,21 +1,92 @@
 import logging
-from typing import Union, List, Optional
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Union
 from PIL import Image
 
+from src.input_output.encoder_profile import DEFAULT_PROFILE, PROFILES, EncoderProfile
+
+# The palette stage needs NumPy, it is only imported by the callers enabling it
+if TYPE_CHECKING:
+    from src.input_output.palette import PaletteQuantizer, PaletteReport
+
+
+def default_workers() -> int:
+    """Threads encoding pages by default, Pillow releases the GIL while compressing."""
+    return min(4, os.cpu_count() or 1)
+
 
 class ImageSaver:
     """
     A class to save images to a specified directory.
     """
 
-    def __init__(self, output_directory: Optional[str]):
+    def __init__(
+        self,
+        output_directory: Optional[str],
+        workers: Optional[int] = None,
+        profile: Optional[EncoderProfile] = None,
+        palette: Optional["PaletteQuantizer"] = None,
+        measure_palette: bool = False,
+    ):
         """
         Initializes the ImageSaver.
 
         Args:
             output_directory (Optional[str]): The directory where images will be saved.
+            workers (Optional[int]): Threads encoding and writing the pages of
+                ``save_images``, ``default_workers()`` when not given.
+            profile (Optional[EncoderProfile]): The format and encoder settings
+                of the images, Pillow's default PNG settings when not given.
+            palette (Optional[PaletteQuantizer]): Writes the pages that fit a
+                palette as palette images. Only PNG profiles use it.
+            measure_palette (bool): Also encode the palette pages as RGB, to
+                report the bytes the palette saved. This encodes them twice.
         """
         self.output_directory = output_directory
+        self.workers = workers if workers is not None else default_workers()
+        self.profile = profile if profile is not None else PROFILES[DEFAULT_PROFILE]
+        self.palette = palette if self.profile.format == "PNG" else None
+        self.measure_palette = measure_palette
+
+    def file_path(self, file_name: str) -> str:
+        return (
+            f"{self.output_directory}/{file_name}"
+            if self.output_directory
+            else file_name
+        )
+
+    def page_file_name(self, page_index: int) -> str:
+        return f"output{page_index}.{self.profile.extension}"
+
+    def write_image(self, image: Image, file_name: str) -> Optional["PaletteReport"]:
+        """
+        Encodes and writes a single image, raising the errors.
+
+        Args:
+            image (Image): The image to save.
+            file_name (str): The file name to use for saving the image.
+
+        Returns:
+            Optional[PaletteReport]: What the palette stage did, None without one.
+        """
+        if self.palette is None:
+            self.profile.save(image, self.file_path(file_name))
+            return None
+
+        from src.input_output.palette import PaletteReport
+
+        quantized, colors = self.palette.quantize(image)
+        if quantized is None:
+            self.profile.save(image, self.file_path(file_name))
+            return PaletteReport(colors, quantized=False)
+
+        encoded = self.profile.encode(quantized)
+        with open(self.file_path(file_name), "wb") as file:
+            file.write(encoded)
+        rgb_bytes = len(self.profile.encode(image)) if self.measure_palette else 0
+        return PaletteReport(colors, True, rgb_bytes, len(encoded))
 
     def save_image(self, image: Image, file_name: str) -> None:
         """
@@ -26,24 +97,121 @@ class ImageSaver:
             file_name (str): The file name to use for saving the image.
         """
         try:
-            file_path = (
-                f"{self.output_directory}/{file_name}"
-                if self.output_directory
-                else file_name
-            )
-            image.save(file_path)
+            self.write_image(image, file_name)
         except Exception as e:
             logging.error(f"Error saving image {file_name}: {e}")
 
-    def save_images(self, images: Union[Image.Image, List[Image.Image]]) -> None:
+    def save_page(self, image: Image, page_index: int) -> None:
         """
-        Saves a list of images or a single image.
+        Saves the image of a page under its page file name.
 
         Args:
-            images (Union[List[Image], Image]): The image or list of images to save.
+            image (Image): The image to save.
+            page_index (int): The index of the page in the document.
+        """
+        self.save_image(image, self.page_file_name(page_index))
+
+    def remove_page(self, page_index: int) -> None:
+        """
+        Removes the image of a page that no longer exists.
+
+        Args:
+            page_index (int): The index of the page in the document.
+        """
+        file_name = self.page_file_name(page_index)
+        try:
+            os.remove(self.file_path(file_name))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"Error removing image {file_name}: {e}")
+
+    def save_images(
+        self, images: Union[Image.Image, Iterable[Image.Image]]
+    ) -> Dict[str, Exception]:
         """
-        if isinstance(images, list):
-            for idx, image in enumerate(images):
-                self.save_image(image, f"output{idx}.png")
+        Saves an iterable of images or a single image.
+
+        Images are written as soon as the iterable yields them, so a generator such
+        as ``MarkdownToImageConverter.iter_pages`` is saved page by page without
+        keeping the whole document in memory. With several workers, pages are
+        encoded in parallel while the next ones are requested.
+
+        Args:
+            images (Union[Iterable[Image], Image]): The image or images to save.
+
+        Returns:
+            Dict[str, Exception]: The error of every file that could not be saved.
+        """
+        if isinstance(images, Image.Image):
+            pages = [(f"output.{self.profile.extension}", images)]
         else:
-            self.save_image(images, "output.png")
+            pages = ((self.page_file_name(idx), image) for idx, image in enumerate(images))
+
+        with PageWriter(self.workers) as writer:
+            for file_name, image in pages:
+                writer.submit(self, image, file_name)
+        return writer.errors
+
+
+class PageWriter:
+    """
+    Encodes and writes images on a bounded pool of threads.
+
+    ``submit`` blocks while twice as many images as threads are pending, so a
+    producer never gets far ahead of the disk and memory stays flat. Errors are
+    logged and collected per file instead of stopping the other pages. With a
+    single worker, images are written by ``submit`` itself. The reports of the
+    savers with a palette stage are collected per file as well.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Args:
+            workers (Optional[int]): The number of threads, ``default_workers()``
+                when not given.
+        """
+        self.workers = workers if workers is not None else default_workers()
+        self.errors: Dict[str, Exception] = {}
+        self.reports: Dict[str, "PaletteReport"] = {}
+        self._executor = ThreadPoolExecutor(self.workers) if self.workers > 1 else None
+        self._slots = threading.BoundedSemaphore(2 * self.workers)
+
+    def submit(self, image_saver: ImageSaver, image: Image, file_name: str) -> None:
+        """Write an image with the given saver, as soon as a thread is free."""
+        if self._executor is None:
+            self._write(image_saver, image, file_name)
+            return
+
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._write, image_saver, image, file_name)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release)
+
+    def close(self) -> Dict[str, Exception]:
+        """Wait for every pending image, then return the errors."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        return self.errors
+
+    def __enter__(self) -> "PageWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _write(self, image_saver: ImageSaver, image: Image, file_name: str) -> None:
+        try:
+            report = image_saver.write_image(image, file_name)
+        except Exception as e:
+            logging.error(f"Error saving image {file_name}: {e}")
+            self.errors[image_saver.file_path(file_name)] = e
+            return
+        if report is not None:
+            self.reports[image_saver.file_path(file_name)] = report
+
+    def _release(self, _: Future) -> None:
+        self._slots.release()
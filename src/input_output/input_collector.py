@@ -0,0 +1,122 @@
+import glob
+import json
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath, PureWindowsPath
+from typing import Iterable, List, Optional, TextIO
+
+
+@dataclass
+class InputDocument:
+    """
+    A Markdown file to convert in a batch.
+
+    Attributes
+    ----------
+    path : str
+        The Markdown file.
+    output_name : Optional[str]
+        Name of the subdirectory its images are saved to, None to derive it from
+        the file name.
+    """
+
+    path: str
+    output_name: Optional[str] = None
+
+
+class InputCollector:
+    """
+    A class to gather the documents of a batch from paths, glob patterns and manifests.
+    """
+
+    def expand(self, patterns: Iterable[str]) -> List[InputDocument]:
+        """
+        Expands glob patterns into documents, keeping plain paths as they are.
+
+        Args:
+            patterns (Iterable[str]): Paths or glob patterns such as ``docs/**/*.md``.
+
+        Returns:
+            List[InputDocument]: The matching documents, in the order given. A pattern
+            matching nothing is kept as is, so the missing file can be reported.
+        """
+        documents = []
+        for pattern in patterns:
+            matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else []
+            for path in matches or [pattern]:
+                documents.append(InputDocument(path))
+        return documents
+
+    def read_manifest(self, manifest: TextIO) -> List[InputDocument]:
+        """
+        Reads the documents listed in a manifest.
+
+        Every non-empty line is either a path or a JSON object with a ``path`` key
+        and an optional ``output`` key naming the output subdirectory. Lines starting
+        with ``#`` are ignored. Paths of plain lines may be glob patterns.
+
+        Args:
+            manifest (TextIO): The manifest, e.g. an open file or ``sys.stdin``.
+
+        Returns:
+            List[InputDocument]: The listed documents, in order.
+
+        Raises:
+            ValueError: If a JSON line is malformed, has no path or its output is
+                not a plain directory name.
+        """
+        documents = []
+        for line_number, line in enumerate(manifest, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            if not line.startswith("{"):
+                documents.extend(self.expand([line]))
+                continue
+
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid manifest line {line_number}: {e}") from e
+            if not isinstance(entry.get("path"), str):
+                raise ValueError(f"Manifest line {line_number} has no 'path'")
+            output_name = entry.get("output")
+            if output_name is not None and not self.is_plain_name(output_name):
+                raise ValueError(
+                    f"The output of manifest line {line_number} must be a plain "
+                    f"directory name: {output_name!r}"
+                )
+            documents.append(InputDocument(entry["path"], output_name))
+
+        return documents
+
+    @staticmethod
+    def is_plain_name(name) -> bool:
+        """Whether a name is a single relative path component, so it stays in its parent."""
+        return (
+            isinstance(name, str)
+            and name not in ("", ".", "..")
+            and PurePosixPath(name).name == name
+            and PureWindowsPath(name).name == name
+        )
+
+    @staticmethod
+    def output_names(documents: List[InputDocument]) -> List[str]:
+        """
+        Picks a distinct output subdirectory name for every document.
+
+        Names default to the file name without extension, a numeric suffix is added
+        when two documents would otherwise share a directory.
+        """
+        names = []
+        used = set()
+        for document in documents:
+            base = document.output_name or Path(document.path).stem
+            name = base
+            suffix = 2
+            while name in used:
+                name = f"{base}-{suffix}"
+                suffix += 1
+            used.add(name)
+            names.append(name)
+        return names
@@ -0,0 +1,137 @@
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Pages with more distinct colors hold gradients or photos, they are not counted further
+MAX_DISTINCT_COLORS = 1 << 16
+
+
+@dataclass(frozen=True)
+class PaletteReport:
+    """
+    What the palette stage did to a page.
+
+    Attributes
+    ----------
+    colors : int
+        The distinct colors of the page, 0 when its mode is not quantized.
+    quantized : bool
+        Whether the page was written with a palette.
+    rgb_bytes : int
+        The size of the page encoded as RGB, 0 when it was kept RGB or the
+        saver does not measure it.
+    written_bytes : int
+        The size of the written page, 0 when it was kept RGB.
+    """
+
+    colors: int
+    quantized: bool
+    rgb_bytes: int = 0
+    written_bytes: int = 0
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.rgb_bytes - self.written_bytes if self.rgb_bytes else 0
+
+
+class PaletteQuantizer:
+    """
+    Converts pages drawn with few colors to palette images.
+
+    Rendered pages use a few dozen flat colors plus the shades anti-aliasing
+    blends between them. The distinct colors of a page are counted with NumPy:
+
+    - a page with at most ``max_colors`` colors gets exactly these colors as its
+      palette, which loses nothing;
+    - otherwise the palette holds its ``max_colors`` most frequent colors and the
+      other colors, the anti-aliasing shades, take the nearest palette color. The
+      page is only converted when no more than ``max_outliers`` of its pixels
+      move by more than ``tolerance`` on any channel;
+    - low-range gradients, such as the vertical page backgrounds of the themes,
+      are quantized on purpose: each of their few steps fills whole rows, so it
+      is among the most frequent colors and kept exactly, or moves by less than
+      ``tolerance`` when there are more steps than palette colors;
+    - full-range gradients, textures and photos fail the outlier test and stay
+      RGB.
+
+    An 8 bit palette image compresses to about half the bytes of the RGB page.
+    """
+
+    def __init__(
+        self, max_colors: int = 256, tolerance: int = 16, max_outliers: float = 0.001
+    ):
+        """
+        Args:
+            max_colors (int): The size of the palette, at most 256.
+            tolerance (int): How far, per channel, a shade may move to the nearest
+                palette color.
+            max_outliers (float): The share of the pixels that may move further.
+
+        Raises:
+            ValueError: If ``max_colors`` is not between 2 and 256.
+        """
+        if not 2 <= max_colors <= 256:
+            raise ValueError(f"The palette must have 2 to 256 colors: {max_colors}")
+        self.max_colors = max_colors
+        self.tolerance = tolerance
+        self.max_outliers = max_outliers
+
+    @classmethod
+    def from_config(cls, palette_config: Mapping[str, Any]) -> "PaletteQuantizer":
+        """Create the quantizer of the PALETTE entry of the OUTPUT section."""
+        return cls(
+            palette_config.get("MAX_COLORS", 256),
+            palette_config.get("TOLERANCE", 16),
+            palette_config.get("MAX_OUTLIERS", 0.001),
+        )
+
+    def quantize(self, image: Image.Image) -> Tuple[Optional[Image.Image], int]:
+        """
+        Convert a page to a palette image if it fits.
+
+        RGB pages and fully opaque RGBA pages are converted, pages with
+        transparency and other modes are kept as they are.
+
+        Returns:
+            Tuple[Optional[Image.Image], int]: The ``P`` mode image, or None when
+            the page keeps its colors, and the number of distinct colors.
+        """
+        if image.mode == "RGBA" and image.getextrema()[3][0] == 255:
+            # The alpha channel of an opaque page carries nothing
+            image = image.convert("RGB")
+        if image.mode != "RGB":
+            return None, 0
+
+        pixels = np.asarray(image, dtype=np.uint32)
+        packed = (pixels[..., 0] << 16) | (pixels[..., 1] << 8) | pixels[..., 2]
+        colors, inverse, counts = np.unique(
+            packed.ravel(), return_inverse=True, return_counts=True
+        )
+        if len(colors) > MAX_DISTINCT_COLORS:
+            return None, len(colors)
+
+        rgb = np.stack([colors >> 16, (colors >> 8) & 0xFF, colors & 0xFF], axis=1)
+        if len(colors) <= self.max_colors:
+            palette = rgb
+            indices = inverse
+        else:
+            palette = rgb[np.argsort(counts, kind="stable")[::-1][: self.max_colors]]
+            nearest = self._nearest(rgb.astype(np.float32), palette.astype(np.float32))
+            error = np.abs(rgb.astype(np.int32) - palette[nearest].astype(np.int32)).max(axis=1)
+            if counts[error > self.tolerance].sum() > self.max_outliers * packed.size:
+                return None, len(colors)
+            indices = nearest[inverse]
+
+        quantized = Image.fromarray(
+            indices.astype(np.uint8).reshape(packed.shape), mode="P"
+        )
+        quantized.putpalette(palette.astype(np.uint8).ravel().tolist())
+        return quantized, len(colors)
+
+    @staticmethod
+    def _nearest(colors: "np.ndarray", palette: "np.ndarray") -> "np.ndarray":
+        # |c - p|² = |c|² - 2 c·p + |p|², the |c|² term does not change the argmin
+        distances = (palette**2).sum(axis=1) - 2 * colors @ palette.T
+        return distances.argmin(axis=1)
@@ -0,0 +1,422 @@
+import json
+import logging
+import re
+import zipfile
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+from src import __version__
+from src.converters.md_to_image.md_to_image import MarkdownToImageConverter
+from src.data.text_block import BlockType
+from src.image_generation.image_generator import ImageGenerator
+from src.image_generation.render_context import RenderContext
+from src.utils.fork_safety import fork_safe_lock
+from src.utils.render_cache import RenderCache
+from src.utils.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from src.input_output.worker_pool import RenderPool
+
+logger = logging.getLogger(__name__)
+
+# Theme names map to files of the themes directory, so they may not contain paths
+THEME_NAME = re.compile(r"^[\w-]+$")
+MAX_BODY_SIZE = 5 * 1024**2
+MAX_SCALE = 4.0
+FORMATS = {"zip": "application/zip", "multipart": "multipart/mixed"}
+# Rendered by ``RenderService.preload`` so every strategy, lexer and background is ready
+WARM_UP_MARKDOWN = """# Warm up
+
+Some **bold**, *italic* and `inline code` with a [link](https://example.com).
+
+- A bullet
+- Another bullet
+
+> A quote
+
+```python
+def warm_up():
+    return 42
+```
+
+| Column | Value |
+|:-------|------:|
+| A      |     1 |
+"""
+
+
+class ServiceError(Exception):
+    """An error reported to the client with its HTTP status."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+    def __reduce__(self):
+        # Raised in pool workers and sent back to the server
+        return type(self), (self.status, str(self))
+
+
+@dataclass
+class _LoadedTheme:
+    generator: ImageGenerator
+    fingerprint: str
+    mtime_ns: int
+
+
+class RenderService:
+    """
+    Renders Markdown with the themes of a directory, keeping them loaded between requests.
+
+    Each theme gets its own ``RenderContext`` and ``ImageGenerator`` the first time
+    it is used, so its fonts, backgrounds and strategies stay warm for the next
+    requests. A theme whose file changed is loaded again. Every method can be
+    called from several threads.
+    """
+
+    def __init__(
+        self,
+        themes_directory: Union[str, Path],
+        render_cache: Optional[RenderCache] = None,
+        default_theme: str = "dark_modern",
+    ):
+        """
+        Args:
+            themes_directory (Union[str, Path]): The directory of the theme files,
+                a theme is named after its file without the ``.json`` suffix.
+            render_cache (Optional[RenderCache]): On-disk cache shared by the themes.
+            default_theme (str): The theme of requests that do not name one.
+        """
+        self.themes_directory = Path(themes_directory)
+        self.render_cache = render_cache
+        self.default_theme = default_theme
+        self._themes: Dict[str, _LoadedTheme] = {}
+        self._lock = fork_safe_lock(self)
+
+    def theme_names(self) -> List[str]:
+        return sorted(path.stem for path in self.themes_directory.glob("*.json"))
+
+    def preload(self) -> None:
+        """
+        Load every theme and render a small document with it.
+
+        This imports the modules rendering depends on and fills the font, glyph
+        and background caches, so the first request of a theme is not slower
+        than the next ones. Themes already loaded and themes that cannot be
+        loaded are skipped.
+        """
+        for name in self.theme_names():
+            if name in self._themes:
+                continue
+            try:
+                self.render(name, WARM_UP_MARKDOWN)
+            except ServiceError as e:
+                logger.warning(f"Could not preload the theme {name}: {e}")
+
+    def __getstate__(self):
+        # Workers that are not forked receive the settings and load the themes again
+        return {
+            "themes_directory": self.themes_directory,
+            "render_cache": self.render_cache,
+            "default_theme": self.default_theme,
+        }
+
+    def __setstate__(self, state) -> None:
+        self.__init__(**state)
+
+    def _theme(self, name: str) -> _LoadedTheme:
+        """
+        Get a loaded theme, loading it on first use or after its file changed.
+
+        Raises:
+            ServiceError: If there is no such theme or it cannot be loaded.
+        """
+        path = self.themes_directory / f"{name}.json"
+        try:
+            if not THEME_NAME.match(name):
+                raise FileNotFoundError(name)
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            raise ServiceError(HTTPStatus.NOT_FOUND, f"Unknown theme: {name}")
+
+        with self._lock:
+            theme = self._themes.get(name)
+            if theme is not None and theme.mtime_ns == mtime_ns:
+                return theme
+
+            try:
+                context = RenderContext.from_file(path)
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Could not load the theme {path}: {e}")
+                raise ServiceError(
+                    HTTPStatus.INTERNAL_SERVER_ERROR, f"The theme {name} is invalid"
+                )
+
+            generator = ImageGenerator(self.render_cache, context)
+            generator.preload_fonts()
+            fingerprint = RenderCache.config_fingerprint(
+                generator.strategies[BlockType.CODE].font_paths(), context.config
+            )
+            theme = _LoadedTheme(generator, fingerprint, mtime_ns)
+            self._themes[name] = theme
+            return theme
+
+    def render_key(self, theme: str, markdown: str, scale: float) -> str:
+        """
+        Identify the pages of a document, computed without rendering anything.
+
+        It hashes the markdown, the scale, the theme, the files the theme points
+        to and the versions of the libraries.
+
+        Raises:
+            ServiceError: If there is no such theme.
+        """
+        return RenderCache.key(self._theme(theme).fingerprint, markdown, scale)
+
+    @staticmethod
+    def etag(render_key: str, output_format: str) -> str:
+        """Get the entity tag of the response carrying the pages of a render key."""
+        return f'"{RenderCache.key(render_key, output_format)[:40]}"'
+
+    def render(self, theme: str, markdown: str, scale: float = 1.0) -> List[bytes]:
+        """
+        Render the markdown with a theme.
+
+        Returns:
+            List[bytes]: The PNG file of every page, in order.
+
+        Raises:
+            ServiceError: If there is no such theme.
+        """
+        generator = self._theme(theme).generator
+        blocks = MarkdownToImageConverter.parse_markdown(markdown)
+
+        pages = []
+        for image in generator.iter_images(blocks, scale):
+            buffer = BytesIO()
+            image.save(buffer, format="PNG")
+            pages.append(buffer.getvalue())
+        return pages
+
+
+def page_file_name(page_index: int) -> str:
+    """The name of a page in a response, the same as ``ImageSaver`` gives it."""
+    return f"output{page_index}.png"
+
+
+def zip_pages(pages: List[bytes]) -> bytes:
+    """Pack the pages in a zip archive, stored uncompressed since PNGs already are."""
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for idx, page in enumerate(pages):
+            # A fixed date keeps the archive, and so its ETag, reproducible
+            info = zipfile.ZipInfo(page_file_name(idx), date_time=(1980, 1, 1, 0, 0, 0))
+            archive.writestr(info, page)
+    return buffer.getvalue()
+
+
+def multipart_pages(pages: List[bytes], boundary: str) -> bytes:
+    """Pack the pages in a ``multipart/mixed`` body, one ``image/png`` part per page."""
+    body = BytesIO()
+    for idx, page in enumerate(pages):
+        body.write(
+            f"--{boundary}\r\n"
+            f"Content-Type: image/png\r\n"
+            f'Content-Disposition: inline; filename="{page_file_name(idx)}"\r\n'
+            f"Content-Length: {len(page)}\r\n\r\n".encode("ascii")
+        )
+        body.write(page)
+        body.write(b"\r\n")
+    body.write(f"--{boundary}--\r\n".encode("ascii"))
+    return body.getvalue()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak tags compare equal to strong ones for If-None-Match
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP interface of a ``RenderService``.
+
+    ``POST /render`` takes the markdown as the request body and returns its pages.
+    The query string selects the ``theme``, the ``scale`` and the ``format``, "zip"
+    or "multipart", which otherwise follows the Accept header. ``GET /themes``
+    lists the themes.
+    """
+
+    server_version = f"md-image-generator/{__version__}"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> RenderService:
+        return self.server.service
+
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path
+        if path == "/themes":
+            self._send_json(HTTPStatus.OK, self.service.theme_names())
+        elif path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path: {path}")
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/render":
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unknown path: {url.path}")
+            return
+
+        try:
+            theme, scale, output_format = self._options(parse_qs(url.query))
+            markdown = self._read_markdown()
+
+            render_key = self.service.render_key(theme, markdown, scale)
+            etag = self.service.etag(render_key, output_format)
+            if etag_matches(self.headers.get("If-None-Match"), etag):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            pages = self.server.render(render_key, theme, markdown, scale)
+        except ServiceError as e:
+            # The body may not have been read, so the connection cannot be reused
+            self.close_connection = True
+            self._send_error(e.status, str(e))
+            return
+        except Exception as e:
+            logger.error(f"Error rendering the request: {e}", exc_info=True)
+            self._send_error(
+                HTTPStatus.INTERNAL_SERVER_ERROR, "The document could not be rendered"
+            )
+            return
+
+        if output_format == "zip":
+            body, content_type = zip_pages(pages), FORMATS["zip"]
+        else:
+            # The boundary is derived from the ETag, so the same request gets the same bytes
+            boundary = f"page-{etag.strip(chr(34))}"
+            body = multipart_pages(pages, boundary)
+            content_type = f"{FORMATS['multipart']}; boundary={boundary}"
+        self._send(
+            HTTPStatus.OK, body, content_type, {"ETag": etag, "X-Page-Count": str(len(pages))}
+        )
+
+    def _options(self, query: Dict[str, List[str]]) -> Tuple[str, float, str]:
+        theme = query.get("theme", [self.service.default_theme])[0]
+
+        try:
+            scale = float(query.get("scale", ["1"])[0])
+        except ValueError:
+            scale = 0.0
+        if not 0 < scale <= MAX_SCALE:
+            raise ServiceError(
+                HTTPStatus.BAD_REQUEST, f"The scale must be above 0 and at most {MAX_SCALE:g}"
+            )
+
+        if "format" in query:
+            output_format = query["format"][0]
+        elif FORMATS["multipart"] in self.headers.get("Accept", ""):
+            output_format = "multipart"
+        else:
+            output_format = "zip"
+        if output_format not in FORMATS:
+            raise ServiceError(
+                HTTPStatus.BAD_REQUEST, f"The format must be one of {', '.join(FORMATS)}"
+            )
+
+        return theme, scale, output_format
+
+    def _read_markdown(self) -> str:
+        length = self.headers.get("Content-Length")
+        if length is None:
+            raise ServiceError(HTTPStatus.LENGTH_REQUIRED, "Content-Length is required")
+        try:
+            length = int(length)
+        except ValueError:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise ServiceError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"The document is larger than {MAX_BODY_SIZE} bytes",
+            )
+
+        try:
+            markdown = self.rfile.read(length).decode("utf-8")
+        except UnicodeDecodeError:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "The document is not valid UTF-8")
+        if not markdown.strip():
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "The document is empty")
+        return markdown
+
+    def _send(
+        self,
+        status: HTTPStatus,
+        body: bytes,
+        content_type: str,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: HTTPStatus, value) -> None:
+        self._send(status, json.dumps(value).encode("utf-8"), "application/json")
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def log_message(self, format: str, *args) -> None:
+        logger.info(f"{self.address_string()} {format % args}")
+
+
+class RenderServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server, each request is handled by its own thread.
+
+    Documents are rendered by the service itself, or by the workers of a
+    ``RenderPool`` when one is given. The service then still answers the
+    requests that need no rendering, such as the ones matching their ETag.
+
+    Requests for the same pages are coalesced: while a document is rendering,
+    the requests for the same markdown, theme and scale wait for it instead of
+    rendering it again, and its pages are reused for ``result_ttl`` seconds.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        service: RenderService,
+        pool: Optional["RenderPool"] = None,
+        result_ttl: float = 5.0,
+    ):
+        super().__init__(address, RenderRequestHandler)
+        self.service = service
+        self.pool = pool
+        self.renders: SingleFlight[List[bytes]] = SingleFlight(result_ttl)
+
+    @property
+    def renderer(self) -> Union[RenderService, "RenderPool"]:
+        return self.pool if self.pool is not None else self.service
+
+    def render(self, render_key: str, theme: str, markdown: str, scale: float) -> List[bytes]:
+        """Render a document, or wait for the render of the same pages in progress."""
+        return self.renders.do(
+            render_key, lambda: self.renderer.render(theme, markdown, scale)
+        )
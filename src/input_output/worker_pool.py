@@ -0,0 +1,118 @@
+import logging
+import multiprocessing
+from multiprocessing.pool import Pool
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from src.input_output.render_server import RenderService
+
+logger = logging.getLogger(__name__)
+
+# The service of the worker process, set by ``_init_worker``
+_service: Optional[RenderService] = None
+
+# Imported once by the fork server, the workers it forks start with them loaded
+FORKSERVER_PRELOAD = ["src.input_output.worker_pool"]
+
+
+def _init_worker(service: RenderService) -> None:
+    global _service
+    _service = service
+    service.preload()
+
+
+def _render_in_worker(theme: str, markdown: str, scale: float) -> List[bytes]:
+    return _service.render(theme, markdown, scale)
+
+
+def _render_job(job: Tuple[str, str, float]) -> List[bytes]:
+    return _render_in_worker(*job)
+
+
+class RenderPool:
+    """
+    Pool of worker processes rendering with the themes of a ``RenderService``.
+
+    Workers are started with the "forkserver" method where it exists, and spawned
+    elsewhere. They are never forked from the parent: the server's request threads
+    may hold locks, in Pillow, logging or the caches, that a forked child would
+    inherit held and wait on forever. The fork server imports the rendering
+    modules once, then each worker preloads the service before its first job: its
+    themes are loaded, their fonts opened and a document is rendered with each
+    of them, so the first request is as fast as the next ones.
+
+    A worker is replaced after ``max_jobs_per_worker`` jobs, so memory a job
+    leaks or fragments cannot grow without bounds. Its replacement is forked
+    from the fork server too.
+    """
+
+    def __init__(
+        self,
+        service: RenderService,
+        processes: Optional[int] = None,
+        max_jobs_per_worker: Optional[int] = 200,
+    ):
+        """
+        Args:
+            service (RenderService): The themes to render with.
+            processes (Optional[int]): The number of workers, the number of CPUs
+                when not given.
+            max_jobs_per_worker (Optional[int]): The number of jobs after which a
+                worker is replaced, never when None.
+        """
+        self.service = service
+
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            # Only taken into account before the fork server is started
+            context.set_forkserver_preload(FORKSERVER_PRELOAD)
+        else:
+            context = multiprocessing.get_context("spawn")
+        self._pool: Pool = context.Pool(
+            processes,
+            initializer=_init_worker,
+            initargs=(service,),
+            maxtasksperchild=max_jobs_per_worker,
+        )
+
+    def render(self, theme: str, markdown: str, scale: float = 1.0) -> List[bytes]:
+        """
+        Render the markdown in a worker, blocking until it is done.
+
+        Returns:
+            List[bytes]: The PNG file of every page, in order.
+
+        Raises:
+            ServiceError: If there is no such theme.
+        """
+        return self._pool.apply(_render_in_worker, (theme, markdown, scale))
+
+    def render_many(
+        self, jobs: Iterable[Tuple[str, str, float]]
+    ) -> Iterator[List[bytes]]:
+        """
+        Render documents on all the workers, yielding their pages in the order of the jobs.
+
+        Args:
+            jobs (Iterable[Tuple[str, str, float]]): The theme, the markdown and
+                the scale of every document.
+        """
+        return self._pool.imap(_render_job, jobs)
+
+    def close(self) -> None:
+        """Let the workers finish their jobs, then stop them."""
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self) -> None:
+        """Stop the workers at once, dropping the jobs in progress."""
+        self._pool.terminate()
+        self._pool.join()
+
+    def __enter__(self) -> "RenderPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if exc_info[0] is not None:
+            self.terminate()
+        else:
+            self.close()
@@ -1,12 +1,23 @@
 import argparse
+import json
 import logging
+import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
 
-from src.converters.md_to_image.md_to_image import MarkdownToImageConverter
-from src.input_output.image_saver import ImageSaver
+from src import __version__
+from src.input_output.input_collector import InputCollector, InputDocument
 from src.utils.config import Config
 
-VERSION = "0.1.0"
+# The rendering modules pull in Pillow, NumPy and Pygments. They are imported once
+# the arguments are parsed, so --help, --version and usage errors return at once.
+if TYPE_CHECKING:
+    from src.converters.md_to_image.md_to_image import MarkdownToImageConverter
+    from src.input_output.encoder_profile import EncoderProfile
+    from src.input_output.image_saver import ImageSaver, PageWriter
+    from src.input_output.palette import PaletteQuantizer, PaletteReport
+
+VERSION = __version__
 logger = logging.getLogger(__name__)
 
 
@@ -14,15 +25,54 @@ class CommandLineInterface:
     def __init__(self):
         parser = self.create_parser()
         self.args = parser.parse_args()
+        self.documents = self.collect_documents(parser)
+
+        if not self.documents:
+            parser.error("No input file given")
+
+        # Validate input files exist
+        for document in self.documents:
+            if not Path(document.path).exists():
+                parser.error(f"Input file does not exist: {document.path}")
+
+        if self.args.watch and not self.args.output_directory:
+            parser.error("--watch requires an output directory")
+
+        if self.args.watch and len(self.documents) > 1:
+            parser.error("--watch accepts a single input file")
 
-        # Validate input file exists
-        if not Path(self.args.input_file).exists():
-            parser.error(f"Input file does not exist: {self.args.input_file}")
+        if self.args.jobs < 1:
+            parser.error(f"The number of jobs must be at least 1: {self.args.jobs}")
+
+        for scale in self.args.scales or []:
+            # Also rejects nan, which fails every comparison
+            if not 0 < scale < float("inf"):
+                parser.error(f"The scale must be a positive number: {scale:g}")
+
+    def collect_documents(self, parser: argparse.ArgumentParser) -> List[InputDocument]:
+        input_collector = InputCollector()
+        documents = input_collector.expand(self.args.input_files)
+
+        try:
+            if self.args.manifest == "-":
+                manifest_documents = input_collector.read_manifest(sys.stdin)
+            elif self.args.manifest:
+                with open(self.args.manifest, "r", encoding="utf-8") as manifest:
+                    manifest_documents = input_collector.read_manifest(manifest)
+            else:
+                manifest_documents = []
+        except OSError as e:
+            parser.error(f"Could not read the manifest: {e}")
+        except ValueError as e:
+            parser.error(f"Invalid manifest: {e}")
+
+        return documents + manifest_documents
 
     @staticmethod
     def create_parser():
         parser = argparse.ArgumentParser(
-            description="Convert a Markdown file to a series of images."
+            description="Convert a Markdown file to a series of images.",
+            epilog="Run 'md-image-generator serve --help' to render over HTTP instead.",
         )
         parser.add_argument(
             "--version",
@@ -30,7 +80,22 @@ class CommandLineInterface:
             version=f"Markdown Image Generator v{VERSION}",
             help="Show program's version number and exit",
         )
-        parser.add_argument("input_file", help="The input Markdown file.")
+        parser.add_argument(
+            "input_files",
+            metavar="input_file",
+            nargs="*",
+            help="The input Markdown files, glob patterns such as 'docs/**/*.md' "
+            "are expanded. When several files are given, the images of each one "
+            "are saved to its own subdirectory of the output directory.",
+        )
+        parser.add_argument(
+            "-m",
+            "--manifest",
+            dest="manifest",
+            help="A file listing the input Markdown files, '-' to read it from "
+            "stdin. Each line is either a path or a JSON object such as "
+            '{"path": "intro.md", "output": "intro"}.',
+        )
         parser.add_argument(
             "-o",
             "--output",
@@ -53,29 +118,379 @@ class CommandLineInterface:
             action="store_true",
             help="Do not display the images on the screen.",
         )
+        parser.add_argument(
+            "--scale",
+            dest="scales",
+            type=float,
+            action="append",
+            help="Scale factor of the output images, e.g. 2 for retina or 0.25 "
+            "for thumbnails. Can be repeated, the document is laid out once and "
+            "each scale is saved to its own '<scale>x' subdirectory.",
+        )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            dest="jobs",
+            type=int,
+            default=1,
+            help="Number of processes used to rasterize the pages in parallel.",
+        )
+        parser.add_argument(
+            "--watch",
+            dest="watch",
+            action="store_true",
+            help="Keep running and re-render the pages affected by every change "
+            "of the input file. Requires an output directory.",
+        )
+        parser.add_argument(
+            "--no-cache",
+            dest="no_cache",
+            action="store_true",
+            help="Do not read or write the on-disk cache of rendered pages, "
+            "tables and code blocks, even when the CACHE section of the "
+            "configuration enables it.",
+        )
+        parser.add_argument(
+            "--profile",
+            dest="profile",
+            help="The encoder profile of the images: png, fast (quick previews), "
+            "small (smallest PNG), webp-lossless, webp, jpeg, or a profile of the "
+            "OUTPUT section of the configuration. Defaults to its PROFILE, or png.",
+        )
+        parser.add_argument(
+            "--palette",
+            dest="palette",
+            action="store_true",
+            help="Save the PNG pages drawn with few colors as palette images, "
+            "which are about half the size.",
+        )
+        parser.add_argument(
+            "--palette-report",
+            dest="palette_report",
+            action="store_true",
+            help="Like --palette, and also encode the palette pages as RGB to "
+            "report the bytes saved per page, which doubles their encoding time.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            dest="dry_run",
+            action="store_true",
+            help="Only paginate the document and print the page count and "
+            "block placements as JSON, without rendering any image.",
+        )
         return parser
 
 
+def watch(
+    converter: "MarkdownToImageConverter",
+    scales: List[float],
+    image_savers: List["ImageSaver"],
+) -> int:
+    print(f"Watching {converter.input_file} for changes, press Ctrl+C to stop.")
+    try:
+        for update in converter.watch(scales):
+            for page_index, images in update.changed.items():
+                for image_saver, image in zip(image_savers, images):
+                    image_saver.save_page(image, page_index)
+            for page_index in update.removed:
+                for image_saver in image_savers:
+                    image_saver.remove_page(page_index)
+            print(
+                f"Rendered {len(update.changed)} of {update.page_count} pages",
+                flush=True,
+            )
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def dry_run(converter: "MarkdownToImageConverter", indent: Optional[int]) -> int:
+    pages = converter.layout()
+    if pages is None:
+        logger.error(f"The document could not be laid out: {converter.input_file}")
+        return 1
+    report = {
+        "input": converter.input_file,
+        "page_count": len(pages),
+        "pages": [page.to_dict() for page in pages],
+    }
+    print(json.dumps(report, indent=indent))
+    return 0
+
+
+def print_palette_reports(reports: Dict[str, "PaletteReport"]) -> None:
+    for path, report in reports.items():
+        if report.quantized and report.rgb_bytes:
+            print(
+                f"{path}: {report.colors} colors, {report.rgb_bytes / 1024:.1f} KiB "
+                f"as RGB, {report.written_bytes / 1024:.1f} KiB with a palette"
+            )
+        elif report.quantized:
+            print(
+                f"{path}: {report.colors} colors, "
+                f"{report.written_bytes / 1024:.1f} KiB with a palette"
+            )
+        else:
+            print(f"{path}: {report.colors} colors, kept RGB")
+
+    rgb_bytes = sum(report.rgb_bytes for report in reports.values())
+    saved_bytes = sum(report.saved_bytes for report in reports.values())
+    if rgb_bytes:
+        print(
+            f"Palette saved {saved_bytes / 1024:.1f} of {rgb_bytes / 1024:.1f} KiB "
+            f"({saved_bytes / rgb_bytes:.0%})"
+        )
+
+
+def convert(
+    converter: "MarkdownToImageConverter",
+    output_directory: Optional[Path],
+    scales: List[float],
+    watch_file: bool,
+    show: bool,
+    profile: Optional["EncoderProfile"] = None,
+    palette: Optional["PaletteQuantizer"] = None,
+    measure_palette: bool = False,
+) -> int:
+    from src.input_output.image_saver import ImageSaver, PageWriter
+
+    image_savers = []
+    if output_directory is not None:
+        for scale in scales:
+            scale_directory = output_directory
+            if len(scales) > 1:
+                scale_directory = output_directory / f"{scale:g}x"
+            scale_directory.mkdir(parents=True, exist_ok=True)
+            image_savers.append(
+                ImageSaver(
+                    str(scale_directory),
+                    profile=profile,
+                    palette=palette,
+                    measure_palette=measure_palette,
+                )
+            )
+
+    if watch_file:
+        return watch(converter, scales, image_savers)
+
+    # Pages are encoded and written by a few threads while the next ones are
+    # rendered, and only a few pages are held in memory at a time.
+    file_paths = []
+    try:
+        with PageWriter() as writer:
+            for page_index, images in enumerate(converter.iter_pages_at_scales(scales)):
+                for image_saver, image in zip(image_savers, images):
+                    file_name = image_saver.page_file_name(page_index)
+                    writer.submit(image_saver, image, file_name)
+                    file_paths.append(image_saver.file_path(file_name))
+
+                if show:
+                    images[0].show()
+    except Exception as e:
+        logger.error(
+            f"No image could be generated for {converter.input_file}: {e}",
+            exc_info=True,
+        )
+        return 1
+    if writer.reports:
+        # Pages finish out of order on the writer threads
+        print_palette_reports(
+            {path: writer.reports[path] for path in file_paths if path in writer.reports}
+        )
+    if writer.errors:
+        logger.error(
+            f"{len(writer.errors)} images of {converter.input_file} could not be saved"
+        )
+        return 1
+    return 0
+
+
+def create_serve_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="md-image-generator serve",
+        description="Serve an HTTP endpoint rendering Markdown to images. POST the "
+        "Markdown to /render?theme=<name> to receive its pages as a zip archive, "
+        "or as multipart/mixed with format=multipart. Themes stay loaded between "
+        "requests.",
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="The address to listen on."
+    )
+    parser.add_argument(
+        "--port", type=int, default=8000, help="The port to listen on, 0 for any."
+    )
+    parser.add_argument(
+        "--themes",
+        dest="themes_directory",
+        default="themes",
+        help="The directory of the theme files, a theme is named after its file.",
+    )
+    parser.add_argument(
+        "--default-theme",
+        dest="default_theme",
+        default="dark_modern",
+        help="The theme of requests that do not name one.",
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        dest="config_path",
+        help="Path to the configuration file, only its CACHE section is used.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        action="store_true",
+        help="Do not read or write the on-disk cache of rendered pages, even "
+        "when the CACHE section of the configuration enables it.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Number of worker processes rendering the documents, each one "
+        "preloads every theme before its first document. 0 renders in the "
+        "server process (default: 0)",
+    )
+    parser.add_argument(
+        "--max-jobs-per-worker",
+        dest="max_jobs_per_worker",
+        type=int,
+        default=200,
+        help="Replace a worker after this many documents, to contain memory "
+        "growth (default: 200)",
+    )
+    parser.add_argument(
+        "--result-ttl",
+        dest="result_ttl",
+        type=float,
+        default=5.0,
+        help="Seconds the pages of a document are reused for identical requests, "
+        "identical requests arriving while it renders always share it (default: 5)",
+    )
+    return parser
+
+
+def serve(argv: List[str]) -> int:
+    parser = create_serve_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error(f"The number of workers cannot be negative: {args.workers}")
+    if args.max_jobs_per_worker < 1:
+        parser.error(
+            f"The jobs per worker must be at least 1: {args.max_jobs_per_worker}"
+        )
+    if args.result_ttl < 0:
+        parser.error(f"The result TTL cannot be negative: {args.result_ttl}")
+
+    from src.input_output.render_server import RenderServer, RenderService
+    from src.utils.render_cache import RenderCache
+
+    if not Path(args.themes_directory).is_dir():
+        logger.error(f"The themes directory does not exist: {args.themes_directory}")
+        return 1
+    if args.config_path:
+        Config().init_config(path=Path(args.config_path))
+
+    render_cache = None if args.no_cache else RenderCache.from_config()
+    service = RenderService(args.themes_directory, render_cache, args.default_theme)
+    pool = None
+    if args.workers:
+        from src.input_output.worker_pool import RenderPool
+
+        pool = RenderPool(service, args.workers, args.max_jobs_per_worker)
+
+    try:
+        with RenderServer(
+            (args.host, args.port), service, pool, args.result_ttl
+        ) as server:
+            host, port = server.server_address[:2]
+            print(f"Serving on http://{host}:{port}, press Ctrl+C to stop.", flush=True)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return 0
+
+
 def main():
+    # A file named "serve" can still be converted as "./serve"
+    if sys.argv[1:2] == ["serve"]:
+        return serve(sys.argv[2:])
+
     cli = CommandLineInterface()
 
+    from src.converters.md_to_image.md_to_image import MarkdownToImageConverter
+    from src.image_generation.image_generator import ImageGenerator
+    from src.image_generation.render_context import RenderContext
+    from src.input_output.encoder_profile import get_profile
+    from src.utils.render_cache import RenderCache
+
     if cli.args.config_path:
         Config().init_config(path=Path(cli.args.config_path))
 
-    converter = MarkdownToImageConverter(input_file=cli.args.input_file)
-    images = converter.convert()
-    if images is None:
-        logger.error("No image could be generated")
+    try:
+        profile = get_profile(cli.args.profile)
+        palette = None
+        palette_config = Config().get("OUTPUT", {}).get("PALETTE", {})
+        if (
+            cli.args.palette
+            or cli.args.palette_report
+            or palette_config.get("ENABLED", False)
+        ):
+            from src.input_output.palette import PaletteQuantizer
+
+            palette = PaletteQuantizer.from_config(palette_config)
+            if profile.format != "PNG":
+                logger.warning(f"The palette is only used by PNG profiles, not {profile.name}")
+    except ValueError as e:
+        logger.error(f"{e}")
         return 1
 
-    if cli.args.output_directory:
-        image_saver = ImageSaver(cli.args.output_directory)
-        image_saver.save_images(images)
+    scales = cli.args.scales or [1.0]
+    batch = len(cli.documents) > 1
+    output_names = InputCollector.output_names(cli.documents)
+
+    # All documents are converted in this process with the same generator, so
+    # the configuration, strategies and their caches are loaded once per batch.
+    render_cache = None if cli.args.no_cache else RenderCache.from_config()
+    image_generator = ImageGenerator(render_cache, RenderContext.from_config())
+
+    failures = 0
+    for document, output_name in zip(cli.documents, output_names):
+        converter = MarkdownToImageConverter(
+            input_file=document.path,
+            jobs=cli.args.jobs,
+            image_generator=image_generator,
+        )
+
+        if cli.args.dry_run:
+            # A batch prints one JSON report per line
+            failures += dry_run(converter, indent=None if batch else 2)
+            continue
+
+        output_directory = None
+        if cli.args.output_directory:
+            output_directory = Path(cli.args.output_directory)
+            if batch:
+                output_directory = output_directory / output_name
+
+        failures += convert(
+            converter,
+            output_directory,
+            scales,
+            watch_file=cli.args.watch,
+            show=not cli.args.no_show,
+            profile=profile,
+            palette=palette,
+            measure_palette=cli.args.palette_report,
+        )
 
-    if not cli.args.no_show:
-        for image in images:
-            image.show()
+    return 1 if failures else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -2,6 +2,8 @@ import json
 from pathlib import Path
 from typing import Any, Dict
 
+from src.utils.settings import RenderSettings
+
 
 def singleton(cls):
     instances = {}
@@ -58,6 +60,11 @@ class Config:
             "HEADER_FG_COLOR": "#000000",
             "HEIGHT": 8,
         },
+        "CACHE": {
+            "ENABLED": False,
+            "DIRECTORY": None,
+            "MAX_SIZE_MB": 512,
+        },
     }
 
     def __init__(self):
@@ -70,6 +77,10 @@ class Config:
             self._save_defaults()
         self._load_config()
 
+    @property
+    def path(self) -> Path:
+        return self._config_file
+
     def _load_config(self) -> None:
         try:
             with self._config_file.open("r") as file:
@@ -86,6 +97,16 @@ class Config:
         with self._config_file.open("w") as file:
             json.dump(self._config_data, file, indent=4)
 
+    def snapshot(self) -> RenderSettings:
+        """
+        Take an immutable snapshot of the current rendering settings.
+
+        Raises:
+            KeyError: If a required setting is missing.
+            ValueError: If a color cannot be parsed.
+        """
+        return RenderSettings.from_dict(self._config_data)
+
     def get(self, key: str, default: Any = None) -> Any:
         return self._config_data.get(key, default)
 
@@ -0,0 +1,33 @@
+import os
+import threading
+import weakref
+
+# The objects whose locks are replaced in forked children, by id and attribute
+_owners: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
+
+
+def fork_safe_lock(owner: object, attribute: str = "_lock") -> threading.Lock:
+    """
+    Create a lock for ``owner.attribute`` that is replaced in forked children.
+
+    A lock held by another thread when the process forks stays held forever in
+    the child, which only gets the forking thread. Each object holding a lock is
+    registered here and a new lock is set on it after every fork, so objects
+    inherited by forked workers, such as the caches of a preloaded service, can
+    be used in them.
+
+    Args:
+        owner (object): The object storing the lock, it is not kept alive.
+        attribute (str): The attribute the lock is stored in.
+    """
+    _owners[(id(owner), attribute)] = owner
+    return threading.Lock()
+
+
+def _replace_locks() -> None:
+    for (_, attribute), owner in list(_owners.items()):
+        setattr(owner, attribute, threading.Lock())
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_replace_locks)
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, List, Mapping, Optional, Tuple
+
+import PIL
+from PIL import Image
+
+from src import __version__
+from src.utils.fork_safety import fork_safe_lock
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE_MB = 512
+# Sections of the configuration that do not change how pages look
+NON_RENDER_SECTIONS = ("CACHE", "OUTPUT")
+
+
+@lru_cache(maxsize=None)
+def _hash_file_contents(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    Hash of the contents of a file, such as a font or a background image.
+
+    The hash is computed once per process for every version of the file. Missing
+    files hash to a fixed value, so they are part of the key as well.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+    return _hash_file_contents(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+class RenderCache:
+    """
+    Content addressed cache of rendered images on disk.
+
+    Entries are PNG files named after the hash of everything that affects them,
+    so an entry is never stale, it is just no longer looked up. The least recently
+    used entries are evicted once the cache grows over ``max_size`` bytes.
+
+    The instance can be pickled, so worker processes share the same directory,
+    and used from several threads. Each process keeps its own estimate of the
+    cache size, which is refreshed from the disk whenever entries are evicted.
+    """
+
+    def __init__(self, directory: Path, max_size: int = DEFAULT_MAX_SIZE_MB * 1024**2):
+        """
+        Args:
+            directory (Path): Where the entries are stored, created when needed.
+            max_size (int): Size in bytes above which entries are evicted.
+        """
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._size: Optional[int] = None
+        self._size_lock = fork_safe_lock(self, "_size_lock")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_size_lock"]
+        return state
+
+    def __setstate__(self, state) -> None:
+        self.__dict__.update(state)
+        self._size_lock = fork_safe_lock(self, "_size_lock")
+
+    @staticmethod
+    def default_directory() -> Path:
+        cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        return Path(cache_home) / "md-image-generator"
+
+    @classmethod
+    def from_config(cls) -> Optional["RenderCache"]:
+        """
+        Create the cache described by the optional ``CACHE`` section of the configuration.
+
+        The cache is opt-in: it is only created when ``CACHE.ENABLED`` is true.
+
+        Returns:
+            Optional[RenderCache]: The cache, or None if it is disabled.
+        """
+        cache_config = Config().get("CACHE", {})
+        if not cache_config.get("ENABLED", False):
+            return None
+
+        directory = cache_config.get("DIRECTORY") or cls.default_directory()
+        max_size_mb = cache_config.get("MAX_SIZE_MB", DEFAULT_MAX_SIZE_MB)
+        return cls(Path(directory).expanduser(), int(max_size_mb * 1024**2))
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """
+        Hash the given JSON serializable parts together with the library versions.
+
+        Callers pass the block text and the configuration values it depends on.
+        """
+        payload = json.dumps(
+            [__version__, PIL.__version__, *parts], sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def config_fingerprint(
+        paths: Iterable[str] = (), config: Optional[Mapping[str, Any]] = None
+    ) -> str:
+        """
+        Hash the whole configuration and the contents of the files it points to.
+
+        Used for page images, which depend on every setting, the fonts and the
+        background images. ``paths`` lists extra files to hash, ``config`` is the
+        configuration to hash instead of the global one.
+        """
+        if config is None:
+            config = Config()
+        files = {path for path in config.get("PATHS", {}).values() if path} | set(paths)
+        return RenderCache.key(
+            {key: config[key] for key in config if key not in NON_RENDER_SECTIONS},
+            {path: file_fingerprint(path) for path in sorted(files)},
+        )
+
+    def _entry_path(self, namespace: str, key: str) -> Path:
+        return self.directory / namespace / key[:2] / f"{key}.png"
+
+    def get(self, namespace: str, key: str) -> Optional[Image.Image]:
+        """
+        Look up an image.
+
+        Args:
+            namespace (str): The kind of image, e.g. "pages" or "tables".
+            key (str): The key returned by ``key``.
+
+        Returns:
+            Optional[Image.Image]: The image, or None on a miss.
+        """
+        path = self._entry_path(namespace, key)
+        try:
+            with Image.open(path) as image:
+                image.load()
+            # The modification time records the last use, for eviction
+            os.utime(path)
+        except (OSError, SyntaxError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return image
+
+    def put(self, namespace: str, key: str, image: Image.Image) -> None:
+        """
+        Store an image, evicting the least recently used entries if the cache is full.
+
+        Errors are logged, a cache that cannot be written only makes rendering slower.
+        """
+        path = self._entry_path(namespace, key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            image.save(tmp_path, format="PNG", compress_level=1)
+            # Renaming is atomic, so concurrent readers never see a partial file
+            os.replace(tmp_path, path)
+            entry_size = path.stat().st_size
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {path}: {e}")
+            return
+
+        with self._size_lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += entry_size
+
+            if self._size > self.max_size:
+                self._evict()
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._size_lock:
+            for path in self._entries():
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+    def _entries(self):
+        return self.directory.glob("*/*/*.png")
+
+    def _stat_entries(self) -> List[Tuple[int, int, Path]]:
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                # Evicted by another process in the meantime
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def _disk_usage(self) -> int:
+        return sum(entry_size for _, entry_size, _ in self._stat_entries())
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until the cache is 10% below its cap."""
+        entries = sorted(self._stat_entries())
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target = self.max_size * 0.9
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            size -= entry_size
+        self._size = size
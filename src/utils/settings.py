@@ -0,0 +1,253 @@
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Sequence, Tuple, Union
+
+from src.utils.other import hex_to_rgba
+
+RGBA = Tuple[int, int, int, int]
+
+
+def to_rgba(value: Union[str, Sequence[int]]) -> RGBA:
+    """
+    Convert a configured color to an RGBA tuple.
+
+    Args:
+        value: A hex code such as ``"#ff79c6"``, any other color string Pillow
+            understands, or an RGB or RGBA sequence.
+
+    Returns:
+        RGBA: The color, opaque unless it has an alpha component.
+
+    Raises:
+        ValueError: If the color cannot be parsed.
+    """
+    if isinstance(value, str):
+        if value.startswith("#"):
+            color = hex_to_rgba(value)
+        else:
+            # Named and functional colors are rare, Pillow is only loaded for them
+            from PIL import ImageColor
+
+            color = ImageColor.getcolor(value, "RGBA")
+    else:
+        color = tuple(int(channel) for channel in value)
+    if len(color) == 3:
+        color = (*color, 255)
+    if len(color) != 4:
+        raise ValueError(f"Invalid color {value!r}")
+    return color
+
+
+class _Snapshot:
+    """
+    Base of the frozen settings dataclasses.
+
+    Python 3.8 has no ``dataclass(slots=True)``, so the subclasses declare their
+    ``__slots__`` and pickle their fields here, frozen instances reject the
+    ``setattr`` pickle restores slots with.
+    """
+
+    __slots__ = ()
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, field.name) for field in fields(self))
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        for field, value in zip(fields(self), state):
+            object.__setattr__(self, field.name, value)
+
+
+@dataclass(frozen=True)
+class PageSettings(_Snapshot):
+    """The PAGE_LAYOUT section, with ``LEFT_MARGIN`` defaulting to ``RIGHT_MARGIN``."""
+
+    __slots__ = (
+        "width",
+        "height",
+        "top_margin",
+        "bottom_margin",
+        "left_margin",
+        "right_margin",
+        "start_index",
+    )
+
+    width: int
+    height: int
+    top_margin: int
+    bottom_margin: int
+    left_margin: int
+    right_margin: int
+    start_index: int
+
+    @classmethod
+    def from_dict(cls, layout: Dict[str, Any]) -> "PageSettings":
+        return cls(
+            width=layout["IMAGE_WIDTH"],
+            height=layout["IMAGE_HEIGHT"],
+            top_margin=layout["TOP_MARGIN"],
+            bottom_margin=layout["BOTTOM_MARGIN"],
+            left_margin=layout.get("LEFT_MARGIN", layout["RIGHT_MARGIN"]),
+            right_margin=layout["RIGHT_MARGIN"],
+            start_index=layout.get("START_INDEX", 0),
+        )
+
+
+@dataclass(frozen=True)
+class ColorSettings(_Snapshot):
+    """The COLORS section as RGBA tuples, optional colors resolved to their fallbacks."""
+
+    __slots__ = (
+        "text",
+        "background",
+        "page_number_background",
+        "highlight",
+        "italic",
+        "link",
+        "inline_code_bg",
+        "inline_code_fg",
+        "quote_bg",
+        "header",
+        "title",
+        "bullet",
+        "number",
+        "quote",
+        "quote_border",
+        "divider",
+    )
+
+    text: RGBA
+    background: RGBA
+    page_number_background: RGBA
+    highlight: RGBA
+    italic: RGBA
+    link: RGBA
+    inline_code_bg: RGBA
+    inline_code_fg: RGBA
+    quote_bg: RGBA
+    header: RGBA
+    title: RGBA
+    bullet: RGBA
+    number: RGBA
+    quote: RGBA
+    quote_border: RGBA
+    divider: RGBA
+
+    @classmethod
+    def from_dict(cls, colors: Dict[str, Any]) -> "ColorSettings":
+        text = colors["TEXT"]
+        highlight = colors["HIGHLIGHT"]
+        return cls(
+            text=to_rgba(text),
+            background=to_rgba(colors.get("BACKGROUND", "#0f0f23")),
+            # The page number is drawn in the background color, black when it is not set
+            page_number_background=to_rgba(colors.get("BACKGROUND", "#000000")),
+            highlight=to_rgba(highlight),
+            italic=to_rgba(colors.get("ITALIC_COLOR", text)),
+            link=to_rgba(colors.get("LINK_COLOR", "#5dade2")),
+            inline_code_bg=to_rgba(colors.get("INLINE_CODE_BG", "#282a36")),
+            inline_code_fg=to_rgba(colors.get("INLINE_CODE_FG", "#50fa7b")),
+            quote_bg=to_rgba(colors.get("INLINE_CODE_BG", "#1a1a2e")),
+            header=to_rgba(colors.get("HEADER_COLOR", "#00d4ff")),
+            title=to_rgba(colors.get("TITLE_COLOR", "#ffffff")),
+            bullet=to_rgba(colors.get("BULLET_COLOR", highlight)),
+            number=to_rgba(colors.get("NUMBER_COLOR", highlight)),
+            quote=to_rgba(colors.get("QUOTE_COLOR", "#888888")),
+            quote_border=to_rgba(colors.get("QUOTE_BORDER", highlight)),
+            divider=to_rgba(colors.get("DIVIDER_COLOR", "#555555")),
+        )
+
+
+@dataclass(frozen=True)
+class CodeBlockSettings(_Snapshot):
+    """The CODE_BLOCK section."""
+
+    __slots__ = ("scale_factor", "background", "radius", "top_padding")
+
+    scale_factor: float
+    background: RGBA
+    radius: int
+    top_padding: int
+
+    @classmethod
+    def from_dict(cls, code_block: Dict[str, Any]) -> "CodeBlockSettings":
+        return cls(
+            scale_factor=code_block["SCALE_FACTOR"],
+            background=to_rgba(code_block["BACKGROUND"]),
+            radius=code_block["RADIUS"],
+            top_padding=code_block["TOP_PADDING"],
+        )
+
+
+@dataclass(frozen=True)
+class TableSettings(_Snapshot):
+    """The TABLE section, ``ALT_ROW_BG`` defaults to ``BACKGROUND``."""
+
+    __slots__ = (
+        "scale_factor",
+        "foreground",
+        "background",
+        "alt_row_bg",
+        "highlight",
+        "header_fg",
+        "header_bg",
+        "border",
+    )
+
+    scale_factor: float
+    foreground: RGBA
+    background: RGBA
+    alt_row_bg: RGBA
+    highlight: RGBA
+    header_fg: RGBA
+    header_bg: RGBA
+    border: RGBA
+
+    @classmethod
+    def from_dict(cls, table: Dict[str, Any]) -> "TableSettings":
+        return cls(
+            scale_factor=table["SCALE_FACTOR"],
+            foreground=to_rgba(table["FOREGROUND"]),
+            background=to_rgba(table["BACKGROUND"]),
+            alt_row_bg=to_rgba(table.get("ALT_ROW_BG", table["BACKGROUND"])),
+            highlight=to_rgba(table["HIGHLIGHT"]),
+            header_fg=to_rgba(table["HEADER_FG_COLOR"]),
+            header_bg=to_rgba(table["HEADER_BG_COLOR"]),
+            border=to_rgba(table.get("BORDER_COLOR", "#000000")),
+        )
+
+
+@dataclass(frozen=True)
+class RenderSettings(_Snapshot):
+    """
+    Immutable snapshot of the configuration the generator and the strategies read.
+
+    Taken once with ``Config().snapshot()``, so the hot paths read attributes
+    instead of going through the ``Config`` singleton and parsing colors on every
+    block. Later changes to the configuration do not affect a snapshot.
+    """
+
+    __slots__ = ("page", "colors", "code_block", "table", "font_path", "text_backend")
+
+    page: PageSettings
+    colors: ColorSettings
+    code_block: CodeBlockSettings
+    table: TableSettings
+    font_path: str
+    text_backend: str
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "RenderSettings":
+        """
+        Build the snapshot from the sections of a configuration.
+
+        Raises:
+            KeyError: If a required setting is missing.
+            ValueError: If a color cannot be parsed.
+        """
+        return cls(
+            page=PageSettings.from_dict(config["PAGE_LAYOUT"]),
+            colors=ColorSettings.from_dict(config["COLORS"]),
+            code_block=CodeBlockSettings.from_dict(config["CODE_BLOCK"]),
+            table=TableSettings.from_dict(config["TABLE"]),
+            font_path=config["PATHS"]["FONT"],
+            text_backend=config.get("TYPOGRAPHY", {}).get("TEXT_BACKEND", "pillow"),
+        )
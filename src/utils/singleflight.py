@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from src.utils.fork_safety import fork_safe_lock
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    """A call in flight, the callers of the same key wait on its event."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[T]):
+    """
+    Runs a call once for all the concurrent callers of the same key.
+
+    The first caller of a key runs the call, the callers arriving while it runs
+    wait for it and receive the same result, or the same exception. Results are
+    then kept for ``ttl`` seconds, so retries shortly after also get them
+    without running the call again. Exceptions are not kept.
+
+    Keys must identify everything the result depends on, such as a content hash.
+    """
+
+    def __init__(self, ttl: float = 5.0, max_results: int = 32):
+        """
+        Args:
+            ttl (float): Seconds a result is kept after its call returned, 0 to
+                only share it with the callers that waited for it.
+            max_results (int): The number of results kept, the oldest ones are
+                dropped first.
+        """
+        self.ttl = ttl
+        self.max_results = max_results
+        self.calls = 0
+        self.shared = 0
+        self._in_flight: Dict[Hashable, _Call[T]] = {}
+        self._results: "OrderedDict[Hashable, Tuple[float, T]]" = OrderedDict()
+        self._lock = fork_safe_lock(self)
+
+    def do(self, key: Hashable, function: Callable[[], T]) -> T:
+        """
+        Get the result of ``function`` for the key, calling it unless a caller already is.
+
+        Raises:
+            Exception: Whatever the call raised, to every caller waiting for it.
+        """
+        with self._lock:
+            result = self._cached(key)
+            if result is not None:
+                self.shared += 1
+                return result[1]
+
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if call.error is None and self.ttl > 0:
+                    self._results[key] = (time.monotonic() + self.ttl, call.result)
+                    while len(self._results) > self.max_results:
+                        self._results.popitem(last=False)
+            call.done.set()
+        return call.result
+
+    def _cached(self, key: Hashable) -> Optional[Tuple[float, T]]:
+        entry = self._results.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._results[key]
+            return None
+        return entry
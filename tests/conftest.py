@@ -1,6 +1,17 @@
+import shutil
+
 import pytest
 from pathlib import Path
 
+from src.utils.config import Config
+
+@pytest.fixture(autouse=True)
+def isolated_render_cache(tmp_path, monkeypatch):
+    """Points the default render cache, also used by CLI subprocesses, to a temporary directory."""
+    cache_home = tmp_path / "cache_home"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    return cache_home / "md-image-generator"
+
 @pytest.fixture
 def demo_files():
     """Returns a list of demo markdown files."""
@@ -34,3 +45,12 @@ def hello():
 """
     file_path.write_text(content)
     return file_path
+
+
+@pytest.fixture
+def test_config(tmp_path):
+    """Loads the test configuration from a temporary copy, so edits never reach the repository."""
+    config_path = tmp_path / "config.json"
+    shutil.copy(Path(__file__).parent / "e2e_tests" / "test_config.json", config_path)
+    Config().init_config(path=config_path)
+    return Config()
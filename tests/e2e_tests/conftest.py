@@ -1,6 +1,17 @@
+import json
+
 import pytest
 from pathlib import Path
 
+@pytest.fixture
+def cached_config(tmp_path):
+    """The E2E test configuration with the render cache enabled"""
+    config = json.loads((Path(__file__).parent / "test_config.json").read_text())
+    config["CACHE"] = {"ENABLED": True}
+    path = tmp_path / "cached_config.json"
+    path.write_text(json.dumps(config))
+    return path
+
 @pytest.fixture
 def temp_markdown_file(tmp_path):
     """Create a temporary markdown file with test content"""
@@ -1,4 +1,6 @@
 import os
+import subprocess
+import sys
 import pytest
 from pathlib import Path
 from tests.test_utils import run_as_module
@@ -120,3 +122,314 @@ def test_config_file_usage(temp_markdown_file, tmp_path):
     img = Image.open(output_files[0])
     assert img.width == 1080, f"Image width does not match config: {img.width}"
     assert img.height == 1080, f"Image height does not match config: {img.height}"
+
+def test_dry_run_prints_layout(temp_markdown_file, tmp_path):
+    """Test that --dry-run prints the pagination as JSON without saving images"""
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    test_config = Path(__file__).parent / "test_config.json"
+
+    result = run_as_module(
+        str(temp_markdown_file),
+        "-o", str(output_dir),
+        "-c", str(test_config),
+        "--dry-run"
+    )
+    assert result.returncode == 0
+
+    import json
+    report = json.loads(result.stdout)
+    assert report["page_count"] == len(report["pages"]) > 0
+    assert report["pages"][0]["blocks"][0]["type"] == "title"
+    assert list(output_dir.glob("*.png")) == []
+
+def test_invalid_scale_is_a_usage_error(temp_markdown_file):
+    """Test that a scale that is not positive is rejected before rendering"""
+    for scale in ["0", "-1", "nan"]:
+        result = run_as_module(str(temp_markdown_file), "--scale", scale, "--no-show")
+        assert result.returncode == 2
+        assert "The scale must be a positive number" in result.stderr
+        assert "Traceback" not in result.stderr
+
+def test_multiple_scales_are_saved_to_subdirectories(temp_markdown_file, tmp_path):
+    """Test that each --scale is rendered from the same layout into its own directory"""
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    test_config = Path(__file__).parent / "test_config.json"
+
+    result = run_as_module(
+        str(temp_markdown_file),
+        "-o", str(output_dir),
+        "-c", str(test_config),
+        "--scale", "1",
+        "--scale", "0.5",
+        "--no-show"
+    )
+    assert result.returncode == 0
+
+    from PIL import Image
+    full_size = sorted((output_dir / "1x").glob("*.png"))
+    half_size = sorted((output_dir / "0.5x").glob("*.png"))
+    assert len(full_size) == len(half_size) > 0
+    assert Image.open(full_size[0]).size == (1080, 1080)
+    assert Image.open(half_size[0]).size == (540, 540)
+
+def test_parallel_jobs(temp_markdown_file, tmp_path):
+    """Test that --jobs renders the same files as a serial run"""
+    test_config = Path(__file__).parent / "test_config.json"
+    serial_dir = tmp_path / "serial"
+    parallel_dir = tmp_path / "parallel"
+    serial_dir.mkdir()
+    parallel_dir.mkdir()
+
+    for output_dir, jobs in [(serial_dir, "1"), (parallel_dir, "2")]:
+        result = run_as_module(
+            str(temp_markdown_file),
+            "-o", str(output_dir),
+            "-c", str(test_config),
+            "--jobs", jobs,
+            "--no-show"
+        )
+        assert result.returncode == 0
+
+    serial_files = sorted(p.name for p in serial_dir.glob("*.png"))
+    assert serial_files == sorted(p.name for p in parallel_dir.glob("*.png"))
+    for name in serial_files:
+        assert (serial_dir / name).read_bytes() == (parallel_dir / name).read_bytes()
+
+def test_invalid_jobs():
+    """Test that a job count below 1 is rejected"""
+    result = run_as_module("README.md", "--jobs", "0")
+    assert result.returncode != 0
+    assert "number of jobs" in result.stderr
+
+def test_encoder_profile(temp_markdown_file, tmp_path):
+    """Test that --profile selects the format and extension of the images"""
+    test_config = Path(__file__).parent / "test_config.json"
+    png_dir = tmp_path / "png"
+    webp_dir = tmp_path / "webp"
+
+    for output_dir, profile in [(png_dir, "png"), (webp_dir, "webp-lossless")]:
+        result = run_as_module(
+            str(temp_markdown_file),
+            "-o", str(output_dir),
+            "-c", str(test_config),
+            "--profile", profile,
+            "--no-show"
+        )
+        assert result.returncode == 0
+
+    png_files = sorted(png_dir.glob("*.png"))
+    webp_files = sorted(webp_dir.glob("*.webp"))
+    assert [p.stem for p in png_files] == [p.stem for p in webp_files]
+    assert not list(webp_dir.glob("*.png"))
+
+def test_unknown_encoder_profile(temp_markdown_file):
+    """Test that an unknown profile is rejected before rendering"""
+    result = run_as_module(str(temp_markdown_file), "--profile", "gif", "--no-show")
+    assert result.returncode != 0
+    assert "Unknown encoder profile gif" in result.stderr
+
+def test_palette_writes_palette_images(temp_markdown_file, tmp_path):
+    """Test that --palette writes palette images without measuring their RGB size"""
+    test_config = Path(__file__).parent / "test_config.json"
+    output_dir = tmp_path / "output"
+    result = run_as_module(
+        str(temp_markdown_file),
+        "-o", str(output_dir),
+        "-c", str(test_config),
+        "--palette",
+        "--no-show"
+    )
+    assert result.returncode == 0
+    assert "output0.png: " in result.stdout
+    assert "Palette saved" not in result.stdout
+
+def test_palette_report_reports_bytes_saved(temp_markdown_file, tmp_path):
+    """Test that --palette-report reports the savings per page"""
+    test_config = Path(__file__).parent / "test_config.json"
+    output_dir = tmp_path / "output"
+    result = run_as_module(
+        str(temp_markdown_file),
+        "-o", str(output_dir),
+        "-c", str(test_config),
+        "--palette-report",
+        "--no-show"
+    )
+    assert result.returncode == 0
+    assert "output0.png: " in result.stdout
+    assert "Palette saved" in result.stdout
+
+def test_batch_saves_each_document_to_its_own_directory(temp_markdown_file, tmp_path):
+    """Test that several inputs are converted in one run into per-document directories"""
+    output_dir = tmp_path / "output"
+    second = tmp_path / "second.md"
+    second.write_text("# Second\n\nAnother document.\n")
+    test_config = Path(__file__).parent / "test_config.json"
+
+    result = run_as_module(
+        str(tmp_path / "*.md"),
+        "-o", str(output_dir),
+        "-c", str(test_config),
+        "--no-show"
+    )
+    assert result.returncode == 0
+
+    assert list((output_dir / "test").glob("*.png"))
+    assert list((output_dir / "second").glob("*.png"))
+    assert list(output_dir.glob("*.png")) == []
+
+def test_batch_manifest_from_stdin(temp_markdown_file, tmp_path):
+    """Test that a JSONL manifest read from stdin selects inputs and output names"""
+    output_dir = tmp_path / "output"
+    other = tmp_path / "other.md"
+    other.write_text("# Other\n")
+    test_config = Path(__file__).parent / "test_config.json"
+
+    manifest = (
+        f'{{"path": "{temp_markdown_file}", "output": "first"}}\n'
+        f'{{"path": "{other}"}}\n'
+    )
+    result = run_as_module(
+        "--manifest", "-",
+        "-o", str(output_dir),
+        "-c", str(test_config),
+        "--dry-run",
+        input=manifest
+    )
+    assert result.returncode == 0
+
+    import json
+    reports = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [report["input"] for report in reports] == [str(temp_markdown_file), str(other)]
+    assert all(report["page_count"] > 0 for report in reports)
+
+def test_batch_invalid_manifest(temp_markdown_file):
+    """Test that a malformed manifest is reported as a usage error"""
+    for manifest in ['{"path": \n', f'{{"path": "{temp_markdown_file}", "output": "../x"}}\n']:
+        result = run_as_module("--manifest", "-", "--dry-run", input=manifest)
+        assert result.returncode == 2
+        assert "Invalid manifest" in result.stderr
+        assert "Traceback" not in result.stderr
+
+def test_batch_missing_input_file(temp_markdown_file):
+    """Test that a batch is rejected before rendering when one of its files is missing"""
+    result = run_as_module(str(temp_markdown_file), "nonexistent.md")
+    assert result.returncode != 0
+    assert "Input file does not exist: nonexistent.md" in result.stderr
+
+def test_render_cache_is_disabled_by_default(temp_markdown_file, tmp_path, isolated_render_cache):
+    """Test that nothing is cached unless the configuration enables the cache"""
+    test_config = Path(__file__).parent / "test_config.json"
+    result = run_as_module(
+        str(temp_markdown_file),
+        "-o", str(tmp_path),
+        "-c", str(test_config),
+        "--no-show"
+    )
+    assert result.returncode == 0
+    assert not isolated_render_cache.exists()
+
+def test_render_cache_reuses_pages(
+    temp_markdown_file, tmp_path, isolated_render_cache, cached_config
+):
+    """Test that a second run loads the pages from the render cache with the same output"""
+    test_config = cached_config
+    outputs = []
+    for name in ["first", "second"]:
+        output_dir = tmp_path / name
+        output_dir.mkdir()
+        result = run_as_module(
+            str(temp_markdown_file),
+            "-o", str(output_dir),
+            "-c", str(test_config),
+            "--no-show"
+        )
+        assert result.returncode == 0
+        outputs.append({p.name: p.read_bytes() for p in output_dir.glob("*.png")})
+
+    assert outputs[0] and outputs[0] == outputs[1]
+    assert list((isolated_render_cache / "pages").glob("*/*.png"))
+
+def test_no_cache_flag(temp_markdown_file, tmp_path, isolated_render_cache, cached_config):
+    """Test that --no-cache leaves the cache directory untouched"""
+    test_config = cached_config
+    result = run_as_module(
+        str(temp_markdown_file),
+        "-o", str(tmp_path),
+        "-c", str(test_config),
+        "--no-show",
+        "--no-cache"
+    )
+    assert result.returncode == 0
+    assert not isolated_render_cache.exists()
+
+def test_render_cache_without_code_does_not_load_pygments(
+    tmp_path, isolated_render_cache, cached_config
+):
+    """Test that a cached conversion of a document without code never imports Pygments"""
+    markdown_file = tmp_path / "plain.md"
+    markdown_file.write_text("# Plain\n\nA paragraph without any code.\n")
+    test_config = cached_config
+    argv = [str(markdown_file), "-o", str(tmp_path), "-c", str(test_config), "--no-show"]
+    code = (
+        "import sys, src.main; "
+        f"sys.argv = ['main'] + {argv!r}; "
+        "src.main.main(); "
+        "print('pygments' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True,
+        cwd=Path(__file__).parent.parent.parent
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines()[-1] == "False"
+    assert list((isolated_render_cache / "pages").glob("*/*.png"))
+
+def test_startup_does_not_load_rendering_dependencies():
+    """Test that importing the CLI leaves Pillow, NumPy and Pygments unloaded"""
+    code = (
+        "import sys, src.main; "
+        "print(sorted(m for m in ('PIL', 'numpy', 'pygments') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+# Modules that would slow down startup if importing src.main loaded them. They
+# are checked instead of timing the import, which depends on the machine.
+HEAVY_STARTUP_MODULES = (
+    "asyncio",
+    "multiprocessing",
+    "http.server",
+    "zipfile",
+    "src.image_generation",
+    "src.converters",
+    "src.input_output.render_server",
+)
+
+def test_startup_does_not_load_rendering_modules():
+    """Test that importing the CLI leaves the rendering and server modules unloaded"""
+    code = (
+        "import sys, src.main; "
+        f"print(sorted(m for m in {HEAVY_STARTUP_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+def test_serve_help():
+    """Test that the serve command has its own options"""
+    result = run_as_module("serve", "--help")
+    assert result.returncode == 0
+    assert "--default-theme" in result.stdout
+
+def test_serve_missing_themes_directory(tmp_path):
+    """Test that serve fails when the themes directory is missing"""
+    result = run_as_module("serve", "--themes", str(tmp_path / "missing"))
+    assert result.returncode != 0
+    assert "themes directory does not exist" in result.stderr
@@ -1,17 +1,19 @@
 """Test utilities for running E2E tests."""
 import subprocess
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Union
 
 def run_as_module(
     *args: Union[str, Path],
-    cwd: Union[str, Path, None] = None
+    cwd: Union[str, Path, None] = None,
+    input: Optional[str] = None
 ) -> subprocess.CompletedProcess:
     """Run the package as a module with given arguments.
     
     Args:
         *args: Arguments to pass to the module
         cwd: Working directory to run from
+        input: Text written to the standard input
         
     Returns:
         CompletedProcess instance with return code and output
@@ -20,6 +22,7 @@ def run_as_module(
     result = subprocess.run(
         cmd,
         cwd=cwd,
+        input=input,
         capture_output=True,
         text=True
     )
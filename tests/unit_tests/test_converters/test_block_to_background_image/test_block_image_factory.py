@@ -1,5 +1,10 @@
+import math
+
+import numpy as np
+from src.converters.block_to_background_image.block_image_factory import (
+    BlockImageFactory,
+)
 from src.data.background_image_type import BackgroundImageType
-from src.utils.config import Config
 from PIL import Image
 import pytest
 
@@ -32,12 +37,7 @@ def block_image_factory(tmp_path):
         }
     }
 
-    Config()["PATHS"] = config_data["PATHS"]
-    from src.converters.block_to_background_image.block_image_factory import (
-        BlockImageFactory,
-    )
-
-    return BlockImageFactory()
+    return BlockImageFactory(config_data)
 
 
 @pytest.fixture(scope="function")
@@ -52,12 +52,7 @@ def block_image_factory_empty(tmp_path):
         }
     }
 
-    Config()["PATHS"] = config_data["PATHS"]
-    from src.converters.block_to_background_image.block_image_factory import (
-        BlockImageFactory,
-    )
-
-    return BlockImageFactory()
+    return BlockImageFactory(config_data)
 
 
 def test_create_background_image_with_existing_path(block_image_factory_empty):
@@ -80,8 +75,7 @@ def test_create_background_image_with_existing_path(block_image_factory_empty):
 def test_create_background_image_with_non_existing_path(block_image_factory):
 
     # Mock the config with missing image paths
-    config_data = {}
-    block_image_factory._config = Config(config_data)
+    block_image_factory = BlockImageFactory({})
 
     block_type_str = "title"
     width = 800
@@ -111,3 +105,115 @@ def test_translate_block_type(block_image_factory):
         block_image_factory._translate_block_type("invalid")
         == BackgroundImageType.NORMAL
     )
+
+
+def gradient_pixel(start, end, direction, x, y, width, height):
+    """Reference color of one pixel, as the gradient used to be drawn point by point."""
+    if direction == "vertical":
+        ratio = y / height
+    elif direction == "diagonal":
+        ratio = (x + y) / (width + height)
+    elif direction == "radial":
+        center_x, center_y = width // 2, height // 2
+        max_dist = math.sqrt(center_x**2 + center_y**2)
+        ratio = min(math.sqrt((x - center_x) ** 2 + (y - center_y) ** 2) / max_dist, 1.0)
+    else:
+        ratio = x / width
+    return tuple(int(start[c] + (end[c] - start[c]) * ratio) for c in range(3))
+
+
+@pytest.mark.parametrize("direction", ["vertical", "diagonal", "radial", "horizontal"])
+@pytest.mark.parametrize("start, end", [((26, 26, 46), (22, 33, 62)), ((0, 212, 255), (189, 147, 249))])
+def test_gradient_matches_per_pixel_drawing(direction, start, end):
+    width, height = 61, 37
+    pixels = BlockImageFactory._gradient_pixels(start, end, direction, width, height)
+
+    expected = [
+        [gradient_pixel(start, end, direction, x, y, width, height) for x in range(width)]
+        for y in range(height)
+    ]
+    assert pixels.tolist() == [[list(p) for p in row] for row in expected]
+
+
+@pytest.fixture
+def background_cache(monkeypatch):
+    factory = BlockImageFactory({"PATHS": {}})
+    builds = []
+    build = factory._build_background_image
+
+    def counting_build(block_type, width, height):
+        builds.append((block_type, width, height))
+        return build(block_type, width, height)
+
+    monkeypatch.setattr(factory, "_build_background_image", counting_build)
+    return factory, builds
+
+
+def test_backgrounds_are_built_once_and_copied(background_cache):
+    factory, builds = background_cache
+
+    first = factory.create_background_image("normal", 64, 48)
+    first.paste((255, 0, 0), (0, 0, 64, 48))
+    second = factory.create_background_image("normal", 64, 48)
+    factory.create_background_image("title", 64, 48)
+    factory.create_background_image("normal", 32, 48)
+
+    assert len(builds) == 3
+    assert second is not first
+    assert second.getpixel((0, 0)) != first.getpixel((0, 0))
+
+
+def test_theme_change_rebuilds_background(background_cache, monkeypatch):
+    factory, builds = background_cache
+    gradient = {"ENABLED": True, "START_COLOR": "#000000", "END_COLOR": "#000000"}
+    monkeypatch.setitem(factory._config, "THEME", {"GRADIENT": gradient})
+    dark = factory.create_background_image("normal", 64, 48)
+
+    gradient = dict(gradient, START_COLOR="#ffffff", END_COLOR="#ffffff")
+    monkeypatch.setitem(factory._config, "THEME", {"GRADIENT": gradient})
+    light = factory.create_background_image("normal", 64, 48)
+
+    assert len(builds) == 2
+    assert (dark.getpixel((0, 0)), light.getpixel((0, 0))) == ((0, 0, 0), (255, 255, 255))
+
+
+def test_background_cache_is_bounded_and_can_be_invalidated(background_cache, monkeypatch):
+    factory, builds = background_cache
+    monkeypatch.setattr(factory, "BACKGROUND_CACHE_SIZE", 2)
+
+    for width in [10, 20, 30, 10]:
+        factory.create_background_image("normal", width, 10)
+    assert len(builds) == 4
+    assert len(factory._background_cache) == 2
+
+    factory.create_background_image("normal", 30, 10)
+    factory.invalidate_background_cache()
+    factory.create_background_image("normal", 30, 10)
+    assert len(builds) == 5
+
+
+def test_texture_is_seeded_and_subtle():
+    base = Image.new("RGB", (40, 30), (1, 128, 254))
+    effects = {"TEXTURE": True, "TEXTURE_SEED": 3}
+    factory = BlockImageFactory({"EFFECTS": effects})
+    other_factory = BlockImageFactory({"EFFECTS": dict(effects, TEXTURE_SEED=4)})
+
+    first = np.asarray(factory._add_subtle_texture(base), dtype=int)
+    second = np.asarray(factory._add_subtle_texture(base), dtype=int)
+    other_seed = np.asarray(other_factory._add_subtle_texture(base), dtype=int)
+
+    assert np.array_equal(first, second)
+    assert not np.array_equal(first, other_seed)
+    noise = first - np.asarray(base, dtype=int)
+    assert noise[:, :, 1].min() == -3 and noise[:, :, 1].max() == 3
+    # Every channel gets the same noise, clamped to the valid range
+    assert np.array_equal(noise[:, :, 0], np.maximum(noise[:, :, 1], -1))
+    assert np.array_equal(noise[:, :, 2], np.minimum(noise[:, :, 1], 1))
+
+
+def test_factories_keep_their_own_theme():
+    dark = BlockImageFactory({"COLORS": {"BACKGROUND": "#000000"}})
+    light = BlockImageFactory({"COLORS": {"BACKGROUND": "#ffffff"}})
+
+    assert dark.create_background_image("normal", 8, 8).getpixel((0, 0)) == (0, 0, 0)
+    assert light.create_background_image("normal", 8, 8).getpixel((0, 0)) == (255, 255, 255)
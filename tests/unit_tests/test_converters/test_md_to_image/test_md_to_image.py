@@ -0,0 +1,132 @@
+"""Tests for the md_to_image module."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.converters.md_to_image.md_to_image import MarkdownToImageConverter, convert_async
+from src.image_generation.image_generator import ImageGenerator
+
+MARKDOWN = "\n\n".join(
+    f"# Slide {idx}\n\nParagraph with **bold** text.\n\n---" for idx in range(12)
+)
+
+
+async def _collect(pages):
+    return [page async for page in pages]
+
+
+def test_convert_async_yields_the_pages_of_convert(test_config):
+    generator = ImageGenerator()
+    blocks = MarkdownToImageConverter.parse_markdown(MARKDOWN)
+    expected = [image.tobytes() for image in generator.iter_images(blocks, 0.5)]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pages = asyncio.run(
+            _collect(convert_async(MARKDOWN, 0.5, image_generator=generator, executor=executor))
+        )
+
+    assert [page.tobytes() for page in pages] == expected
+
+
+def test_convert_async_encodes_pages(test_config):
+    pages = asyncio.run(_collect(convert_async("# Title", image_format="PNG")))
+
+    assert len(pages) == 1
+    assert pages[0].startswith(b"\x89PNG")
+
+
+def test_convert_async_does_not_block_the_event_loop(test_config):
+    async def run():
+        ticks = 0
+        pages = convert_async(MARKDOWN)
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        ticker = asyncio.ensure_future(tick())
+        await _collect(pages)
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(run()) > 6
+
+
+def test_cancellation_stops_rendering(test_config):
+    generator = ImageGenerator()
+    rendered = []
+    render_page_at_scales = generator.render_page_at_scales
+
+    def slow_render(page, scales):
+        time.sleep(0.05)
+        rendered.append(page)
+        return render_page_at_scales(page, scales)
+
+    generator.render_page_at_scales = slow_render
+
+    async def run():
+        first_page = asyncio.Event()
+
+        async def consume():
+            async for _ in convert_async(MARKDOWN, 0.25, image_generator=generator):
+                first_page.set()
+
+        task = asyncio.ensure_future(consume())
+        await first_page.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+
+    # The page in flight when cancelled may finish, nothing is started after it
+    assert 1 <= len(rendered) <= 2
+    assert len(generator.layout(MarkdownToImageConverter.parse_markdown(MARKDOWN))) > 2
+
+
+def test_convert_async_creates_the_generator_in_the_executor(test_config, monkeypatch):
+    threads = []
+    init = ImageGenerator.__init__
+
+    def recording_init(self, *args, **kwargs):
+        threads.append(threading.current_thread())
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(ImageGenerator, "__init__", recording_init)
+    pages = asyncio.run(_collect(convert_async("# Title")))
+
+    assert len(pages) == 1
+    assert threads and threading.main_thread() not in threads
+
+
+def test_cancellation_waits_for_the_page_in_flight(test_config):
+    generator = ImageGenerator()
+    in_flight = []
+    render_page_at_scales = generator.render_page_at_scales
+
+    def slow_render(page, scales):
+        in_flight.append(page)
+        time.sleep(0.1)
+        images = render_page_at_scales(page, scales)
+        in_flight.remove(page)
+        return images
+
+    generator.render_page_at_scales = slow_render
+
+    async def run():
+        pages = convert_async(MARKDOWN, 0.25, image_generator=generator)
+        task = asyncio.ensure_future(pages.__anext__())
+        await asyncio.sleep(0.02)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return list(in_flight)
+
+    assert asyncio.run(run()) == []
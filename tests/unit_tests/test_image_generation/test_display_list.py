@@ -0,0 +1,125 @@
+"""Tests for the display_list module."""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from src.image_generation.display_list import (
+    DisplayList,
+    ImagePaste,
+    Rasterizer,
+    Shape,
+    TextRun,
+)
+from src.image_generation.font_registry import FontRegistry
+
+
+@pytest.fixture
+def font(test_config):
+    return ImageFont.truetype(test_config["PATHS"]["FONT"], size=24)
+
+
+def draw_sample(d, font):
+    d.rectangle([(10, 10), (60, 40)], fill="#ff0000")
+    d.rounded_rectangle([20, 50, 120, 90], radius=8, fill="#00ff00", outline="#ffffff", width=2)
+    d.ellipse([(100, 10), (140, 50)], fill=None, outline="#0000ff", width=1)
+    d.line([(10, 120), (190, 120)], fill="#ffff00", width=3)
+    d.polygon([(150, 60), (170, 80), (150, 100), (130, 80)], fill="#00ffff")
+    d.text((10, 140), "Hello", fill="#ffffff", font=font)
+
+
+def test_records_primitives_in_order(font):
+    display_list = DisplayList((200, 200))
+    draw_sample(display_list, font)
+
+    kinds = [
+        p.kind if isinstance(p, Shape) else type(p).__name__
+        for p in display_list.primitives
+    ]
+    assert kinds == ["rectangle", "rounded_rectangle", "ellipse", "line", "polygon", "TextRun"]
+    assert display_list.primitives[0].points == (10, 10, 60, 40)
+    assert isinstance(display_list.primitives[-1], TextRun)
+
+
+def test_paste_is_recorded(font):
+    display_list = DisplayList((200, 200))
+    tile = Image.new("RGBA", (20, 10), (255, 0, 0, 255))
+
+    display_list.paste(tile, (5, 6))
+
+    assert display_list.primitives == [ImagePaste(tile, (5, 6), True)]
+
+
+def test_textbbox_matches_image_draw(font):
+    img = Image.new("RGB", (200, 200))
+
+    expected = ImageDraw.Draw(img).textbbox((7, 9), "Badge 12", font=font)
+
+    assert DisplayList((200, 200)).textbbox((7, 9), "Badge 12", font=font) == expected
+
+
+def test_replay_at_scale_one_matches_direct_drawing(font):
+    direct = Image.new("RGB", (200, 200))
+    draw_sample(ImageDraw.Draw(direct), font)
+    tile = Image.new("RGBA", (20, 10), (255, 0, 0, 128))
+    direct.paste(tile, (150, 150), tile)
+
+    display_list = DisplayList((200, 200))
+    draw_sample(display_list, font)
+    display_list.paste(tile, (150, 150))
+    replayed = Rasterizer().replay(display_list, Image.new("RGB", (200, 200)))
+
+    assert np.array_equal(np.asarray(direct), np.asarray(replayed))
+
+
+def test_rasterize_scales_page_and_primitives(test_config):
+    display_list = DisplayList((100, 80), background="paragraph")
+    display_list.rectangle([(10, 10), (20, 20)], fill="#ff0000")
+
+    img = Rasterizer().rasterize(display_list, scale=2)
+
+    assert img.size == (200, 160)
+    assert img.getpixel((30, 30))[:3] == (255, 0, 0)
+    assert img.getpixel((50, 50))[:3] != (255, 0, 0)
+
+
+def test_rasterize_scales_fonts(font):
+    display_list = DisplayList((200, 100))
+    display_list.text((0, 0), "Scaled", fill="#ffffff", font=font)
+
+    small = Rasterizer().replay(display_list, Image.new("RGB", (200, 100)))
+    large = Rasterizer().replay(display_list, Image.new("RGB", (400, 200)), scale=2)
+
+    small_width = small.getbbox()[2] - small.getbbox()[0]
+    large_width = large.getbbox()[2] - large.getbbox()[0]
+    assert large_width == pytest.approx(2 * small_width, rel=0.1)
+
+
+def test_scaled_fonts_keep_their_layout_engine(test_config):
+    font = ImageFont.truetype(
+        test_config["PATHS"]["FONT"], size=24, layout_engine=ImageFont.Layout.BASIC
+    )
+
+    scaled = Rasterizer()._scale_font(font, 2)
+
+    assert scaled is FontRegistry().get(
+        font.path, 48, font.index, layout_engine=ImageFont.Layout.BASIC
+    )
+
+
+@pytest.mark.parametrize("scale", [1, 2])
+def test_atlas_backend_matches_pillow_backend(font, scale):
+    display_list = DisplayList((200, 200))
+    draw_sample(display_list, font)
+    display_list.text((10, 170), "Word after word", fill="#ff00ff", font=font)
+    size = (200 * scale, 200 * scale)
+
+    pillow = Rasterizer("pillow").replay(display_list, Image.new("RGB", size), scale)
+    atlas = Rasterizer("atlas").replay(display_list, Image.new("RGB", size), scale)
+
+    assert np.array_equal(np.asarray(pillow), np.asarray(atlas))
+
+
+def test_unknown_text_backend_is_rejected():
+    with pytest.raises(ValueError):
+        Rasterizer("cairo")
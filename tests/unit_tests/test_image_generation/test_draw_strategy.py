@@ -1,7 +1,22 @@
 """Tests for the draw_strategy module."""
 
 import pytest
-from src.image_generation.draw_strategy import DrawDefault
+from PIL import Image, ImageFont
+from pygments.formatters import ImageFormatter
+
+from src.image_generation.draw_strategy import (
+    DrawBlockquote,
+    DrawBulletList,
+    DrawCode,
+    DrawDefault,
+    DrawHeader,
+    DrawHorizontalRule,
+    DrawNumberedList,
+    DrawTable,
+    DrawTaskList,
+    DrawTitle,
+)
+from src.utils.settings import to_rgba
 
 
 class TestDrawDefault:
@@ -85,3 +100,156 @@ class TestDrawDefault:
         """Test color selection for italic format."""
         color = self.draw_default.get_color_for_format("italic")
         assert color == self.draw_default.italic_color
+
+
+@pytest.mark.parametrize(
+    "strategy_class, text",
+    [
+        (DrawDefault, "Some `inline code` and a [link](https://example.com) " * 8),
+        (DrawHeader, "A header"),
+        (DrawTitle, "A rather long title that has to be wrapped over lines"),
+        (DrawBulletList, "First item\n" + "A long second item " * 10),
+        (DrawNumberedList, "First item\n\n" + "A long second item " * 10),
+        (DrawBlockquote, "Quote line\n\n" + "A long quote line " * 10),
+        (DrawHorizontalRule, "---"),
+        (DrawTaskList, "checked:Done\nunchecked:" + "Still to do " * 10),
+    ],
+)
+def test_measure_matches_draw(test_config, strategy_class, text):
+    """Test that measure mode returns the height draw would return."""
+    font = ImageFont.truetype(test_config["PATHS"]["FONT"], size=27)
+    strategy = strategy_class("#FFFFFF")
+    img = Image.new("RGB", (1080, 1080))
+
+    _, drawn_height = strategy.draw(img, text, font, 250)
+
+    assert strategy.measure(img.width, text, font, 250) == drawn_height
+
+
+def test_measure_does_not_draw(test_config):
+    """Test that measure mode leaves no pixels behind."""
+    font = ImageFont.truetype(test_config["PATHS"]["FONT"], size=27)
+    img = Image.new("RGB", (1080, 1080))
+
+    DrawBulletList("#FFFFFF").measure(img.width, "First\nSecond", font, 250)
+
+    assert img.getbbox() is None
+
+
+def test_code_measure_matches_draw(test_config):
+    """Test that the code block height is computed without highlighting."""
+    try:
+        ImageFormatter()
+    except Exception:
+        pytest.skip("Pygments can not find a monospace font on this system")
+
+    strategy = DrawCode()
+    code = "```python\ndef hello():\n\tprint('Hello')\n\n\nreturn 1\n```"
+    img = Image.new("RGB", (1080, 1080))
+
+    _, drawn_height = strategy.draw(img, code, None, 250)
+
+    assert strategy.measure(img.width, code, None, 250) == drawn_height
+
+
+def test_table_measure_matches_draw(test_config):
+    """Test that measuring a table gives the height drawing it returns."""
+    font = ImageFont.truetype(test_config["PATHS"]["FONT"], size=25)
+    strategy = DrawTable("#FFFFFF")
+    table = "| A | B |\n|---|---|\n| 1 | 2<br>two |\n| 3 | " + "long " * 40 + "|"
+    img = Image.new("RGB", (1080, 1080))
+
+    _, drawn_height = strategy.draw(img, table, font, 250)
+
+    assert strategy.measure(img.width, table, font, 250) == drawn_height
+
+
+def test_default_draws_bold_words_with_bold_face(test_config):
+    from src.image_generation.display_list import DisplayList, TextRun
+
+    bold_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+    test_config["PATHS"] = dict(test_config["PATHS"], FONT_BOLD=bold_path)
+    font = ImageFont.truetype(test_config["PATHS"]["FONT"], size=24)
+
+    display_list = DisplayList((1080, 1080))
+    DrawDefault(text_color="#FFFFFF").record(display_list, "plain **strong**", font, 100)
+
+    runs = {p.text: p.font.path for p in display_list.primitives if isinstance(p, TextRun)}
+    assert runs == {"plain": test_config["PATHS"]["FONT"], "strong": bold_path}
+
+
+def test_title_wrap_matches_measuring_every_candidate_line():
+    font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", size=90)
+    text = " ".join(["Lorem", "ipsum", "dolor", "sit", "amet,", "consectetur"] * 5)
+    max_width = 920
+
+    expected = []
+    current_line = []
+    for word in text.split():
+        bbox = font.getbbox(" ".join(current_line + [word]))
+        if bbox[2] - bbox[0] <= max_width:
+            current_line.append(word)
+        else:
+            expected.append(" ".join(current_line))
+            current_line = [word]
+    expected.append(" ".join(current_line))
+
+    assert DrawTitle(text_color="#FFFFFF").wrap(text, font, max_width) == expected
+
+
+@pytest.mark.parametrize(
+    "strategy_class, text",
+    [
+        (DrawBulletList, "A long bullet item that wraps " * 8),
+        (DrawNumberedList, "A long numbered item that wraps " * 8),
+        (DrawBlockquote, "A long quote that wraps " * 8),
+        (DrawTaskList, "unchecked:" + "A long task that wraps " * 8),
+    ],
+)
+def test_list_lines_stay_inside_the_margins(test_config, strategy_class, text):
+    from src.image_generation.display_list import DisplayList, TextRun
+
+    font = ImageFont.truetype(test_config["PATHS"]["FONT"], size=27)
+    right_edge = 1080 - test_config["PAGE_LAYOUT"]["RIGHT_MARGIN"]
+
+    display_list = DisplayList((1080, 1080))
+    strategy_class("#FFFFFF").record(display_list, text, font, 250)
+
+    runs = [p for p in display_list.primitives if isinstance(p, TextRun) and len(p.text) > 3]
+    assert len(runs) > 2
+    assert all(run.xy[0] + font.getlength(run.text) <= right_edge for run in runs)
+    # Every line is filled up to the first word of the next one
+    for run, next_run in zip(runs, runs[1:]):
+        next_word = next_run.text.split()[0]
+        assert run.xy[0] + font.getlength(f"{run.text} {next_word}") > right_edge - 15
+
+
+def test_table_is_drawn_below_current_height(test_config):
+    font = ImageFont.truetype(test_config["PATHS"]["FONT"], size=25)
+    table = "| A | B |\n|---|---|\n| 1 | 2 |\n| 3 | 4 |"
+    img = Image.new("RGB", (1080, 1080))
+
+    _, top_height = DrawTable("#FFFFFF").draw(img, table, font, 100)
+    _, lower_height = DrawTable("#FFFFFF").draw(img, table, font, 400)
+
+    assert top_height > 100
+    assert lower_height - top_height == 300
+
+
+def test_table_honors_column_alignment(test_config):
+    from src.image_generation.display_list import DisplayList, TextRun
+
+    font = ImageFont.truetype(test_config["PATHS"]["FONT"], size=25)
+    table = "| Left | Center | Right |\n|:--|:-:|--:|\n| l | c | *r* |"
+
+    display_list = DisplayList((1080, 1080))
+    DrawTable("#FFFFFF").record(display_list, table, font, 100)
+
+    runs = {p.text: p for p in display_list.primitives if isinstance(p, TextRun)}
+    assert set(runs) == {"Left", "Center", "Right", "l", "c", "r"}
+    assert runs["l"].xy[0] == runs["Left"].xy[0]
+    center = lambda run: run.xy[0] + font.getlength(run.text) / 2
+    assert center(runs["c"]) == pytest.approx(center(runs["Center"]), abs=1)
+    right = lambda run: run.xy[0] + font.getlength(run.text)
+    assert right(runs["r"]) == pytest.approx(right(runs["Right"]), abs=1)
+    assert runs["r"].fill == to_rgba(test_config["TABLE"]["HIGHLIGHT"])
@@ -0,0 +1,64 @@
+"""Tests for the font_registry module."""
+
+import pytest
+
+from src.image_generation.font_registry import FontRegistry
+
+FONT_DIR = "/usr/share/fonts/truetype/dejavu"
+REGULAR = f"{FONT_DIR}/DejaVuSans.ttf"
+BOLD = f"{FONT_DIR}/DejaVuSans-Bold.ttf"
+
+
+@pytest.fixture
+def registry():
+    registry = FontRegistry()
+    registry.clear()
+    yield registry
+    registry.max_size = 128
+    registry.clear()
+
+
+def test_get_loads_each_face_once(registry):
+    first = registry.get(REGULAR, 20)
+
+    assert registry.get(REGULAR, 20) is first
+    assert registry.get(REGULAR, 21) is not first
+    assert (registry.hits, registry.misses) == (1, 2)
+
+
+def test_get_evicts_least_recently_used_faces(registry):
+    registry.max_size = 2
+    small = registry.get(REGULAR, 10)
+    registry.get(REGULAR, 11)
+    registry.get(REGULAR, 10)
+    registry.get(REGULAR, 12)
+
+    assert len(registry) == 2
+    assert registry.get(REGULAR, 10) is small
+    assert registry.misses == 3
+
+
+def test_get_raises_for_missing_files(registry):
+    with pytest.raises(IOError):
+        registry.get("/nonexistent/font.ttf", 10)
+
+
+def test_get_variant_uses_configured_family(registry, test_config):
+    paths = dict(test_config["PATHS"], FONT_BOLD=BOLD)
+    test_config["PATHS"] = paths
+
+    assert registry.get_variant(20, bold=True).path == BOLD
+    # Bold italic falls back to bold, italic to the regular face
+    assert registry.get_variant(20, bold=True, italic=True).path == BOLD
+    assert registry.get_variant(20, italic=True).path == paths["FONT"]
+
+
+def test_faces_are_kept_per_layout_engine(registry):
+    from PIL import ImageFont
+
+    default = registry.get(REGULAR, 20)
+    basic = registry.get(REGULAR, 20, layout_engine=ImageFont.Layout.BASIC)
+
+    assert basic.layout_engine == ImageFont.Layout.BASIC
+    assert registry.get(REGULAR, 20, layout_engine=ImageFont.Layout.BASIC) is basic
+    assert registry.get(REGULAR, 20) is default
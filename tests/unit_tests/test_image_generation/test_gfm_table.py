@@ -0,0 +1,55 @@
+"""Tests for the gfm_table module."""
+
+import pytest
+
+from src.image_generation.gfm_table import (
+    fit_column_widths,
+    parse_gfm_table,
+    split_cell_lines,
+    split_row,
+)
+
+
+def test_parse_table_with_alignments():
+    table = parse_gfm_table(
+        "| Left | Center | Right | None |\n"
+        "|:-----|:------:|------:|------|\n"
+        "| a | b | c | d |\n"
+        "| e | f |\n"
+    )
+
+    assert table.header == ["Left", "Center", "Right", "None"]
+    assert table.alignments == ["left", "center", "right", None]
+    assert table.rows == [["a", "b", "c", "d"], ["e", "f", "", ""]]
+
+
+def test_parse_table_without_delimiter_row():
+    table = parse_gfm_table("| A | B |\n| 1 | 2 |")
+
+    assert table.alignments == [None, None]
+    assert table.rows == [["1", "2"]]
+
+
+def test_parse_empty_table():
+    with pytest.raises(ValueError):
+        parse_gfm_table("\n  \n")
+
+
+def test_split_row_keeps_escaped_pipes():
+    assert split_row(r"| a \| b | c |") == ["a | b", "c"]
+    assert split_row("a | b") == ["a", "b"]
+
+
+def test_split_cell_lines():
+    assert split_cell_lines("one<br>two <BR/> three") == ["one", "two", "three"]
+
+
+def test_columns_are_stretched_to_the_available_width():
+    assert fit_column_widths([100, 300], 800) == [200, 600]
+
+
+def test_only_wide_columns_are_shrunk():
+    widths = fit_column_widths([100, 500, 700], 900)
+
+    assert widths == [100, 400, 400]
+    assert sum(fit_column_widths([333.3, 333.3, 333.3], 500)) == 500
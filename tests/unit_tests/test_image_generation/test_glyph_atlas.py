@@ -0,0 +1,112 @@
+"""Tests for the glyph_atlas module."""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from src.image_generation.glyph_atlas import GlyphAtlas
+from src.image_generation.render_context import RenderContext
+
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+WORDS = ["Hello", "AVATAR", "rf", "Typography,", "fifty-five", "Wy."]
+
+
+@pytest.fixture
+def font():
+    return ImageFont.truetype(FONT_PATH, size=27, layout_engine=ImageFont.Layout.BASIC)
+
+
+@pytest.mark.parametrize(
+    "mode, background, fill",
+    [
+        ("RGB", (30, 40, 50), "#f8f8f2"),
+        ("RGBA", (30, 40, 50, 255), (255, 171, 0)),
+        ("RGBA", (200, 10, 90, 128), "#8c52ff"),
+    ],
+)
+def test_draws_the_same_pixels_as_pillow(font, mode, background, fill):
+    expected = Image.new(mode, (400, 60 * len(WORDS)), background)
+    actual = expected.copy()
+    d = ImageDraw.Draw(expected)
+    atlas = GlyphAtlas()
+
+    for idx, word in enumerate(WORDS):
+        d.text((7, 60 * idx + 3), word, fill=fill, font=font)
+        assert atlas.draw_text(actual, (7, 60 * idx + 3), word, fill, font)
+
+    assert np.array_equal(np.array(expected), np.array(actual))
+
+
+def test_batched_runs_clip_to_the_page(font):
+    expected = Image.new("RGB", (120, 40), "#101010")
+    actual = expected.copy()
+    runs = [((-10, -5), "clipped", "#ffffff", font), ((80, 20), "edge", "#00ff00", font)]
+    for xy, text, fill, run_font in runs:
+        ImageDraw.Draw(expected).text(xy, text, fill=fill, font=run_font)
+
+    GlyphAtlas().draw_runs(actual, runs)
+
+    assert np.array_equal(np.array(expected), np.array(actual))
+
+
+def test_glyphs_are_rasterized_once(font):
+    atlas = GlyphAtlas()
+    img = Image.new("RGB", (300, 50))
+    atlas.draw_text(img, (0, 0), "banana", "#ffffff", font)
+    atlas.draw_text(img, (0, 0), "nab", "#ffffff", font)
+
+    assert len(atlas) == 3
+
+
+def test_unsupported_runs_are_left_to_pillow(font):
+    atlas = GlyphAtlas()
+    img = Image.new("RGB", (300, 100))
+
+    assert not atlas.draw_text(img, (0, 0), "two\nlines", "#ffffff", font)
+    assert not atlas.draw_text(img, (0.5, 0), "half", "#ffffff", font)
+    assert not atlas.draw_text(img.convert("L"), (0, 0), "gray", "#ffffff", font)
+    assert not img.getbbox()
+
+
+def test_atlas_backend_faces_from_the_registry_are_supported(test_config):
+    config = {key: test_config[key] for key in test_config}
+    config["TYPOGRAPHY"] = {"TEXT_BACKEND": "atlas"}
+    font = RenderContext(config).font(27)
+    img = Image.new("RGB", (300, 50))
+
+    # Even where Pillow defaults to raqm, the atlas backend gets basic layout faces
+    assert font.layout_engine == ImageFont.Layout.BASIC
+    assert font is RenderContext(config).font_variant(27)
+    assert GlyphAtlas().draw_text(img, (0, 0), "Hello", "#ffffff", font)
+
+
+def test_caches_are_bounded(font):
+    atlas = GlyphAtlas(max_runs=2, max_glyphs=3)
+    img = Image.new("RGB", (300, 50))
+    for word in ["abc", "def", "ghi"]:
+        atlas.draw_text(img, (0, 0), word, "#ffffff", font)
+
+    assert len(atlas) == 3
+    assert len(atlas._run_masks) == 2
+
+
+def test_concurrent_drawing_matches_pillow(font):
+    from concurrent.futures import ThreadPoolExecutor
+
+    atlas = GlyphAtlas(max_runs=4, max_glyphs=8)
+    expected = Image.new("RGB", (400, 60 * len(WORDS)), "#101010")
+    d = ImageDraw.Draw(expected)
+    for idx, word in enumerate(WORDS):
+        d.text((7, 60 * idx + 3), word, fill="#ffffff", font=font)
+
+    def draw(_):
+        img = Image.new("RGB", expected.size, "#101010")
+        for idx, word in enumerate(WORDS):
+            atlas.draw_text(img, (7, 60 * idx + 3), word, "#ffffff", font)
+        return np.array(img)
+
+    # The caches are smaller than the text, so threads keep evicting each other's entries
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(draw, range(64)))
+
+    assert all(np.array_equal(result, np.array(expected)) for result in results)
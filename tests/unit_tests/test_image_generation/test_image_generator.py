@@ -1 +1,163 @@
-# TODO
+"""Tests for the image_generator module."""
+
+import pytest
+from PIL import Image
+
+from src.data.text_block import TextBlock
+from src.image_generation.display_list import TextRun
+from src.image_generation.image_generator import ImageGenerator
+from src.image_generation.render_context import RenderContext
+
+
+@pytest.fixture
+def image_generator(test_config):
+    return ImageGenerator()
+
+
+@pytest.fixture
+def sample_blocks():
+    return [
+        TextBlock("title", "Test Document"),
+        TextBlock("header", "Section 1"),
+        TextBlock("paragraph", "This is a test paragraph with some **bold** text."),
+        TextBlock("bullet_list", "First item\nSecond item\nThird item"),
+        TextBlock("code", "```python\ndef hello():\n    print('Hello')\n```"),
+        TextBlock("blockquote", "A quote\n\nspanning lines"),
+        TextBlock("horizontal_rule", "---"),
+        TextBlock("task_list", "checked:Done\nunchecked:Todo"),
+    ]
+
+
+def test_layout_matches_drawn_heights(image_generator, sample_blocks):
+    pages = image_generator.layout(sample_blocks)
+
+    for page in pages:
+        img = Image.new("RGB", (image_generator.width, image_generator.height))
+        for placement in page.placements:
+            drawn_height = image_generator.draw_text_on_image(
+                img, placement.block, placement.top
+            )
+            assert drawn_height == placement.bottom
+
+
+def test_layout_places_every_block_once(image_generator, sample_blocks):
+    pages = image_generator.layout(sample_blocks)
+
+    indices = [p.index for page in pages for p in page.placements]
+    assert indices == list(range(len(sample_blocks)))
+
+
+def test_layout_moves_overflowing_blocks_to_new_pages(image_generator, test_config):
+    blocks = [TextBlock("paragraph", f"Paragraph number {i}") for i in range(60)]
+    pages = image_generator.layout(blocks)
+
+    max_height = image_generator.height - test_config["PAGE_LAYOUT"]["BOTTOM_MARGIN"]
+    assert len(pages) > 1
+    assert [page.number for page in pages] == list(range(1, len(pages) + 1))
+    for page in pages:
+        assert page.placements[0].top == test_config["PAGE_LAYOUT"]["TOP_MARGIN"]
+        assert all(p.bottom <= max_height for p in page.placements)
+
+
+def test_layout_skips_page_number_on_title_only_page(image_generator):
+    pages = image_generator.layout([TextBlock("title", "Only a title")])
+
+    assert len(pages) == 1
+    assert not pages[0].show_page_number
+    assert pages[0].background == "title"
+
+
+def test_generate_images_renders_one_image_per_page(image_generator, sample_blocks):
+    pages = image_generator.layout(sample_blocks)
+    images = image_generator.generate_images(sample_blocks)
+
+    assert len(images) == len(pages)
+    for img in images:
+        assert img.size == (image_generator.width, image_generator.height)
+
+
+def test_record_returns_one_display_list_per_page(image_generator, sample_blocks):
+    pages = image_generator.layout(sample_blocks)
+    display_lists = image_generator.record(sample_blocks)
+
+    assert len(display_lists) == len(pages)
+    assert [d.background for d in display_lists] == [p.background for p in pages]
+    assert all(d.primitives for d in display_lists)
+
+
+def test_generate_images_at_scale(image_generator, sample_blocks):
+    images = image_generator.generate_images(sample_blocks, scale=0.5)
+
+    for img in images:
+        assert img.size == (image_generator.width // 2, image_generator.height // 2)
+
+
+def test_parallel_rendering_matches_serial(image_generator, sample_blocks):
+    blocks = sample_blocks * 3
+    serial = image_generator.generate_images(blocks)
+    parallel = image_generator.generate_images(blocks, jobs=2)
+
+    assert len(parallel) == len(serial) > 1
+    for serial_img, parallel_img in zip(serial, parallel):
+        assert serial_img.tobytes() == parallel_img.tobytes()
+
+
+def test_render_pages_groups_images_by_scale(image_generator, sample_blocks):
+    pages = image_generator.layout(sample_blocks)
+    images_by_scale = image_generator.render_pages(pages, [1, 0.5])
+
+    assert [img.width for img in images_by_scale[1]] == [1080] * len(pages)
+    assert [img.width for img in images_by_scale[0.5]] == [540] * len(pages)
+
+
+def test_iter_images_yields_pages_before_consuming_all_blocks(image_generator):
+    consumed = []
+
+    def blocks():
+        for i in range(200):
+            consumed.append(i)
+            yield TextBlock("paragraph", f"Paragraph number {i}")
+
+    first_page = next(image_generator.iter_images(blocks()))
+
+    assert first_page.size == (image_generator.width, image_generator.height)
+    assert len(consumed) < 200
+
+
+def test_iter_layout_matches_layout(image_generator, sample_blocks):
+    assert list(image_generator.iter_layout(sample_blocks)) == image_generator.layout(
+        sample_blocks
+    )
+
+
+def test_render_cache_serves_identical_pages(test_config, sample_blocks, tmp_path):
+    from src.utils.render_cache import RenderCache
+
+    uncached = ImageGenerator().generate_images(sample_blocks)
+
+    cache = RenderCache(tmp_path / "cache")
+    first = ImageGenerator(cache).generate_images(sample_blocks)
+    assert cache.hits == 0
+
+    second_cache = RenderCache(tmp_path / "cache")
+    second = ImageGenerator(second_cache).generate_images(sample_blocks)
+    assert second_cache.hits == len(second)
+
+    for expected, *images in zip(uncached, first, second):
+        for image in images:
+            assert image.mode == expected.mode
+            assert image.tobytes() == expected.tobytes()
+
+
+def test_generator_renders_with_the_given_context(test_config, sample_blocks):
+    config = {key: test_config[key] for key in test_config}
+    config["PAGE_LAYOUT"] = dict(config["PAGE_LAYOUT"], IMAGE_WIDTH=1500, LEFT_MARGIN=300)
+    context = RenderContext(config)
+    generator = ImageGenerator(context=context)
+
+    assert all(s.context is context for s in generator.strategies.values())
+    first_run = next(
+        p for p in generator.record(sample_blocks)[0].primitives if isinstance(p, TextRun)
+    )
+    assert generator.width == 1500
+    assert first_run.xy[0] == 300
@@ -0,0 +1,92 @@
+"""Tests for the incremental_renderer module."""
+
+import pytest
+
+from src.data.text_block import TextBlock
+from src.image_generation.image_generator import ImageGenerator
+from src.image_generation.incremental_renderer import IncrementalRenderer
+
+
+@pytest.fixture
+def image_generator(test_config):
+    return ImageGenerator()
+
+
+@pytest.fixture
+def renderer(image_generator):
+    return IncrementalRenderer(image_generator)
+
+
+@pytest.fixture
+def blocks():
+    document = [TextBlock("title", "Long document")]
+    for section in range(6):
+        document.append(TextBlock("header", f"Section {section}"))
+        document.extend(
+            TextBlock("paragraph", f"Paragraph {section}.{i} " * 4) for i in range(10)
+        )
+    return document
+
+
+def count_measures(image_generator, monkeypatch):
+    calls = []
+    measure_block = image_generator.measure_block
+
+    def counting_measure_block(block, current_height):
+        calls.append(block)
+        return measure_block(block, current_height)
+
+    monkeypatch.setattr(image_generator, "measure_block", counting_measure_block)
+    return calls
+
+
+def test_first_update_renders_every_page(renderer, image_generator, blocks):
+    update = renderer.update(blocks)
+
+    assert update.page_count == len(image_generator.layout(blocks)) > 3
+    assert sorted(update.changed) == list(range(update.page_count))
+    assert update.removed == []
+
+
+def test_unchanged_document_renders_nothing(renderer, blocks):
+    renderer.update(blocks)
+    update = renderer.update(list(blocks))
+
+    assert update.changed == {}
+    assert update.removed == []
+
+
+def test_edit_renders_only_the_affected_page(
+    renderer, image_generator, blocks, monkeypatch
+):
+    first = renderer.update(blocks)
+    edited = list(blocks)
+    edited[-15] = TextBlock("paragraph", "Edited paragraph")
+    measures = count_measures(image_generator, monkeypatch)
+
+    update = renderer.update(edited)
+
+    assert update.page_count == first.page_count
+    assert len(update.changed) == 1
+    assert len(measures) < len(blocks) // 2
+    assert renderer._pages == image_generator.layout(edited)
+
+
+def test_insertion_converges_with_previous_layout(renderer, image_generator, blocks):
+    renderer.update(blocks)
+    edited = list(blocks)
+    edited.insert(5, TextBlock("horizontal_rule", "---"))
+
+    update = renderer.update(edited)
+
+    assert renderer._pages == image_generator.layout(edited)
+    assert 0 < len(update.changed) <= update.page_count
+
+
+def test_deleting_blocks_removes_pages(renderer, image_generator, blocks):
+    first = renderer.update(blocks)
+
+    update = renderer.update(blocks[:12])
+
+    assert renderer._pages == image_generator.layout(blocks[:12])
+    assert update.removed == list(range(update.page_count, first.page_count))
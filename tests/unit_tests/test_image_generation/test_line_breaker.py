@@ -0,0 +1,115 @@
+"""Tests for the line_breaker module."""
+
+import os
+import random
+
+import pytest
+from PIL import ImageFont
+
+from src.image_generation.line_breaker import LineBox, LineBreaker
+
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+CJK_FONT_PATHS = [
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+]
+
+
+@pytest.fixture
+def breaker():
+    breaker = LineBreaker()
+    breaker.clear()
+    yield breaker
+    breaker.clear()
+
+
+@pytest.fixture
+def font():
+    return ImageFont.truetype(FONT_PATH, size=27)
+
+
+def greedy_wrap(words, font, max_width):
+    """Reference wrapping that measures every candidate line."""
+    lines = []
+    current_line = []
+    for word in words:
+        if current_line and font.getlength(" ".join(current_line + [word])) > max_width:
+            lines.append(" ".join(current_line))
+            current_line = []
+        current_line.append(word)
+    if current_line:
+        lines.append(" ".join(current_line))
+    return lines
+
+
+def test_matches_measuring_every_candidate_line(breaker, font):
+    rng = random.Random(7)
+    vocabulary = ["a", "AV", "Typography", "we", "fifty-five", "Wave.", "of", "lazy", "i"]
+    for _ in range(50):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 60))]
+        max_width = rng.randint(80, 900)
+
+        lines = breaker.break_lines(" ".join(words), font, max_width)
+
+        assert [line.text for line in lines] == greedy_wrap(words, font, max_width)
+
+
+def test_line_boxes_locate_the_lines(breaker, font):
+    text = "  one two\tthree\nfour  "
+
+    lines = breaker.break_lines(text, font, font.getlength("three four"))
+
+    assert [line.text for line in lines] == ["one two", "three four"]
+    assert lines[0] == LineBox("one two", 2, 9, font.getlength("one two"))
+    assert text[lines[1].start : lines[1].end] == "three\nfour"
+
+
+def test_long_words_are_kept_whole(breaker, font):
+    lines = breaker.break_lines("short unbreakablewordthatistoolong end", font, 100)
+
+    assert [line.text for line in lines] == ["short", "unbreakablewordthatistoolong", "end"]
+
+
+def test_blank_text_has_no_lines(breaker, font):
+    assert breaker.break_lines(" \n ", font, 100) == []
+
+
+def test_cjk_text_breaks_between_characters(breaker):
+    cjk_font_path = next((path for path in CJK_FONT_PATHS if os.path.exists(path)), None)
+    font = ImageFont.truetype(cjk_font_path or FONT_PATH, size=30)
+    text = "吾輩は猫である。名前はまだ無い。「どこで生れたか」とんと見当がつかぬ。"
+
+    lines = breaker.break_lines(text, font, 200)
+
+    assert len(lines) > 1
+    assert "".join(line.text for line in lines) == text
+    assert all(line.width <= 200 for line in lines)
+    assert not any(line.text[0] in "。」" or line.text[-1] == "「" for line in lines)
+
+
+def test_measure_and_draw_share_lines(breaker, font):
+    breaker.break_lines("cached paragraph", font, 300)
+    first = breaker.break_lines("cached paragraph", font, 300)
+
+    assert breaker.break_lines("cached paragraph", font, 300) is first
+    assert len(breaker) == 1
+
+
+def test_concurrent_use_keeps_the_cache_consistent(breaker, font):
+    from concurrent.futures import ThreadPoolExecutor
+
+    breaker.max_size = 20
+    texts = [f"paragraph {idx} with a few words to wrap" for idx in range(60)]
+    expected = [LineBreaker()._break(text, font, 150) for text in texts]
+
+    def wrap(offset):
+        return [breaker.break_lines(texts[(offset + idx) % 60], font, 150) for idx in range(180)]
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(wrap, range(8)))
+    finally:
+        breaker.max_size = 10_000
+
+    assert len(breaker) == 20
+    assert results[3][:60] == expected[3:] + expected[:3]
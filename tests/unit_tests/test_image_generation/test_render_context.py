@@ -0,0 +1,72 @@
+"""Tests for the render_context module."""
+
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.data.text_block import TextBlock
+from src.image_generation.image_generator import ImageGenerator
+from src.image_generation.render_context import RenderContext
+from src.utils.config import Config
+
+THEMES = Path(__file__).parents[3] / "themes"
+BLOCKS = [
+    TextBlock("title", "Themes"),
+    TextBlock("paragraph", "Rendered **side by side** in one process."),
+    TextBlock("bullet_list", "First item\nSecond item"),
+    TextBlock("table", "| A | B |\n|---|---|\n| 1 | 2 |"),
+]
+
+
+def _render(context):
+    return [image.tobytes() for image in ImageGenerator(context=context).iter_images(BLOCKS)]
+
+
+def test_from_file_leaves_the_global_config_untouched(test_config):
+    before = {key: test_config[key] for key in test_config}
+
+    context = RenderContext.from_file(THEMES / "light_professional.json")
+
+    assert context.settings.colors.background == (255, 255, 255, 255)
+    assert {key: Config()[key] for key in Config()} == before
+
+
+def test_context_keeps_its_own_copy_of_the_config(test_config):
+    config = {key: test_config[key] for key in test_config}
+    context = RenderContext(config)
+
+    config["COLORS"]["TEXT"] = "#123456"
+
+    assert context.config["COLORS"]["TEXT"] != "#123456"
+    assert context.settings.colors.text == (255, 255, 255, 255)
+
+
+def test_font_variant_uses_the_paths_of_the_context(test_config):
+    config = {key: test_config[key] for key in test_config}
+    font_path = config["PATHS"]["FONT"]
+    config["PATHS"] = dict(config["PATHS"], FONT_BOLD=font_path.replace(".ttf", "-Bold.ttf"))
+
+    bold = RenderContext(config).font_variant(20, bold=True)
+
+    assert bold.path == config["PATHS"]["FONT_BOLD"]
+    assert RenderContext.from_config().font_variant(20, bold=True).path == font_path
+
+
+def test_context_survives_pickling(test_config):
+    context = RenderContext.from_config()
+
+    copy = pickle.loads(pickle.dumps(context))
+
+    assert copy.settings == context.settings
+    assert dict(copy.config) == dict(context.config)
+
+
+def test_themes_render_concurrently(test_config):
+    contexts = [RenderContext.from_file(path) for path in sorted(THEMES.glob("*.json"))]
+    expected = [_render(context) for context in contexts]
+
+    with ThreadPoolExecutor(max_workers=len(contexts) * 2) as executor:
+        results = list(executor.map(_render, contexts * 2))
+
+    assert results == expected * 2
+    assert expected[0] != expected[1]
@@ -0,0 +1,81 @@
+"""Tests for the text_measurer module."""
+
+import pytest
+from PIL import ImageFont
+
+from src.image_generation.text_measurer import TextMeasurer
+
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+
+@pytest.fixture
+def measurer():
+    measurer = TextMeasurer()
+    measurer.clear()
+    yield measurer
+    measurer.max_size = 100_000
+    measurer.clear()
+
+
+@pytest.fixture
+def font():
+    return ImageFont.truetype(FONT_PATH, size=24)
+
+
+def test_measurements_match_font(measurer, font):
+    assert measurer.bbox(font, "Hello") == font.getbbox("Hello")
+    assert measurer.width(font, "Hello") == font.getbbox("Hello")[2] - font.getbbox("Hello")[0]
+    assert measurer.length(font, "Hello") == font.getlength("Hello")
+    assert measurer.space_width(font) == font.getbbox(" ")[2]
+
+
+def test_faces_are_measured_per_layout_engine(measurer):
+    basic = ImageFont.truetype(FONT_PATH, size=24, layout_engine=ImageFont.Layout.BASIC)
+    default = ImageFont.truetype(FONT_PATH, size=24)
+
+    for font in [basic, default]:
+        assert measurer.length(font, "office") == font.getlength("office")
+    distinct = basic.layout_engine != default.layout_engine
+    assert (measurer.hits, measurer.misses) == ((0, 2) if distinct else (1, 1))
+
+    # Where raqm is not installed both faces use basic layout, tag one as raqm
+    tagged = ImageFont.truetype(FONT_PATH, size=24, layout_engine=ImageFont.Layout.BASIC)
+    tagged.layout_engine = ImageFont.Layout.RAQM
+    measurer.length(tagged, "office")
+    assert measurer.misses == (3 if distinct else 2)
+
+
+def test_copies_of_a_face_share_entries(measurer, font):
+    measurer.bbox(font, "word")
+    measurer.bbox(ImageFont.truetype(FONT_PATH, size=24), "word")
+    measurer.bbox(ImageFont.truetype(FONT_PATH, size=25), "word")
+
+    assert (measurer.hits, measurer.misses) == (1, 2)
+    assert measurer.hit_rate == pytest.approx(1 / 3)
+
+
+def test_cache_is_bounded(measurer, font):
+    measurer.max_size = 2
+    for word in ["a", "b", "c"]:
+        measurer.bbox(font, word)
+
+    assert len(measurer) == 2
+    measurer.bbox(font, "a")
+    assert measurer.hits == 0
+
+
+def test_concurrent_use_keeps_the_cache_consistent(measurer, font):
+    from concurrent.futures import ThreadPoolExecutor
+
+    measurer.max_size = 50
+    words = [f"word{idx}" for idx in range(200)]
+
+    def measure(offset):
+        return [measurer.length(font, words[(offset + idx) % 200]) for idx in range(400)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(measure, range(8)))
+
+    assert len(measurer) == 50
+    assert measurer.hits + measurer.misses == 8 * 400
+    assert results[0][0] == font.getlength("word0")
@@ -0,0 +1,75 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from src.input_output.encoder_profile import PROFILES, EncoderProfile, get_profile
+from src.input_output.image_saver import ImageSaver
+
+
+@pytest.fixture
+def page():
+    image = Image.new("RGB", (200, 100), color="#1a1a2e")
+    for x in range(0, 200, 7):
+        image.putpixel((x, x % 100), (255, 171, 0))
+    return image
+
+
+@pytest.mark.parametrize("name", sorted(PROFILES))
+def test_builtin_profiles_encode_in_their_format(name, page):
+    profile = PROFILES[name]
+
+    with Image.open(BytesIO(profile.encode(page))) as decoded:
+        assert decoded.format == profile.format
+        assert decoded.size == page.size
+
+
+@pytest.mark.parametrize("name", ["png", "fast", "small", "webp-lossless"])
+def test_lossless_profiles_keep_the_pixels(name, page):
+    with Image.open(BytesIO(PROFILES[name].encode(page))) as decoded:
+        assert decoded.convert("RGB").tobytes() == page.tobytes()
+
+
+def test_fast_and_small_trade_bytes_for_time(page):
+    sizes = {name: len(PROFILES[name].encode(page)) for name in ["fast", "png", "small"]}
+
+    assert sizes["fast"] >= sizes["png"] >= sizes["small"]
+
+
+def test_jpeg_drops_the_alpha_channel():
+    image = Image.new("RGBA", (10, 10), (255, 0, 0, 128))
+
+    with Image.open(BytesIO(PROFILES["jpeg"].encode(image))) as decoded:
+        assert decoded.mode == "RGB"
+
+
+def test_profiles_come_from_the_output_config():
+    output_config = {
+        "PROFILE": "thumbnail",
+        "PROFILES": {"thumbnail": {"FORMAT": "jpg", "OPTIONS": {"quality": 60}}},
+    }
+
+    assert get_profile(output_config=output_config) == EncoderProfile(
+        "thumbnail", "JPEG", {"quality": 60}
+    )
+    assert get_profile("small", output_config) is PROFILES["small"]
+    assert get_profile(output_config={}) is PROFILES["png"]
+
+
+@pytest.mark.parametrize(
+    "name, output_config",
+    [("gif", {}), ("broken", {"PROFILES": {"broken": {"FORMAT": "BMP"}}})],
+)
+def test_invalid_profiles_are_rejected(name, output_config):
+    with pytest.raises(ValueError):
+        get_profile(name, output_config)
+
+
+def test_image_saver_uses_the_extension_of_its_profile(tmp_path, page):
+    image_saver = ImageSaver(str(tmp_path), profile=PROFILES["webp"])
+
+    assert image_saver.save_images([page, page]) == {}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["output0.webp", "output1.webp"]
+
+    image_saver.remove_page(1)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["output0.webp"]
@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from src.input_output.file_watcher import FileWatcher
+
+
+@pytest.fixture
+def watched_file(tmp_path):
+    path = tmp_path / "watched.md"
+    path.write_text("# Title")
+    return path
+
+
+def test_changes_yields_immediately(watched_file):
+    changes = FileWatcher(str(watched_file), poll_interval=0.01).changes()
+
+    assert next(changes) is None
+
+
+def test_changes_yields_after_modification(watched_file):
+    changes = FileWatcher(str(watched_file), poll_interval=0.01).changes()
+    next(changes)
+
+    watched_file.write_text("# Edited title")
+    stat = os.stat(watched_file)
+    os.utime(watched_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert next(changes) is None
@@ -1,8 +1,10 @@
 import pytest
 import os
+import threading
+import time
 from PIL import Image
 
-from src.input_output.image_saver import ImageSaver
+from src.input_output.image_saver import ImageSaver, PageWriter
 
 
 @pytest.fixture
@@ -36,3 +38,61 @@ def test_save_multiple_images(image_saver):
     for idx in range(3):
         saved_image_path = os.path.join(tmp_path, f"output{idx}.png")
         assert os.path.exists(saved_image_path)
+
+
+def test_save_images_from_generator(tmp_path):
+    image_saver = ImageSaver(str(tmp_path), workers=1)
+    saved_before_next = []
+
+    def images():
+        for idx in range(3):
+            saved_before_next.append(
+                os.path.exists(os.path.join(image_saver.output_directory, f"output{idx - 1}.png"))
+            )
+            yield Image.new("RGB", (100, 100), color="red")
+
+    image_saver.save_images(images())
+
+    # Every page is written before the next one is requested
+    assert saved_before_next == [False, True, True]
+    for idx in range(3):
+        assert os.path.exists(os.path.join(image_saver.output_directory, f"output{idx}.png"))
+
+
+def test_parallel_save_keeps_names_and_reports_errors_per_page(tmp_path):
+    image_saver = ImageSaver(str(tmp_path), workers=3)
+    images = [Image.new("RGB", (50, 50), color=(idx, 0, 0)) for idx in range(10)]
+    # PNG has no CMYK mode, so this page fails to encode
+    images[4] = Image.new("CMYK", (50, 50))
+
+    errors = image_saver.save_images(iter(images))
+
+    assert list(errors) == [image_saver.file_path("output4.png")]
+    for idx in range(10):
+        if idx != 4:
+            with Image.open(tmp_path / f"output{idx}.png") as saved:
+                assert saved.getpixel((0, 0)) == (idx, 0, 0)
+
+
+def test_page_writer_bounds_the_pending_images(tmp_path):
+    pending = []
+    lock = threading.Lock()
+
+    class SlowSaver(ImageSaver):
+        def write_image(self, image, file_name):
+            time.sleep(0.01)
+            with lock:
+                pending.remove(file_name)
+
+    image_saver = SlowSaver(str(tmp_path))
+    most_pending = 0
+    with PageWriter(workers=2) as writer:
+        for idx in range(12):
+            with lock:
+                pending.append(f"output{idx}.png")
+                most_pending = max(most_pending, len(pending))
+            writer.submit(image_saver, Image.new("RGB", (1, 1)), f"output{idx}.png")
+
+    assert pending == []
+    assert most_pending <= 2 * 2 + 1
+    assert writer.errors == {}
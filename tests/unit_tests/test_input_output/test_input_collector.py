@@ -0,0 +1,66 @@
+import io
+import json
+
+import pytest
+
+from src.input_output.input_collector import InputCollector, InputDocument
+
+
+@pytest.fixture
+def docs(tmp_path):
+    for name in ["b.md", "a.md", "nested/c.md"]:
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text("# Title")
+    return tmp_path
+
+
+def test_expand_globs_sorted(docs):
+    documents = InputCollector().expand([str(docs / "**" / "*.md")])
+
+    assert [d.path for d in documents] == sorted(
+        str(p) for p in docs.glob("**/*.md")
+    )
+
+
+def test_expand_keeps_unmatched_paths(docs):
+    documents = InputCollector().expand(["missing.md", str(docs / "none*.md")])
+
+    assert [d.path for d in documents] == ["missing.md", str(docs / "none*.md")]
+
+
+def test_read_manifest_paths_and_jsonl(docs):
+    manifest = io.StringIO(
+        f"# comment\n{docs / 'a.md'}\n\n"
+        f'{{"path": "{docs / "b.md"}", "output": "second"}}\n'
+    )
+
+    documents = InputCollector().read_manifest(manifest)
+
+    assert documents == [
+        InputDocument(str(docs / "a.md")),
+        InputDocument(str(docs / "b.md"), "second"),
+    ]
+
+
+def test_read_manifest_rejects_entries_without_path():
+    with pytest.raises(ValueError, match="line 1"):
+        InputCollector().read_manifest(io.StringIO('{"output": "x"}\n'))
+
+
+@pytest.mark.parametrize("output", ["../outside", "/tmp/abs", "a/b", "..", "", 3, "a\\b"])
+def test_read_manifest_rejects_outputs_leaving_the_output_directory(output):
+    line = json.dumps({"path": "a.md", "output": output})
+
+    with pytest.raises(ValueError, match="line 1"):
+        InputCollector().read_manifest(io.StringIO(line + "\n"))
+
+
+def test_output_names_are_unique():
+    documents = [
+        InputDocument("one/intro.md"),
+        InputDocument("two/intro.md"),
+        InputDocument("three.md", "intro-2"),
+    ]
+
+    assert InputCollector.output_names(documents) == ["intro", "intro-2", "intro-2-2"]
@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from src.input_output.encoder_profile import PROFILES, EncoderProfile
+from src.input_output.image_saver import ImageSaver, PageWriter
+from src.input_output.palette import PaletteQuantizer
+
+
+@pytest.fixture
+def text_page():
+    """A flat page with anti-aliased text in a few colors."""
+    page = Image.new("RGB", (400, 300), "#1a1a2e")
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.load_default(size=28)
+    for idx, color in enumerate(["#ffffff", "#ffab00", "#50fa7b", "#8be9fd"]):
+        draw.text((10, 10 + 60 * idx), "Anti-aliased text 0123", fill=color, font=font)
+    draw.rectangle((300, 20, 380, 80), fill="#8c52ff")
+    return page
+
+
+def _max_error(quantized, page):
+    return np.abs(
+        np.asarray(quantized.convert("RGB"), dtype=int) - np.asarray(page, dtype=int)
+    ).max(axis=2)
+
+
+def test_pages_with_few_colors_keep_them_exactly():
+    page = Image.new("RGB", (50, 50), "#000000")
+    ImageDraw.Draw(page).rectangle((10, 10, 30, 30), fill="#ffab00")
+
+    quantized, colors = PaletteQuantizer().quantize(page)
+
+    assert colors == 2
+    assert quantized.mode == "P"
+    assert quantized.convert("RGB").tobytes() == page.tobytes()
+
+
+def test_anti_aliasing_shades_take_the_nearest_palette_color(text_page):
+    quantizer = PaletteQuantizer(max_colors=16, tolerance=40, max_outliers=0.01)
+
+    quantized, colors = quantizer.quantize(text_page)
+
+    assert colors > 16
+    assert quantized is not None
+    error = _max_error(quantized, text_page)
+    assert (error > 40).mean() <= 0.01
+    # The flat colors are in the palette, so they do not move at all
+    assert error[50, 340] == 0 and error[290, 200] == 0
+
+
+def test_opaque_rgba_pages_are_converted(text_page):
+    quantized, colors = PaletteQuantizer().quantize(text_page.convert("RGBA"))
+
+    assert quantized.mode == "P"
+    assert colors == PaletteQuantizer().quantize(text_page)[1]
+
+    translucent = text_page.convert("RGBA")
+    translucent.putpixel((0, 0), (0, 0, 0, 128))
+    assert PaletteQuantizer().quantize(translucent) == (None, 0)
+
+
+def test_low_range_gradients_are_quantized_exactly():
+    # A vertical background like the one of the dark_modern theme, with text over it
+    rows = np.linspace([15, 15, 35], [25, 25, 61], 300).round().astype(np.uint8)
+    page = Image.fromarray(np.repeat(rows[:, None, :], 400, axis=1), "RGB")
+    font = ImageFont.load_default(size=28)
+    draw = ImageDraw.Draw(page)
+    for idx in range(4):
+        draw.text((60, 10 + 70 * idx), "Text over a gradient", fill="#ffffff", font=font)
+
+    quantized, colors = PaletteQuantizer().quantize(page)
+
+    assert colors > len(np.unique(rows, axis=0))
+    assert quantized is not None
+    # The background steps are kept exactly
+    assert (_max_error(quantized, page)[:, :50] == 0).all()
+
+
+def test_gradients_and_other_modes_stay_unchanged():
+    x, y = np.meshgrid(np.arange(256), np.arange(256))
+    gradient = Image.fromarray(
+        np.stack([x, y, (x + y) // 2], axis=2).astype(np.uint8), "RGB"
+    )
+
+    assert PaletteQuantizer().quantize(gradient)[0] is None
+    assert PaletteQuantizer().quantize(Image.new("RGBA", (10, 10)))[0] is None
+
+
+def test_palette_size_is_validated():
+    with pytest.raises(ValueError):
+        PaletteQuantizer(max_colors=300)
+
+
+def test_saver_reports_the_bytes_saved(tmp_path, text_page):
+    image_saver = ImageSaver(str(tmp_path), palette=PaletteQuantizer(), measure_palette=True)
+
+    with PageWriter(workers=2) as writer:
+        writer.submit(image_saver, text_page, "output0.png")
+
+    report = writer.reports[image_saver.file_path("output0.png")]
+    assert report.quantized
+    assert report.written_bytes == (tmp_path / "output0.png").stat().st_size
+    assert report.saved_bytes > 0
+    with Image.open(tmp_path / "output0.png") as saved:
+        assert saved.mode == "P"
+
+
+def test_saver_encodes_once_unless_measuring(tmp_path, text_page, monkeypatch):
+    image_saver = ImageSaver(str(tmp_path), palette=PaletteQuantizer())
+    encode = EncoderProfile.encode
+    encoded = []
+
+    def counting_encode(profile, image):
+        encoded.append(image.mode)
+        return encode(profile, image)
+
+    monkeypatch.setattr(EncoderProfile, "encode", counting_encode)
+    report = image_saver.write_image(text_page, "output0.png")
+
+    assert encoded == ["P"]
+    assert report.quantized and report.rgb_bytes == 0 and report.saved_bytes == 0
+    assert report.written_bytes == (tmp_path / "output0.png").stat().st_size
+
+
+def test_palette_is_only_used_by_png_profiles(tmp_path, text_page):
+    image_saver = ImageSaver(str(tmp_path), profile=PROFILES["webp"], palette=PaletteQuantizer())
+
+    assert image_saver.write_image(text_page, "output0.webp") is None
@@ -0,0 +1,156 @@
+import http.client
+import json
+import shutil
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from src.input_output.render_server import RenderServer, RenderService, etag_matches
+
+THEMES = Path(__file__).parents[3] / "themes"
+MARKDOWN = "# Title\n\nSome **bold** text.\n\n- one\n- two\n"
+
+
+@pytest.fixture
+def themes(tmp_path):
+    directory = tmp_path / "themes"
+    directory.mkdir()
+    for name in ["dark_modern", "light_professional"]:
+        shutil.copy(THEMES / f"{name}.json", directory / f"{name}.json")
+    return directory
+
+
+@pytest.fixture
+def server(themes):
+    server = RenderServer(("127.0.0.1", 0), RenderService(themes))
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_lists_themes(server):
+    status, _, body = request(server, "GET", "/themes")
+
+    assert status == 200
+    assert json.loads(body) == ["dark_modern", "light_professional"]
+
+
+def test_renders_a_zip_of_pages(server):
+    status, headers, body = request(server, "POST", "/render?theme=light_professional", MARKDOWN)
+
+    assert status == 200
+    assert headers["Content-Type"] == "application/zip"
+    with zipfile.ZipFile(BytesIO(body)) as archive:
+        assert archive.namelist() == ["output0.png"]
+        page = Image.open(BytesIO(archive.read("output0.png")))
+    assert page.size == (1080, 1080)
+    assert headers["X-Page-Count"] == "1"
+
+
+def test_renders_multipart_pages(server):
+    status, headers, body = request(
+        server, "POST", "/render?scale=0.5", MARKDOWN, {"Accept": "multipart/mixed"}
+    )
+
+    assert status == 200
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {headers['Content-Type']}\r\n\r\n".encode() + body
+    )
+    parts = list(message.iter_parts())
+    assert [part.get_content_type() for part in parts] == ["image/png"]
+    assert Image.open(BytesIO(parts[0].get_content())).size == (540, 540)
+
+
+def test_responses_are_reproducible_and_revalidated(server):
+    _, first, first_body = request(server, "POST", "/render", MARKDOWN)
+    _, second, second_body = request(server, "POST", "/render", MARKDOWN)
+    _, other_theme, _ = request(server, "POST", "/render?theme=light_professional", MARKDOWN)
+
+    assert first["ETag"] == second["ETag"] != other_theme["ETag"]
+    assert first_body == second_body
+
+    status, headers, body = request(
+        server, "POST", "/render", MARKDOWN, {"If-None-Match": f'W/{first["ETag"]}, "x"'}
+    )
+    assert (status, headers["ETag"], body) == (304, first["ETag"], b"")
+
+
+def test_changed_theme_file_is_reloaded(server, themes):
+    _, before, _ = request(server, "POST", "/render", MARKDOWN)
+
+    theme_path = themes / "dark_modern.json"
+    theme = json.loads(theme_path.read_text())
+    theme["COLORS"]["TEXT"] = "#ff0000"
+    theme_path.write_text(json.dumps(theme))
+    _, after, _ = request(server, "POST", "/render", MARKDOWN)
+
+    assert before["ETag"] != after["ETag"]
+
+
+@pytest.mark.parametrize(
+    "path, body, status",
+    [
+        ("/render?theme=missing", MARKDOWN, 404),
+        ("/render?theme=../themes/dark_modern", MARKDOWN, 404),
+        ("/render", "  \n", 400),
+        ("/render?scale=0", MARKDOWN, 400),
+        ("/render?format=gif", MARKDOWN, 400),
+        ("/elsewhere", MARKDOWN, 404),
+    ],
+)
+def test_rejects_invalid_requests(server, path, body, status):
+    response_status, headers, response_body = request(server, "POST", path, body)
+
+    assert response_status == status
+    assert headers["Content-Type"] == "application/json"
+    assert "error" in json.loads(response_body)
+
+
+def test_etag_matches():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_identical_concurrent_requests_render_once(server, monkeypatch):
+    render = server.service.render
+    renders = []
+
+    def slow_render(*args):
+        renders.append(args)
+        time.sleep(0.2)
+        return render(*args)
+
+    monkeypatch.setattr(server.service, "render", slow_render)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(
+            executor.map(lambda _: request(server, "POST", "/render", MARKDOWN), range(4))
+        )
+    _, _, later = request(server, "POST", "/render", MARKDOWN)
+    request(server, "POST", "/render?scale=0.5", MARKDOWN)
+
+    assert {body for _, _, body in responses} == {later}
+    assert len(renders) == 2
@@ -0,0 +1,107 @@
+"""Tests for the worker_pool module."""
+
+import http.client
+import os
+import shutil
+import threading
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+
+from src.image_generation.font_registry import FontRegistry
+from src.image_generation.text_measurer import TextMeasurer
+from src.input_output import worker_pool
+from src.input_output.render_server import RenderServer, RenderService, ServiceError
+from src.input_output.worker_pool import RenderPool
+
+THEMES = Path(__file__).parents[3] / "themes"
+MARKDOWN = "# Title\n\nSome **bold** text.\n\n- one\n- two\n"
+
+
+def _loaded_themes():
+    return sorted(worker_pool._service._themes)
+
+
+@pytest.fixture
+def service(tmp_path):
+    directory = tmp_path / "themes"
+    directory.mkdir()
+    for name in ["dark_modern", "light_professional"]:
+        shutil.copy(THEMES / f"{name}.json", directory / f"{name}.json")
+    return RenderService(directory)
+
+
+def test_workers_start_with_the_themes_loaded(service):
+    with RenderPool(service, processes=1) as pool:
+        assert pool._pool.apply(_loaded_themes) == ["dark_modern", "light_professional"]
+
+
+def test_workers_are_not_forked_from_the_parent(service):
+    with RenderPool(service, processes=1) as pool:
+        assert pool._pool.apply(os.getppid) != os.getpid()
+
+
+def test_pool_renders_like_the_service(service):
+    with RenderPool(service, processes=2) as pool:
+        pages = pool.render("light_professional", MARKDOWN, 0.5)
+
+    assert pages == service.render("light_professional", MARKDOWN, 0.5)
+
+
+def test_render_many_keeps_the_order_of_the_jobs(service):
+    jobs = [("dark_modern", f"# Document {idx}", 0.25) for idx in range(4)]
+
+    with RenderPool(service, processes=2) as pool:
+        results = list(pool.render_many(jobs))
+
+    assert results == [service.render(*job) for job in jobs]
+
+
+def test_workers_are_replaced_after_their_jobs(service):
+    with RenderPool(service, processes=1, max_jobs_per_worker=1) as pool:
+        pids = [pool._pool.apply(os.getpid) for _ in range(3)]
+        pages = pool.render("dark_modern", MARKDOWN, 0.25)
+
+    assert len(set(pids)) == 3
+    assert pages
+
+
+def test_workers_started_while_locks_are_held_can_render(service):
+    with RenderPool(service, processes=1, max_jobs_per_worker=1) as pool:
+        # The worker rendering the second job is started while the parent holds the locks
+        with FontRegistry()._lock, TextMeasurer()._lock, service._lock:
+            pages = [
+                pool._pool.apply_async(worker_pool._render_in_worker, (theme, MARKDOWN, 0.25)).get(10)
+                for theme in ["dark_modern", "light_professional"]
+            ]
+
+    assert all(pages)
+
+
+def test_service_errors_reach_the_caller(service):
+    with RenderPool(service, processes=1) as pool:
+        with pytest.raises(ServiceError) as error:
+            pool.render("missing", MARKDOWN)
+
+    assert error.value.status == HTTPStatus.NOT_FOUND
+
+
+def test_server_renders_in_the_pool(service):
+    with RenderPool(service, processes=1) as pool:
+        server = RenderServer(("127.0.0.1", 0), service, pool)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        try:
+            connection = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+            connection.request("POST", "/render?format=multipart", body=MARKDOWN)
+            response = connection.getresponse()
+            body = response.read()
+            connection.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    assert response.status == 200
+    assert response.getheader("X-Page-Count") == "1"
+    assert service.render("dark_modern", MARKDOWN)[0] in body
@@ -0,0 +1,55 @@
+"""Tests for the fork_safety module."""
+
+import gc
+import os
+import threading
+
+import pytest
+
+from src.utils import fork_safety
+from src.utils.fork_safety import fork_safe_lock
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+class _Owner:
+    def __init__(self):
+        self._lock = fork_safe_lock(self)
+        self._other_lock = fork_safe_lock(self, "_other_lock")
+
+
+def test_forked_children_get_unlocked_locks():
+    owner = _Owner()
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with owner._lock, owner._other_lock:
+            held.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait()
+    try:
+        pid = os.fork()
+        if pid == 0:
+            acquired = owner._lock.acquire(timeout=1) and owner._other_lock.acquire(timeout=1)
+            os._exit(0 if acquired else 1)
+        _, status = os.waitpid(pid, 0)
+    finally:
+        release.set()
+        thread.join()
+
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+def test_owners_are_not_kept_alive():
+    owner = _Owner()
+    key = (id(owner), "_lock")
+    assert key in fork_safety._owners
+
+    del owner
+    gc.collect()
+
+    assert key not in fork_safety._owners
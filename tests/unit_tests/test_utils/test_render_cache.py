@@ -0,0 +1,76 @@
+import os
+
+import pytest
+from PIL import Image
+
+from src.utils.render_cache import RenderCache, file_fingerprint
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RenderCache(tmp_path / "cache")
+
+
+def _image(color):
+    return Image.new("RGBA", (16, 16), color)
+
+
+def test_get_returns_stored_image(cache):
+    key = RenderCache.key("text", {"SIZE": 1})
+    cache.put("pages", key, _image((1, 2, 3, 4)))
+
+    image = cache.get("pages", key)
+
+    assert image.mode == "RGBA"
+    assert image.getpixel((0, 0)) == (1, 2, 3, 4)
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_get_counts_misses(cache):
+    assert cache.get("pages", RenderCache.key("missing")) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_key_depends_on_every_part():
+    assert RenderCache.key("a", {"X": 1}) == RenderCache.key("a", {"X": 1})
+    assert RenderCache.key("a", {"X": 1}) != RenderCache.key("a", {"X": 2})
+    assert RenderCache.key("a", {"X": 1}) != RenderCache.key("b", {"X": 1})
+
+
+def test_evicts_least_recently_used_entries(cache):
+    keys = [RenderCache.key(i) for i in range(4)]
+    for idx, key in enumerate(keys):
+        cache.put("pages", key, _image((idx, 0, 0, 255)))
+        path = cache._entry_path("pages", key)
+        os.utime(path, ns=(idx * 10**9, idx * 10**9))
+    entry_size = cache._entry_path("pages", keys[0]).stat().st_size
+
+    # Reading the oldest entry makes it the most recently used one
+    assert cache.get("pages", keys[0]) is not None
+    cache.max_size = 3 * entry_size
+    cache.put("pages", RenderCache.key(4), _image((4, 0, 0, 255)))
+
+    assert cache.get("pages", keys[0]) is not None
+    assert cache.get("pages", keys[1]) is None
+    assert cache.get("pages", RenderCache.key(4)) is not None
+
+
+def test_file_fingerprint_follows_contents(tmp_path):
+    path = tmp_path / "font.ttf"
+    path.write_bytes(b"first")
+    first = file_fingerprint(str(path))
+    path.write_bytes(b"second!")
+
+    assert file_fingerprint(str(path)) != first
+    assert file_fingerprint(str(tmp_path / "missing.ttf")) == "missing"
+
+
+def test_from_config(test_config, isolated_render_cache):
+    test_config["CACHE"] = {"ENABLED": True}
+    assert RenderCache.from_config().directory == isolated_render_cache
+
+    test_config["CACHE"] = {"ENABLED": False}
+    assert RenderCache.from_config() is None
+
+    del test_config["CACHE"]
+    assert RenderCache.from_config() is None
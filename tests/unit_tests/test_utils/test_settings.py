@@ -0,0 +1,92 @@
+import dataclasses
+import pickle
+
+import pytest
+
+from src.utils.config import Config
+from src.utils.settings import RenderSettings, to_rgba
+
+
+@pytest.fixture
+def config_data():
+    return {
+        "PATHS": {"FONT": "/fonts/Font.ttf"},
+        "PAGE_LAYOUT": {
+            "TOP_MARGIN": 120,
+            "BOTTOM_MARGIN": 110,
+            "RIGHT_MARGIN": 80,
+            "IMAGE_WIDTH": 1080,
+            "IMAGE_HEIGHT": 1350,
+        },
+        "COLORS": {"TEXT": "#fff", "HIGHLIGHT": "#00d4ff", "BULLET_COLOR": "white"},
+        "CODE_BLOCK": {
+            "SCALE_FACTOR": 2,
+            "BACKGROUND": "#282a3680",
+            "RADIUS": 16,
+            "TOP_PADDING": 50,
+        },
+        "TABLE": {
+            "SCALE_FACTOR": 1,
+            "FOREGROUND": "#f8f8f2",
+            "BACKGROUND": "#282a36",
+            "HIGHLIGHT": "#00d4ff",
+            "HEADER_BG_COLOR": "#6272a4",
+            "HEADER_FG_COLOR": "#f8f8f2",
+        },
+    }
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("#FF0000", (255, 0, 0, 255)),
+        ("#0f08", (0, 255, 0, 136)),
+        ("white", (255, 255, 255, 255)),
+        ([1, 2, 3], (1, 2, 3, 255)),
+        ((1, 2, 3, 4), (1, 2, 3, 4)),
+    ],
+)
+def test_to_rgba(value, expected):
+    assert to_rgba(value) == expected
+
+
+def test_to_rgba_rejects_invalid_colors():
+    with pytest.raises(ValueError):
+        to_rgba("#12345")
+    with pytest.raises(ValueError):
+        to_rgba((1, 2))
+
+
+def test_snapshot_resolves_defaults_and_fallbacks(config_data):
+    settings = RenderSettings.from_dict(config_data)
+
+    assert settings.page.left_margin == settings.page.right_margin == 80
+    assert settings.page.start_index == 0
+    assert settings.colors.text == (255, 255, 255, 255)
+    assert settings.colors.bullet == (255, 255, 255, 255)
+    assert settings.colors.number == settings.colors.highlight == (0, 212, 255, 255)
+    assert settings.colors.background == (15, 15, 35, 255)
+    assert settings.colors.page_number_background == (0, 0, 0, 255)
+    assert settings.code_block.background == (40, 42, 54, 128)
+    assert settings.table.alt_row_bg == settings.table.background
+    assert settings.text_backend == "pillow"
+
+
+def test_snapshot_is_frozen_and_slotted(config_data):
+    settings = RenderSettings.from_dict(config_data)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        settings.page.left_margin = 0
+    assert not hasattr(settings.colors, "__dict__")
+    assert pickle.loads(pickle.dumps(settings)) == settings
+    assert hash(settings) == hash(RenderSettings.from_dict(config_data))
+
+
+def test_snapshot_ignores_later_config_changes(test_config):
+    settings = test_config.snapshot()
+    margin = settings.page.right_margin
+
+    test_config["PAGE_LAYOUT"] = {**test_config["PAGE_LAYOUT"], "RIGHT_MARGIN": margin + 10}
+
+    assert settings.page.right_margin == margin
+    assert Config().snapshot().page.right_margin == margin + 10
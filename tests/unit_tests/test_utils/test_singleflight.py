@@ -0,0 +1,81 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight(ttl=0)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return b"pages"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, "key", slow)
+        started.wait(5)
+        followers = [executor.submit(flight.do, "key", slow) for _ in range(3)]
+        # Followers block on the call in flight until it returns
+        while flight.shared < 3:
+            time.sleep(0.01)
+        release.set()
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert results == [b"pages"] * 4
+    assert len(calls) == 1
+    assert (flight.calls, flight.shared) == (1, 3)
+
+
+def test_results_are_kept_for_the_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    flight = SingleFlight(ttl=5)
+    counter = iter(range(10))
+
+    assert flight.do("key", lambda: next(counter)) == 0
+    now[0] += 4
+    assert flight.do("key", lambda: next(counter)) == 0
+    assert flight.do("other", lambda: next(counter)) == 1
+    now[0] += 2
+    assert flight.do("key", lambda: next(counter)) == 2
+
+
+def test_oldest_results_are_dropped():
+    flight = SingleFlight(ttl=60, max_results=2)
+    for key in "abc":
+        flight.do(key, lambda: key)
+
+    assert flight.do("a", lambda: "again") == "again"
+    assert flight.do("c", lambda: "again") == "c"
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    flight = SingleFlight(ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "key", failing)
+        started.wait(5)
+        follower = executor.submit(flight.do, "key", failing)
+        while flight.shared < 1:
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError, match="boom"):
+                future.result()
+
+    assert flight.do("key", lambda: "recovered") == "recovered"